@@ -0,0 +1,157 @@
+import logging
+import queue
+import threading
+import time
+
+from page_store import DB_PATH
+from recrawl import RecrawlTracker
+from stats_store import record_duration
+from url_index import UrlIndex, clean_url
+from webscraper_o2 import (crawl_with_async_engine, get_working_proxies, init_database, query_database,
+                          search_and_log)
+
+
+# Stages a batch reports progress for, in the order they finish
+BATCH_STAGES = ("search", "crawl", "results")
+
+
+class BatchPipeline:
+    """
+    Runs a batch of queries as overlapping stages instead of one scrape_urls
+    call per query:
+
+        search  - a thread runs the web searches one query after another
+        crawl   - one AsyncFetchEngine session crawls each query's URLs as
+                  soon as its search returns, so query N+1 is searched while
+                  query N's pages are fetched; the proxy check runs once
+        results - when the crawl is done, each query is looked up with
+                  query_database
+
+    URLs are canonicalized and deduplicated across the whole batch with a
+    UrlIndex: a page several queries found is crawled once, by the first,
+    but listed under every query that found it, and pages fetched recently
+    by earlier runs are not fetched again unless `refresh` is true.
+
+    Results wait for the whole crawl because PageWriter batches its writes;
+    a query's pages are only certain to be stored once the crawl session
+    has closed its writer.
+
+    on_progress(stage, done, total) is called from worker threads whenever
+    a stage advances; the crawl total grows as searches add URLs.
+    cancelled() is polled between searches and before each fetch.
+
+    Parameters:
+        search (callable): search(query, num_results=...) -> list of URLs;
+            an exception it raises is reported as that query's error.
+        proxies (list): Proxy URLs for the crawl; None runs the proxy check.
+    """
+
+    def __init__(self, search=search_and_log, num_results=10, proxies=None, db_path=DB_PATH,
+                 on_progress=None, cancelled=None, refresh=False):
+        self.search = search
+        self.refresh = refresh
+        self.num_results = num_results
+        self.proxies = proxies
+        self.db_path = db_path
+        self.on_progress = on_progress
+        self.cancelled = cancelled or (lambda: False)
+        self.progress = {}
+        self.crawl_stats = {}
+        self._crawled_urls = []
+        self._lock = threading.Lock()
+
+    def run(self, queries, content_type=None, limit=10):
+        """
+        Search, crawl and look up every query.
+
+        Returns:
+            list: One dict per query, in order, with query, urls (all its
+                  search found, cleaned), new_urls (those it added to the
+                  crawl), results (query_database rows tagged with
+                  batch_query) and error (None, or why its search failed).
+        """
+        outcomes = [{"query": query, "urls": [], "new_urls": [], "results": [], "error": None}
+                    for query in queries]
+        self.progress = {stage: [0, 0] for stage in BATCH_STAGES}
+        self.progress["search"][1] = self.progress["results"][1] = len(outcomes)
+        self.crawl_stats = {}
+        self._crawled_urls = []
+
+        init_database()
+        url_index = UrlIndex(self.db_path).load()
+        recrawl = RecrawlTracker(self.db_path)
+        feed = queue.Queue()
+        stop = threading.Event()
+        searcher = threading.Thread(target=self._search_stage, args=(outcomes, feed, url_index, recrawl, stop),
+                                    name="batch-search", daemon=True)
+        searcher.start()
+
+        started = time.perf_counter()
+        try:
+            proxies = get_working_proxies() if self.proxies is None else self.proxies
+            self.crawl_stats = crawl_with_async_engine(None, proxies, self.db_path, recrawl=recrawl, feed=feed,
+                                                       on_done=self._crawled, should_stop=self.cancelled)
+            record_duration(self.db_path, "crawl", time.perf_counter() - started)
+        except Exception as e:
+            logging.error(f"Batch crawl failed: {str(e)}")
+        finally:
+            stop.set()
+            searcher.join()
+        # Not the URLs a cancelled crawl skipped: their stored copies stay stale
+        url_index.record(self._crawled_urls)
+        self.crawl_stats.update(url_index.counts)
+        logging.info(f"URL index: {url_index.summary()}")
+
+        for outcome in outcomes:
+            if self.cancelled():
+                break
+            results = query_database(search_terms=outcome["query"].split(), content_type=content_type,
+                                     limit=limit)
+            for result in results:
+                result["batch_query"] = outcome["query"]
+            outcome["results"] = results
+            self._advance("results", done=1)
+
+        logging.info(f"Batch of {len(outcomes)} queries: {self.progress['crawl'][1]} unique URLs, "
+                     f"{sum(len(o['urls']) for o in outcomes)} found, "
+                     f"{sum(len(o['results']) for o in outcomes)} results")
+        return outcomes
+
+    def _search_stage(self, outcomes, feed, url_index, recrawl, stop):
+        try:
+            for outcome in outcomes:
+                if stop.is_set() or self.cancelled():
+                    break
+                try:
+                    urls = list(dict.fromkeys(clean_url(url) for url in
+                                              self.search(outcome["query"], num_results=self.num_results)))
+                except Exception as e:
+                    logging.error(f"Search error for query '{outcome['query']}': {str(e)}")
+                    outcome["error"] = str(e)
+                    urls = []
+                new_urls = url_index.select(urls, refresh=self.refresh)
+                outcome["urls"], outcome["new_urls"] = urls, new_urls
+                if new_urls:
+                    # Validators first: the crawl may start on these at once
+                    recrawl.load(new_urls)
+                    self._advance("crawl", total=len(new_urls))
+                    feed.put(new_urls)
+                self._advance("search", done=1)
+        finally:
+            feed.put(None)
+
+    def _crawled(self, url):
+        self._crawled_urls.append(url)
+        self._advance("crawl", done=1)
+
+    def _advance(self, stage, done=0, total=0):
+        with self._lock:
+            counts = self.progress[stage]
+            counts[0] += done
+            counts[1] += total
+            done, total = counts
+        if self.on_progress:
+            try:
+                self.on_progress(stage, done, total)
+            except Exception as e:
+                logging.error(f"Batch progress callback failed: {str(e)}")
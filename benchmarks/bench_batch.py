@@ -0,0 +1,99 @@
+"""
+Benchmark: one query after another vs the pipelined batch engine, offline.
+
+Runs --queries queries against the local stand-in site twice, each time
+into a fresh scratch database:
+
+    sequential - the old process_batch_queries loop: search, crawl (one
+                 async engine session per query) and query_database for
+                 each query in turn
+    pipeline   - BatchPipeline: searches overlap one shared crawl session
+                 and URLs are deduplicated across the batch
+
+Web search is simulated: each search sleeps --search-latency seconds and
+returns --per-query URLs, of which --overlap are also returned for the
+next query. The proxy check is left out of both. Reports wall time, pages
+requested from the server and the results found.
+
+    python benchmarks/bench_batch.py --queries 20 --search-latency 1 --delay 0.2
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+from local_site import start_server
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def make_search(base_url, per_query, overlap, latency):
+    step = max(1, per_query - overlap)
+
+    def search(query, num_results=10):
+        time.sleep(latency)
+        first = int(query.rsplit(" ", 1)[-1]) * step
+        return [f"{base_url}/page/{n}" for n in range(first, first + per_query)]
+    return search
+
+
+def run_sequential(queries, search):
+    from webscraper_o2 import crawl_with_async_engine, init_database, query_database
+    from recrawl import RecrawlTracker
+
+    init_database()
+    results = []
+    for query in queries:
+        urls = search(query)
+        crawl_with_async_engine(urls, [], recrawl=RecrawlTracker().load(urls))
+        results.append(query_database(search_terms=query.split(), limit=10))
+    return results
+
+
+def run_pipeline(queries, search):
+    from batch_pipeline import BatchPipeline
+
+    stages = {}
+    pipeline = BatchPipeline(search=search, proxies=[],
+                             on_progress=lambda stage, done, total: stages.__setitem__(stage, (done, total)))
+    outcomes = pipeline.run(queries, limit=10)
+    print(f"{'':>12}  progress: " + ", ".join(f"{stage} {done}/{total}" for stage, (done, total) in stages.items()))
+    return [outcome["results"] for outcome in outcomes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--per-query", type=int, default=10)
+    parser.add_argument("--overlap", type=int, default=4, help="URLs shared with the next query")
+    parser.add_argument("--search-latency", type=float, default=1.0)
+    parser.add_argument("--delay", type=float, default=0.2, help="simulated server latency in seconds")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    sys.path.insert(0, REPO_ROOT)
+    server, base_url = start_server(delay=args.delay)
+    search = make_search(base_url, args.per_query, args.overlap, args.search_latency)
+    queries = [f"synthetic page {i}" for i in range(args.queries)]
+
+    for name, run in (("sequential", run_sequential), ("pipeline", run_pipeline)):
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            from result_sink import set_result_sink
+            set_result_sink("table")  # record searches in this scratch database
+            before = server.stats["requests"]
+            start = time.perf_counter()
+            results = run(queries, search)
+            elapsed = time.perf_counter() - start
+            set_result_sink("none")
+            os.chdir(REPO_ROOT)
+        print(f"{name:>12}: {elapsed:6.2f}s, {server.stats['requests'] - before:4d} pages requested, "
+              f"{sum(len(r) for r in results):4d} results over {len(results)} queries")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: per-pattern re.sub clean_text vs BoilerplateStripper.
+
+Reads real body_content rows from scraped_data.db, optionally repeating
+each one up to --size bytes to model large pages, and times the legacy
+loop (one re.sub per boilerplate pattern) against the single precompiled
+alternation. Rows whose output differs are counted; the only expected
+source is the "© <year>" pattern, which never matched before.
+
+    python benchmarks/bench_clean_text.py --db database/scraped_data.db --size 100000
+"""
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from boilerplate import BoilerplateStripper  # noqa: E402
+
+
+def legacy_clean_text(text):
+    """clean_text as it was before BoilerplateStripper"""
+    if not isinstance(text, str):
+        return ""
+    text = re.sub(r'<[^>]+>', ' ', text)
+    boilerplate = [
+        r'Skip to main content', r'Sign In', r'Subscribe', r'Log In', r'Privacy Policy',
+        r'© \\d{4}', r'Search', r'Home', r'About', r'Contact', r'More', r'Follow us',
+        r'Terms of Use', r'Cookie Preferences', r'Netflix Shop', r'Top 10', r'Trending'
+    ]
+    for pattern in boilerplate:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def load_bodies(db_path, size):
+    conn = sqlite3.connect(db_path)
+    rows = [r[0] for r in conn.execute("SELECT body_content FROM pages WHERE body_content != ''")]
+    conn.close()
+    if size:
+        rows = [(body + ' ') * (size // (len(body) + 1) + 1) for body in rows]
+        rows = [body[:size] for body in rows]
+    return rows
+
+
+def time_it(func, bodies, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for body in bodies:
+            func(body)
+    return (time.perf_counter() - start) / (repeat * len(bodies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="database/scraped_data.db")
+    parser.add_argument("--size", type=int, default=0, help="pad each body to this many characters")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = load_bodies(args.db, args.size)
+    if not bodies:
+        print(f"[ERROR] No body_content rows in {args.db}")
+        return
+
+    stripper = BoilerplateStripper()
+    differing = sum(legacy_clean_text(body) != stripper.clean(body) for body in bodies)
+    avg_len = sum(map(len, bodies)) / len(bodies)
+    print(f"[INFO] {len(bodies)} rows, avg {avg_len / 1024:.1f} KB, {differing} with differing output")
+
+    legacy = time_it(legacy_clean_text, bodies, args.repeat)
+    single = time_it(stripper.clean, bodies, args.repeat)
+    for name, seconds in (("per-pattern", legacy), ("alternation", single)):
+        print(f"{name:>12}: {seconds * 1000:.3f} ms/row, {avg_len / seconds / 1e6:.1f} MB/s")
+    print(f"speedup: {legacy / single:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
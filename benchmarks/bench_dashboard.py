@@ -0,0 +1,151 @@
+"""
+Benchmark: rebuilding the dashboard charts vs updating them in place.
+
+Refreshes the four dashboard charts --refreshes times with synthetic
+statistics and reports the time per refresh and how much the process
+grew (resident memory, Linux only):
+
+    rebuild   - what create_dashboard_charts used to do: a new pyplot figure
+                per chart per refresh, never closed (only --rebuild-refreshes
+                of them, as this grows without bound)
+    in-place  - DashboardCharts with new numbers on every refresh
+    unchanged - DashboardCharts with the same numbers every time
+    burst     - --refreshes calls in a tight loop through the throttle, with
+                a stand-in for Tk's after() that fires once the loop is done
+
+Figures are rendered off-screen with Agg, so no display is needed; the
+Tk canvas adds a blit on top of the same drawing work.
+
+    python benchmarks/bench_dashboard.py --refreshes 1000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dashboard_charts import DASHBOARD_CHARTS, DashboardCharts  # noqa: E402
+
+
+def make_stats(rng):
+    today = datetime.date.today()
+    return {
+        "content_types": {kind: rng.randint(1, 500) for kind in ("images", "videos", "files", "links", "text")},
+        "domains": {**{f"site{i}.example.com": rng.randint(10, 100) for i in range(5)}, "other": rng.randint(0, 50)},
+        "scrape_history": {str(today - datetime.timedelta(days=i)): rng.randint(0, 40) for i in range(7)},
+        "file_types": {ext: rng.randint(1, 60) for ext in ("pdf", "zip", "doc", "jpg", "png", "other")},
+    }
+
+
+def rebuild_charts(stats):
+    """The old create_*_chart methods, minus the Tk widget"""
+    for chart_class, key, title in DASHBOARD_CHARTS.values():
+        data = stats[key]
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
+        if chart_class.__name__ == "PieChart":
+            wedges, texts, autotexts = ax.pie(data.values(), labels=None, autopct='%1.1f%%', startangle=90,
+                                              wedgeprops={'width': 0.5})
+            ax.axis('equal')
+            ax.legend(wedges, data.keys(), loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+        else:
+            items = sorted(data.items()) if chart_class.__name__ == "LineChart" else list(data.items())
+            if chart_class.__name__ == "BarChart":
+                ax.bar(range(len(items)), [v for _, v in items], color='#1f6aa5')
+            else:
+                ax.plot(range(len(items)), [v for _, v in items], marker='o', linestyle='-', color='#4CAF50')
+            ax.set_xticks(range(len(items)))
+            ax.set_xticklabels([k for k, _ in items], rotation=45, ha='right')
+            fig.tight_layout()
+        ax.set_title(title)
+        fig.canvas.draw()
+
+
+class AfterQueue:
+    """Stands in for Tk's after(): callbacks run when run() is called"""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def after(self, ms, callback):
+        timer = len(self.callbacks) + 1
+        self.callbacks[timer] = callback
+        return timer
+
+    def after_cancel(self, timer):
+        self.callbacks.pop(timer, None)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def measure(refresh, stats_list):
+    """Returns (per-refresh times in seconds, bytes the process grew by, or None)"""
+    before = rss_bytes()
+    times = []
+    for stats in stats_list:
+        start = time.perf_counter()
+        refresh(stats)
+        times.append(time.perf_counter() - start)
+    after = rss_bytes()
+    return times, None if before is None or after is None else after - before
+
+
+def report(name, times, grown, extra=""):
+    times = sorted(times)
+    mean = sum(times) / len(times)
+    p95 = times[max(0, int(len(times) * 0.95) - 1)]
+    memory = "n/a" if grown is None else f"{grown / 1e6:+.1f} MB"
+    print(f"{name:>9}: {len(times):5d} refreshes, mean {mean * 1000:7.2f} ms, p95 {p95 * 1000:7.2f} ms, "
+          f"total {sum(times):6.2f} s, rss {memory}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refreshes", type=int, default=1000)
+    parser.add_argument("--rebuild-refreshes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    stats_list = [make_stats(rng) for _ in range(args.refreshes)]
+    plt.rcParams['figure.max_open_warning'] = 0
+
+    times, grown = measure(rebuild_charts, stats_list[:args.rebuild_refreshes])
+    report("rebuild", times, grown, f", {len(plt.get_fignums())} figures open")
+    plt.close('all')
+
+    charts = DashboardCharts({name: None for name in DASHBOARD_CHARTS})
+    times, grown = measure(charts.refresh, stats_list)
+    report("in-place", times, grown, f", {charts.stats['draws']} chart draws")
+
+    charts = DashboardCharts({name: None for name in DASHBOARD_CHARTS})
+    times, grown = measure(charts.refresh, [stats_list[0]] * args.refreshes)
+    report("unchanged", times, grown, f", {charts.stats['draws']} chart draws")
+
+    queue = AfterQueue()
+    charts = DashboardCharts({name: None for name in DASHBOARD_CHARTS}, scheduler=queue)
+    times, grown = measure(charts.refresh, stats_list)
+    queue.run()
+    report("burst", times, grown, f", {charts.stats['flushes']} redraws")
+
+
+if __name__ == "__main__":
+    main()
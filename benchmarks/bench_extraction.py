@@ -0,0 +1,90 @@
+"""
+Benchmark: BeautifulSoup/parsel extraction vs the single-pass lxml extractor.
+
+Runs extract_page_data over a corpus of saved HTML pages with each engine
+and reports parse ms/page and peak traced memory. Without --corpus the
+synthetic pages from local_site.py are used. Both engines must produce
+identical page_data; mismatches are reported. Both paths share
+clean_text(), so --no-clean isolates the parsing cost.
+
+    python benchmarks/bench_extraction.py --corpus saved_pages/ --repeat 3
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import logging
+import tracemalloc
+
+from local_site import render_page
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import webscraper_o2  # noqa: E402
+from webscraper_o2 import extract_page_data  # noqa: E402
+
+
+def load_corpus(corpus_dir, pages):
+    """Return [(url, html)] from *.html files, or synthetic pages"""
+    if not corpus_dir:
+        return [(f"http://127.0.0.1/page/{n}", render_page(n)) for n in range(pages)]
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.htm*"), recursive=True)):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            corpus.append((f"file://{os.path.abspath(path)}", f.read()))
+    return corpus
+
+
+def run(engine, corpus, repeat):
+    """Return (ms/page, peak bytes) for one engine"""
+    extract_page_data(*corpus[0], engine=engine)  # warm up imports and parsers
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in corpus:
+            extract_page_data(url, html, engine=engine)
+    elapsed = time.perf_counter() - start
+
+    # Peak memory is measured on a separate pass; tracing slows everything down
+    tracemalloc.start()
+    for url, html in corpus:
+        extract_page_data(url, html, engine=engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed * 1000 / (repeat * len(corpus)), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of saved .html pages (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages when no corpus is given")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-clean", action="store_true", help="skip the shared clean_text() step")
+    args = parser.parse_args()
+
+    if args.no_clean:
+        webscraper_o2.clean_text = lambda text, domain=None: text
+
+    logging.disable(logging.INFO)
+    corpus = load_corpus(args.corpus, args.pages)
+    if not corpus:
+        print(f"[ERROR] No HTML files found in {args.corpus}")
+        return
+
+    mismatches = 0
+    for url, html in corpus:
+        if extract_page_data(url, html, engine="bs4") != extract_page_data(url, html, engine="lxml"):
+            mismatches += 1
+    print(f"[INFO] {len(corpus)} pages, {mismatches} with differing output")
+
+    results = {engine: run(engine, corpus, args.repeat) for engine in ("bs4", "lxml")}
+    for engine, (ms, peak) in results.items():
+        print(f"{engine:>5}: {ms:.2f} ms/page, peak {peak / 1024 / 1024:.1f} MiB")
+    print(f"speedup: {results['bs4'][0] / results['lxml'][0]:.1f}x, "
+          f"memory: {results['bs4'][1] / results['lxml'][1]:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: Scrapy CrawlerProcess vs AsyncFetchEngine, fully offline.
+
+Starts the local stand-in site, crawls N synthetic pages through each
+engine (each in its own subprocess and scratch directory so the Twisted
+reactor and the database start clean) and reports pages/sec. The async
+engine is run --rounds times in the same process to show it restarts.
+
+    python benchmarks/bench_fetch_engine.py --pages 200 --delay 0.05
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from local_site import start_server
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+ASYNC_SCRIPT = """
+import sys, json, time, sqlite3
+sys.path.insert(0, {root!r})
+from webscraper_o2 import init_database, crawl_with_async_engine
+init_database()
+urls = json.loads(sys.argv[1])
+for round_no in range({rounds}):
+    start = time.perf_counter()
+    crawl_with_async_engine(urls)
+    elapsed = time.perf_counter() - start
+    rows = sqlite3.connect("database/scraped_data.db").execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    print(json.dumps({{"engine": "async", "round": round_no + 1, "elapsed": elapsed, "rows": rows}}))
+"""
+
+SCRAPY_SCRIPT = """
+import sys, json, time, sqlite3
+sys.path.insert(0, {root!r})
+from scrapy.crawler import CrawlerProcess
+from webscraper_o2 import init_database, crawler_settings, EnhancedContentSpider
+init_database()
+urls = json.loads(sys.argv[1])
+settings = crawler_settings([])
+settings['LOG_LEVEL'] = 'WARNING'
+process = CrawlerProcess(settings)
+process.crawl(EnhancedContentSpider, urls=urls)
+start = time.perf_counter()
+process.start()
+elapsed = time.perf_counter() - start
+rows = sqlite3.connect("database/scraped_data.db").execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+print(json.dumps({{"engine": "scrapy", "round": 1, "elapsed": elapsed, "rows": rows}}))
+"""
+
+
+def run_engine(script, urls):
+    with tempfile.TemporaryDirectory() as workdir:
+        proc = subprocess.run(
+            [sys.executable, "-c", script, json.dumps(urls)],
+            cwd=workdir, capture_output=True, text=True
+        )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        return []
+    return [json.loads(line) for line in proc.stdout.splitlines() if line.startswith("{")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.05, help="simulated server latency in seconds")
+    parser.add_argument("--rounds", type=int, default=2, help="async engine runs in one process")
+    parser.add_argument("--skip-scrapy", action="store_true")
+    args = parser.parse_args()
+
+    server, base_url = start_server(delay=args.delay)
+    urls = [f"{base_url}/page/{i}" for i in range(args.pages)]
+    try:
+        results = run_engine(ASYNC_SCRIPT.format(root=REPO_ROOT, rounds=args.rounds), urls)
+        if not args.skip_scrapy:
+            results += run_engine(SCRAPY_SCRIPT.format(root=REPO_ROOT), urls)
+    finally:
+        server.shutdown()
+
+    for r in results:
+        print(f"{r['engine']:>7} round {r['round']}: {r['rows']} rows, {args.pages} pages in "
+              f"{r['elapsed']:.2f}s -> {args.pages / r['elapsed']:.1f} pages/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: how soon a link-following crawl reaches the pages that match
+the query, offline and without HTTP.
+
+A synthetic site of --pages pages is crawled through a CrawlFrontier from
+--seeds start pages, up to --depth links away, until --budget pages have
+been "fetched". A --relevant share of the pages are on the query's topic:
+their links' anchor text mentions it, and they link mostly to each other.
+
+    bfs    - a frontier without query terms: breadth-first, in link order
+    scored - a frontier scoring links against the query terms
+
+Reports the share of on-topic pages among those fetched, and the frontier's
+own cost per fetched page.
+
+    python benchmarks/bench_frontier.py --pages 20000 --budget 500 --depth 3
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from crawl_frontier import CrawlFrontier  # noqa: E402
+
+TERMS = ["laptop", "review"]
+
+
+def build_site(pages, relevant, links_per_page, seed=1):
+    """page number -> list of link dicts; on-topic pages are the multiples of round(1 / relevant)"""
+    rng = random.Random(seed)
+    step = max(1, round(1 / relevant))
+    topical = list(range(0, pages, step))
+    site = {}
+    for n in range(pages):
+        links = []
+        for _ in range(links_per_page):
+            # On-topic pages link on-topic half the time, others rarely
+            on_topic = rng.random() < (0.5 if n % step == 0 else relevant)
+            target = rng.choice(topical) if on_topic else rng.randrange(pages)
+            text = "Laptop review roundup" if target % step == 0 else "Related article"
+            links.append({'url': f"https://example.com/page/{target}", 'text': text, 'title': ''})
+        site[n] = links
+    return site, step
+
+
+def crawl(site, step, seeds, terms, depth, budget, db_path):
+    frontier = CrawlFrontier(terms=terms, max_depth=depth, max_pages=budget, max_pages_per_domain=budget,
+                             db_path=db_path)
+    frontier.add(f"https://example.com/page/{n}" for n in seeds)
+    start = time.perf_counter()
+    while True:
+        urls = frontier.pop(16)
+        if not urls:
+            break
+        for url in urls:
+            frontier.add_links(url, site[int(url.rsplit("/", 1)[-1])])
+            frontier.done(url)
+    elapsed = time.perf_counter() - start
+    fetched = [int(url.rsplit("/", 1)[-1]) for url in frontier.fetched]
+    on_topic = sum(n % step == 0 for n in fetched)
+    return len(fetched), on_topic, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--links", type=int, default=20, help="links per page")
+    parser.add_argument("--relevant", type=float, default=0.05, help="share of pages on the query's topic")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    site, step = build_site(args.pages, args.relevant, args.links)
+    seeds = random.Random(2).sample(range(args.pages), args.seeds)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "scraped_data.db")
+        for name, terms in (("bfs", []), ("scored", TERMS)):
+            fetched, on_topic, elapsed = crawl(site, step, seeds, terms, args.depth, args.budget, db_path)
+            print(f"{name:>6}: {on_topic}/{fetched} fetched pages on topic ({on_topic / fetched * 100:.0f}%), "
+                  f"{elapsed / fetched * 1e6:.0f} us per page")
+
+
+if __name__ == "__main__":
+    main()
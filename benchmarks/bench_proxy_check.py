@@ -0,0 +1,113 @@
+"""
+Benchmark: legacy thread-pool proxy checks vs validate_proxies, fully offline.
+
+Builds a proxy list out of local stand-in servers:
+  - alive proxies: local_site servers with different delays, which answer
+    the /ip echo endpoint when used as HTTP proxies
+  - refused proxies: closed ports (connection refused)
+  - blackhole proxies: sockets that accept but never answer (timeouts)
+
+and validates it with the legacy approach (10 workers, both echo URLs,
+10 s timeout) and with validate_proxies (early exit at --target), reporting
+wall time and the latency ranking.
+
+    python benchmarks/bench_proxy_check.py --alive 20 --refused 200 --blackholes 10 --target 10
+"""
+import os
+import sys
+import time
+import socket
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from local_site import start_server
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from proxy_cheaker import validate_proxies  # noqa: E402
+
+
+def legacy_check(proxy, echo_urls):
+    """The old test_proxy: every echo URL in turn, 10 s timeout each"""
+    proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
+    results = []
+    for echo_url in echo_urls:
+        try:
+            start = time.time()
+            response = requests.get(echo_url, proxies=proxies, timeout=10)
+            if response.status_code == 200:
+                response.json()["origin"]
+                results.append({"proxy": proxy, "status": True, "time": time.time() - start})
+                continue
+        except Exception:
+            pass
+        results.append({"proxy": proxy, "status": False})
+    return results
+
+
+def run_legacy(proxy_list, echo_urls):
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = [r for rs in executor.map(lambda p: legacy_check(p, echo_urls), proxy_list) for r in rs]
+    return [r for r in results if r["status"]]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alive", type=int, default=20)
+    parser.add_argument("--refused", type=int, default=200)
+    parser.add_argument("--blackholes", type=int, default=10)
+    parser.add_argument("--target", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=5, help="validate_proxies per-request timeout")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    delays = [0.0, 0.05, 0.1, 0.2]
+    servers = [start_server(delay=delays[i % len(delays)]) for i in range(args.alive)]
+    alive = [f"127.0.0.1:{server.server_address[1]}" for server, _ in servers]
+    refused = [f"127.0.0.1:{free_port()}" for _ in range(args.refused)]
+
+    blackholes = []
+    for _ in range(args.blackholes):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(64)
+        blackholes.append(sock)
+    silent = [f"127.0.0.1:{sock.getsockname()[1]}" for sock in blackholes]
+
+    proxy_list = alive + refused + silent
+    random.Random(0).shuffle(proxy_list)
+    # Proxied requests go to an echo host by name; the proxy answers them itself
+    echo_urls = ["http://echo.invalid/ip"]
+    print(f"[INFO] {len(alive)} alive, {len(refused)} refused, {len(silent)} blackhole proxies")
+
+    try:
+        start = time.perf_counter()
+        ranked = validate_proxies(proxy_list, target=args.target, timeout=args.timeout, echo_urls=echo_urls)
+        new_elapsed = time.perf_counter() - start
+        print(f"validate_proxies: {len(ranked)} working in {new_elapsed:.2f}s; fastest "
+              + ", ".join(f"{r['time'] * 1000:.0f}ms" for r in ranked[:5]))
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            working = run_legacy(proxy_list, echo_urls)
+            legacy_elapsed = time.perf_counter() - start
+            print(f"          legacy: {len(working)} working in {legacy_elapsed:.2f}s "
+                  f"-> {legacy_elapsed / new_elapsed:.0f}x slower")
+    finally:
+        for server, _ in servers:
+            server.shutdown()
+        for sock in blackholes:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
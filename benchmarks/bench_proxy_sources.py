@@ -0,0 +1,92 @@
+"""
+Benchmark: serial vs concurrent proxy source scraping, fully offline.
+
+Serves --sources fixture proxy list pages (/proxies/<n>) from --hosts local
+stand-in servers and scrapes them three ways:
+
+    legacy     - the old loop: one site after another, sleeping --delay
+                 seconds after each
+    concurrent - fetch_proxies_with_regex with the source cache disabled;
+                 same pause, but only between requests to the same host
+    cached     - fetch_proxies_with_regex again within the cache window
+
+and reports wall time, requests served and unique proxies found (all three
+must find the same set).
+
+    python benchmarks/bench_proxy_sources.py --sources 20 --hosts 10 --delay 1
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+import requests
+
+from local_site import start_server
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import get_proxy_list  # noqa: E402
+from get_proxy_list import fetch_proxies_with_regex  # noqa: E402
+
+
+def legacy_fetch(sources, delay):
+    """The old fetch_proxies_with_regex loop, minus the file write"""
+    found = []
+    for url in sources:
+        try:
+            response = requests.get(url, timeout=15)
+            response.raise_for_status()
+            found.extend(re.findall(r"(\d{1,3}(?:\.\d{1,3}){3}):(\d+)", response.text))
+            time.sleep(delay)
+        except requests.exceptions.RequestException:
+            continue
+    return list(set(f"{p[0]}:{p[1]}" for p in found))
+
+
+def requests_served(servers):
+    return sum(server.stats["requests"] for server, _ in servers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--hosts", type=int, default=10, help="servers the sources are spread over")
+    parser.add_argument("--delay", type=float, default=1.0, help="politeness pause in seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated server latency in seconds")
+    args = parser.parse_args()
+
+    servers = [start_server(delay=args.latency) for _ in range(args.hosts)]
+    sources = [f"{servers[i % args.hosts][1]}/proxies/{i}" for i in range(args.sources)]
+    get_proxy_list.HOST_DELAY = (args.delay, args.delay)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        proxy_file = os.path.join(workdir, "proxies.txt")
+        cache_file = os.path.join(workdir, "proxy_sources.json")
+
+        before, start = requests_served(servers), time.perf_counter()
+        legacy = legacy_fetch(sources, args.delay)
+        rows.append(("legacy", time.perf_counter() - start, requests_served(servers) - before, legacy))
+
+        for name, max_age in (("concurrent", 0), ("cached", 3600)):
+            before, start = requests_served(servers), time.perf_counter()
+            found = fetch_proxies_with_regex(max_age=max_age, sources=sources,
+                                             proxy_file=proxy_file, cache_file=cache_file)
+            rows.append((name, time.perf_counter() - start, requests_served(servers) - before, found))
+
+    for server, _ in servers:
+        server.shutdown()
+
+    print()
+    for name, elapsed, served, found in rows:
+        print(f"{name:>10}: {elapsed:6.2f}s, {served:3d} requests, {len(found)} unique proxies")
+    if any(set(found) != set(legacy) for _, _, _, found in rows):
+        print("[ERROR] Proxy sets differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
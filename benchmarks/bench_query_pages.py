@@ -0,0 +1,78 @@
+"""
+Benchmark: query_database (full rows) vs query_pages (projected, paged).
+
+Fills a scratch database with N synthetic pages that all match the search
+term, then for each --limits value reports time and peak Python memory of
+
+    query_database - SELECT of every pages_compat column for `limit` rows
+    query_pages    - the result-list columns (title, url, snippet, counts,
+                     first image) for `limit` rows
+    first page     - query_pages with --page-size rows, as the results panel
+                     loads them, plus get_page() for one full row
+
+    python benchmarks/bench_query_pages.py --pages 3000 --limits 10 100 1000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from bench_store_data import make_page_data
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # webscraper_o2 writes its logs and database relative to the cwd
+        os.chdir(workdir)
+        sys.path.insert(0, REPO_ROOT)
+        import logging
+        from webscraper_o2 import init_database, query_database, query_pages, get_page, DB_PATH
+        from page_store import PageWriter
+        from result_sink import NullSink
+        init_database()
+        logging.disable(logging.INFO)
+
+        writer = PageWriter(DB_PATH, batch_size=500)
+        for i in range(args.pages):
+            writer.add(f"https://example.com/page/{i}", make_page_data(i))
+        writer.close()
+
+        sink = NullSink()
+        print(f"{'limit':>6} {'query_database':>24} {'query_pages':>24} {'first page + get_page':>26}")
+        for limit in args.limits:
+            full_time, full_peak, _ = measure(lambda: query_database("lorem", limit=limit, sink=sink))
+            proj_time, proj_peak, _ = measure(lambda: query_pages("lorem", limit=limit, sink=sink))
+
+            def first_page():
+                page = query_pages("lorem", limit=args.page_size, sink=sink)
+                return get_page(page['rows'][0]['id'])
+            page_time, page_peak, _ = measure(first_page)
+
+            print(f"{limit:>6} {full_time * 1000:>9.1f} ms {full_peak / 1e6:>7.1f} MB"
+                  f" {proj_time * 1000:>9.1f} ms {proj_peak / 1e6:>7.1f} MB"
+                  f" {page_time * 1000:>11.1f} ms {page_peak / 1e6:>7.1f} MB")
+        os.chdir(REPO_ROOT)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: full crawl vs conditional re-crawls, fully offline.
+
+Crawls N synthetic pages from the local stand-in site with the async
+engine three times against one scratch database:
+
+    full        - first crawl, everything is new
+    conditional - server honours If-None-Match/If-Modified-Since (304s)
+    hash-only   - server sends no validators; unchanged bodies are
+                  detected by content hash and not parsed or stored
+
+and reports time, body bytes served and the new/changed/skipped counts.
+
+Then a link-following crawl (depth 2 through a CrawlFrontier) from one
+page is run twice: pages answering 304 on the second run must still have
+their stored links followed, so both runs reach the same pages.
+
+Last, search hits that redirect (/redirect/<n> -> /page/<n>) are scraped
+with each engine (Scrapy in a child process, as it starts only once per
+process) and must then be recognised by the URL index as fetched, so the
+next run does not fetch them again.
+
+The script exits with an error when either check fails.
+
+    python benchmarks/bench_recrawl.py --pages 200
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+from local_site import start_server
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def crawl(base_url, server, pages):
+    from webscraper_o2 import crawl_with_async_engine
+    from recrawl import RecrawlTracker
+
+    urls = [f"{base_url}/page/{i}" for i in range(pages)]
+    sent_before = server.stats["bytes"]
+    recrawl = RecrawlTracker().load(urls)
+    start = time.perf_counter()
+    crawl_with_async_engine(urls, recrawl=recrawl)
+    elapsed = time.perf_counter() - start
+    return elapsed, server.stats["bytes"] - sent_before, recrawl
+
+
+def linked_crawl(base_url, start):
+    """Frontier counts of a depth-2 crawl from page `start`"""
+    from webscraper_o2 import crawl_with_async_engine
+    from crawl_frontier import CrawlFrontier
+    from recrawl import RecrawlTracker
+
+    frontier = CrawlFrontier(max_depth=1)
+    frontier.add([f"{base_url}/page/{start}"])
+    recrawl = RecrawlTracker()
+    crawl_with_async_engine(None, recrawl=recrawl, frontier=frontier)
+    return frontier.counts, recrawl
+
+
+def scrape(urls, engine):
+    import webscraper_o2
+
+    webscraper_o2.get_working_proxies = lambda: []  # no proxy check offline
+    webscraper_o2.scrape_urls(urls=urls, engine=engine)
+
+
+def redirect_check(base_url, start, count):
+    """For each engine, how many of `count` redirecting URLs count as fetched after one scrape"""
+    from url_index import UrlIndex
+
+    fresh = {}
+    for n, engine in enumerate(("async", "scrapy")):
+        first = start + n * count
+        urls = [f"{base_url}/redirect/{i}" for i in range(first, first + count)]
+        if engine == "scrapy":
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--scrape-scrapy", *urls], check=True)
+        else:
+            scrape(urls, engine)
+        fresh[engine] = count - len(UrlIndex().load().select(urls))
+    return fresh
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated server latency in seconds")
+    parser.add_argument("--scrape-scrapy", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scrape_scrapy:
+        # Child process of redirect_check(), in its scratch directory
+        sys.path.insert(0, REPO_ROOT)
+        import logging
+        logging.disable(logging.INFO)
+        scrape(args.scrape_scrapy, "scrapy")
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # webscraper_o2 writes its logs and database relative to the cwd
+        os.chdir(workdir)
+        sys.path.insert(0, REPO_ROOT)
+        import logging
+        from webscraper_o2 import init_database
+        init_database()
+        logging.disable(logging.INFO)
+
+        server, base_url = start_server(delay=args.delay)
+        plain_server, plain_url = start_server(delay=args.delay, validators=False)
+        try:
+            rounds = [
+                ("full", crawl(base_url, server, args.pages)),
+                ("conditional", crawl(base_url, server, args.pages)),
+            ]
+            # Same pages under another host, first crawled, then re-crawled without validators
+            crawl(plain_url, plain_server, args.pages)
+            rounds.append(("hash-only", crawl(plain_url, plain_server, args.pages)))
+            # Starts past the pages crawled above, so the first run fetches everything anew
+            linked = [linked_crawl(base_url, args.pages), linked_crawl(base_url, args.pages)]
+            redirects = 10
+            fresh = redirect_check(base_url, args.pages * 100, redirects)
+        finally:
+            server.shutdown()
+            plain_server.shutdown()
+        os.chdir(REPO_ROOT)
+
+    for name, (elapsed, sent, recrawl) in rounds:
+        print(f"{name:>12}: {args.pages} pages in {elapsed:.2f}s, {sent / 1024:,.0f} KiB served; "
+              f"{recrawl.summary()}")
+    for name, (counts, recrawl) in zip(("linked", "re-linked"), linked):
+        print(f"{name:>12}: {counts['fetched']} pages fetched, {counts['expanded']} stored pages followed; "
+              f"{recrawl.summary()}")
+    print(f"{'redirects':>12}: " + ", ".join(f"{engine} {count}/{redirects} recognised as fetched"
+                                              for engine, count in fresh.items()))
+    if linked[1][0]["fetched"] < linked[0][0]["fetched"]:
+        sys.exit("Re-crawl stopped following links at unchanged pages")
+    if min(fresh.values()) < redirects:
+        sys.exit("Redirected search hits are not recorded in the URL index")
+
+
+if __name__ == "__main__":
+    main()
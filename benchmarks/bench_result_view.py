@@ -0,0 +1,140 @@
+"""
+Benchmark: one widget tree per result vs the virtualized results panel.
+
+For each --counts value, builds N synthetic results in --mode view two ways
+in a --size window:
+
+    full    - one result widget per row in a CTkScrollableFrame, as the
+              panel used to do (skipped above --full-max results)
+    virtual - VirtualResultList, which only creates the rows on screen
+
+and reports time to first paint (building plus one update()), peak Python
+memory while building, and the number of Tk widgets created. Thumbnails
+are left as placeholders so only widget cost is measured.
+
+Needs a display (an X server, or Xvfb on a headless machine).
+
+    python benchmarks/bench_result_view.py --counts 10 1000 10000 --mode List
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import customtkinter as ctk  # noqa: E402
+from result_view import VIEW_MODES, VirtualResultList  # noqa: E402
+
+
+def make_results(n):
+    return [{
+        'id': i,
+        'url': f"https://example{i % 50}.com/article/{i}",
+        'title': f"Synthetic result {i}",
+        'snippet': "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+        'preview': "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 14,
+        'timestamp': "2025-01-01T00:00:00",
+        'image_count': i % 6, 'video_count': i % 2, 'file_count': i % 3,
+        'thumbnails': "[]",
+    } for i in range(n)]
+
+
+class BenchApp:
+    """The parts of the main window the result widgets use"""
+
+    colors = {"card_bg": "#2b2b2b", "primary": "#3b82f6", "secondary": "#6b7280", "accent": "#8b5cf6"}
+
+    def result_images(self, result):
+        return []
+
+    def result_count(self, result, kind):
+        return result[f"{kind}_count"]
+
+    def result_preview(self, result, length, prefer="preview"):
+        text = result.get(prefer) or result.get('preview') or ''
+        return text[:length] + "..." if len(text) > length else text
+
+    def load_thumbnail(self, label, url, size=(200, 200)):
+        pass
+
+    def save_single_result(self, result):
+        pass
+
+    def search_similar(self, result):
+        pass
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def build_full(root, app, results, mode):
+    """The old panel: every result gets its own widget tree"""
+    item_class, _, columns, pack_options = VIEW_MODES[mode]
+    frame = ctk.CTkScrollableFrame(root)
+    frame.pack(fill="both", expand=True)
+    row = None
+    for i, result in enumerate(results):
+        if i % columns == 0:
+            row = ctk.CTkFrame(frame, fg_color="transparent")
+            row.pack(fill="x")
+        item = item_class(row, app)
+        item.show(result)
+        item.pack(**pack_options)
+    return frame
+
+
+def build_virtual(root, app, results, mode):
+    panel = VirtualResultList(root, app, mode=mode)
+    panel.pack(fill="both", expand=True)
+    root.update_idletasks()
+    panel.set_results(results)
+    return panel
+
+
+def measure(root, build, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    panel = build(root, *args)
+    root.update()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    widgets = count_widgets(panel)
+    panel.destroy()
+    root.update()
+    return elapsed, peak, widgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--mode", choices=list(VIEW_MODES), default="List")
+    parser.add_argument("--size", default="1200x900", help="window geometry")
+    parser.add_argument("--full-max", type=int, default=1000, help="largest count to build the full tree for")
+    args = parser.parse_args()
+
+    root = ctk.CTk()
+    root.geometry(args.size)
+    root.update()
+    app = BenchApp()
+
+    print(f"{'results':>8} {'full':>39} {'virtual':>39}")
+    for count in args.counts:
+        results = make_results(count)
+        cells = []
+        for build in (build_full, build_virtual):
+            if build is build_full and count > args.full_max:
+                cells.append(f"{'skipped':>39}")
+                continue
+            elapsed, peak, widgets = measure(root, build, app, results, args.mode)
+            cells.append(f"{elapsed * 1000:>9.0f} ms {peak / 1e6:>7.1f} MB {widgets:>7d} widgets")
+        print(f"{count:>8} {cells[0]} {cells[1]}")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: repeated searches with and without the search cache, offline.
+
+A stand-in for Google (a cacheable backend that sleeps --latency seconds
+per search, as googlesearch's sleep_interval does) answers --queries
+queries --rounds times through search_urls:
+
+    uncached - straight to the backend every time, as searchec used to
+    cached   - through a SearchCache in a scratch database; each round
+               opens a new cache, as a new run of the scraper would
+    seeds    - the seed-file backend, which needs no network at all
+
+and reports the time per round and the cache hit rate.
+
+    python benchmarks/bench_search.py --queries 10 --rounds 3 --latency 1
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from search_backend import SearchBackend, SearchCache, SeedBackend, search_urls  # noqa: E402
+
+
+class SlowBackend(SearchBackend):
+    name = "slow"
+    cacheable = True
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def search(self, query, num_results=10):
+        self.calls += 1
+        time.sleep(self.latency)
+        return [f"https://example.com/{query.replace(' ', '-')}/{i}" for i in range(num_results)]
+
+
+def run_round(queries, backend, cache):
+    start = time.perf_counter()
+    for query in queries:
+        search_urls(query, backend=backend, cache=cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per backend search")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    queries = [f"benchmark query {i}" for i in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "scraped_data.db")
+        seeds_path = os.path.join(workdir, "seeds.txt")
+        with open(seeds_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(f"https://example.com/seed/{i}" for i in range(50)))
+
+        for name in ("uncached", "cached", "seeds"):
+            backend = SeedBackend(seeds_path) if name == "seeds" else SlowBackend(args.latency)
+            if name == "uncached":
+                backend.cacheable = False
+            for n in range(args.rounds):
+                cache = SearchCache(db_path)
+                elapsed = run_round(queries, backend, cache)
+                rate = cache.summary() if backend.cacheable else "not cached"
+                print(f"{name:>9} round {n + 1}: {elapsed:6.2f}s, {rate}")
+
+
+if __name__ == "__main__":
+    main()
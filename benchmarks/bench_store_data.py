@@ -0,0 +1,85 @@
+"""
+Benchmark: per-row store_data commits vs the batched PageWriter.
+
+Inserts N synthetic page_data dicts into a throwaway database through
+both paths and reports rows/sec.
+
+    python benchmarks/bench_store_data.py --rows 5000
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from page_store import PageWriter, init_schema, page_record, write_pages
+
+
+def make_page_data(i):
+    """Build a synthetic page_data dict roughly the size of a real page"""
+    return {
+        'title': f"Synthetic page {i}",
+        'body_content': ("lorem ipsum dolor sit amet " * 400) + str(i),
+        'meta_description': f"Description for page {i}",
+        'images': json.dumps([{'src': f"https://example.com/{i}/{n}.jpg", 'alt': '', 'title': ''} for n in range(10)]),
+        'links': json.dumps([{'url': f"https://example.com/{i}/link/{n}", 'text': 'link', 'title': ''} for n in range(50)]),
+    }
+
+
+def legacy_store(db_path, url, page_data):
+    """The old store_data path: new connection and commit for every page"""
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        write_pages(conn, [page_record(url, page_data)])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_legacy(db_path, pages):
+    start = time.perf_counter()
+    for url, page_data in pages:
+        legacy_store(db_path, url, page_data)
+    return time.perf_counter() - start
+
+
+def run_writer(db_path, pages, batch_size):
+    start = time.perf_counter()
+    writer = PageWriter(db_path, batch_size=batch_size)
+    for url, page_data in pages:
+        writer.add(url, page_data)
+    writer.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = [(f"https://example.com/page/{i}", make_page_data(i)) for i in range(args.rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name in ("legacy", "writer"):
+            db_path = os.path.join(tmp, f"{name}.db")
+            conn = sqlite3.connect(db_path)
+            init_schema(conn)
+            conn.close()
+            if name == "legacy":
+                elapsed = run_legacy(db_path, pages)
+            else:
+                elapsed = run_writer(db_path, pages, args.batch_size)
+            results[name] = elapsed
+
+    for name, elapsed in results.items():
+        print(f"{name:>8}: {args.rows} rows in {elapsed:.2f}s -> {args.rows / elapsed:,.0f} rows/sec")
+    print(f"speedup: {results['legacy'] / results['writer']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
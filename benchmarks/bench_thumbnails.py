@@ -0,0 +1,104 @@
+"""
+Benchmark: blocking vs pooled, disk-cached thumbnail loading, fully offline.
+
+Serves --results 800x600 JPEGs from the local stand-in server (with
+--latency seconds of simulated network delay) and loads a 200x200
+thumbnail of each three ways:
+
+    blocking - the old create_thumbnail: download and resize one after
+               another on the calling (Tk) thread
+    cold     - ThumbnailLoader with an empty disk cache
+    warm     - ThumbnailLoader again, as when the results are redisplayed
+
+For each it reports how long the calling thread was blocked, the time
+until every thumbnail was ready, and the requests served. Finally the
+cache limit is lowered to --limit-kb to check eviction.
+
+    python benchmarks/bench_thumbnails.py --results 50 --latency 0.2
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from io import BytesIO
+
+import requests
+from PIL import Image, ImageOps
+
+from local_site import start_server
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from thumbnail_cache import ThumbnailCache, ThumbnailLoader  # noqa: E402
+
+SIZE = (200, 200)
+
+
+def blocking_load(urls):
+    """The old create_thumbnail, minus the PhotoImage"""
+    for url in urls:
+        response = requests.get(url, timeout=5)
+        ImageOps.fit(Image.open(BytesIO(response.content)), SIZE, Image.LANCZOS)
+
+
+def pooled_load(loader, urls):
+    """Returns (seconds the caller was blocked, seconds until all were ready, failures)"""
+    done = threading.Event()
+    remaining = [len(urls)]
+    failures = [0]
+    lock = threading.Lock()
+
+    def ready(img):
+        with lock:
+            failures[0] += img is None
+            remaining[0] -= 1
+            if not remaining[0]:
+                done.set()
+
+    start = time.perf_counter()
+    for url in urls:
+        loader.request(url, SIZE, ready)
+    blocked = time.perf_counter() - start
+    done.wait()
+    return blocked, time.perf_counter() - start, failures[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated server latency in seconds")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit-kb", type=int, default=20, help="cache limit for the eviction check")
+    args = parser.parse_args()
+
+    server, base_url = start_server(delay=args.latency)
+    urls = [f"{base_url}/images/{i}.jpg" for i in range(args.results)]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        before, start = server.stats["requests"], time.perf_counter()
+        blocking_load(urls)
+        elapsed = time.perf_counter() - start
+        print(f"{'blocking':>9}: blocked {elapsed:6.2f}s, ready {elapsed:6.2f}s, "
+              f"{server.stats['requests'] - before:3d} requests")
+
+        cache = ThumbnailCache(cache_dir)
+        for name in ("cold", "warm"):
+            loader = ThumbnailLoader(cache, workers=args.workers)
+            before = server.stats["requests"]
+            blocked, ready, failures = pooled_load(loader, urls)
+            loader.shutdown()
+            print(f"{name:>9}: blocked {blocked:6.2f}s, ready {ready:6.2f}s, "
+                  f"{server.stats['requests'] - before:3d} requests, {failures} failed")
+
+        print(f"\ncache: {len(os.listdir(cache_dir))} files, {cache.size_bytes() / 1024:.0f} KB")
+        cache.configure(limit_mb=args.limit_kb / 1024)
+        print(f"limit {args.limit_kb} KB: {len(os.listdir(cache_dir))} files, "
+              f"{cache.size_bytes() / 1024:.0f} KB, {cache.stats['evicted']} evicted")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
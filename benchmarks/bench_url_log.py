@@ -0,0 +1,87 @@
+"""
+Benchmark: recording search results in the URL log, offline.
+
+With --history URLs already logged, --searches searches of --results URLs
+each are recorded:
+
+    json   - the old way: load database/output.json, insert every URL at
+             index 0 and rewrite the whole file with indent=4
+    sqlite - url_log.log_urls: one appending transaction per search, the
+             history is first migrated from the same output.json
+
+and the time per search is reported; the json cost grows with the history,
+the sqlite cost does not.
+
+    python benchmarks/bench_url_log.py --history 50000 --searches 50
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import url_log  # noqa: E402
+
+
+def write_history(path, count):
+    entries = [{"url": f"https://example.com/history/{i}", "timestamp": "2024-01-01 00:00:00"}
+               for i in range(count)]
+    with open(path, "w") as f:
+        json.dump({"urls": entries}, f, indent=4)
+
+
+def json_search(path, urls, timestamp):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = {"urls": []}
+    for url in urls:
+        data["urls"].insert(0, {"url": url, "timestamp": timestamp})
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=50000, help="URLs logged before the run")
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--results", type=int, default=10, help="URLs per search")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    searches = [[f"https://example.com/search/{n}/{i}" for i in range(args.results)]
+                for n in range(args.searches)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        legacy_path = os.path.join(workdir, "output.json")
+        db_path = os.path.join(workdir, "scraped_data.db")
+        url_log.LEGACY_URL_LOG_PATH = legacy_path
+
+        write_history(legacy_path, args.history)
+        start = time.perf_counter()
+        for urls in searches:
+            json_search(legacy_path, urls, "2024-01-02 00:00:00")
+        elapsed = time.perf_counter() - start
+        print(f"  json: {elapsed / args.searches * 1000:8.2f} ms per search, "
+              f"{os.path.getsize(legacy_path) / 1e6:.1f} MB file")
+
+        write_history(legacy_path, args.history)
+        start = time.perf_counter()
+        url_log.log_urls([], db_path=db_path)
+        migrated = time.perf_counter() - start
+        start = time.perf_counter()
+        for n, urls in enumerate(searches):
+            url_log.log_urls(urls, query=f"query {n}", db_path=db_path)
+        elapsed = time.perf_counter() - start
+        logged = len(url_log.recent_urls(limit=args.history + len(searches) * args.results, db_path=db_path))
+        print(f"sqlite: {elapsed / args.searches * 1000:8.2f} ms per search, "
+              f"{logged} URLs logged, one-time migration {migrated:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
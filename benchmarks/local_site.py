@@ -0,0 +1,248 @@
+"""
+Local HTTP stand-in for benchmarking crawls offline.
+
+Serves synthetic HTML pages at /page/<n> (each with images, links and meta
+tags) from a ThreadingHTTPServer on 127.0.0.1. An optional per-request
+delay simulates network latency. Pages carry ETag and Last-Modified
+headers and answer conditional requests with 304 unless validators are
+turned off; body bytes sent are counted in server.stats.
+
+/proxies/<n> is a fixture proxy list page: an HTML table of 100 ip:port
+rows, half of them shared with page n + 1, like the free proxy sites that
+get_proxy_list scrapes. Every GET is counted in server.stats["requests"].
+
+/images/<n>.jpg is a real 800x600 JPEG (made with Pillow on first request),
+for thumbnail benchmarks.
+
+/redirect/<n> answers 301 to /page/<n>, like a search hit that goes
+through a tracking hop or from http to https.
+
+/robots.txt is 404 unless the server is started with `robots` text. With
+`max_concurrent`, requests beyond that many at once are refused with 429
+and Retry-After: 1, like a rate-limiting site; they are counted in
+server.stats["throttled"].
+
+/ip answers like httpbin.org/ip ({"origin": <client ip>}), also when the
+request line carries an absolute URL, so the server doubles as a plain
+HTTP proxy for offline proxy-validation runs.
+
+    python benchmarks/local_site.py --port 8765 --delay 0.05
+"""
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+def render_page(n):
+    """Build a synthetic article page"""
+    links = "".join(f'<a href="/page/{n * 10 + i}" title="Link {i}">Related article {i}</a>' for i in range(20))
+    images = "".join(f'<img src="/static/{n}/{i}.jpg" alt="Image {i}">' for i in range(5))
+    paragraphs = "".join(f"<p>Paragraph {i} of synthetic page {n}. " + "Lorem ipsum dolor sit amet. " * 30 + "</p>"
+                         for i in range(15))
+    return f"""<!DOCTYPE html>
+<html><head>
+<title>Synthetic page {n}</title>
+<meta name="description" content="Description of synthetic page {n}">
+<meta name="keywords" content="synthetic, benchmark, page{n}">
+<meta property="og:title" content="OG page {n}">
+<meta name="twitter:card" content="summary">
+<link rel="canonical" href="/page/{n}">
+</head><body>
+<nav>Home About Contact Sign In</nav>
+<article><h1>Synthetic page {n}</h1>{images}{paragraphs}</article>
+<aside>{links}<a href="https://twitter.com/example">Follow us</a></aside>
+<footer>&copy; 2025 Example. Privacy Policy</footer>
+</body></html>"""
+
+
+def render_proxy_list(n, rows=100):
+    """Build a fixture proxy list page; rows overlap with the neighbouring page"""
+    body = "".join(f"<tr><td>10.{k // 65536 % 256}.{k // 256 % 256}.{k % 256}</td><td>{8000 + k % 1000}</td>"
+                   f"<td>US</td><td>elite proxy</td></tr>"
+                   for k in range(n * rows // 2, n * rows // 2 + rows))
+    # Some sites print ip:port in one cell, which is what the regex expects
+    text = " ".join(f"10.{k // 65536 % 256}.{k // 256 % 256}.{k % 256}:{8000 + k % 1000}"
+                    for k in range(n * rows // 2, n * rows // 2 + rows))
+    return f"""<!DOCTYPE html>
+<html><head><title>Free proxy list {n}</title></head><body>
+<table><tr><th>IP</th><th>Port</th><th>Country</th><th>Anonymity</th></tr>{body}</table>
+<textarea>{text}</textarea>
+</body></html>"""
+
+
+def render_image(n, size=(800, 600)):
+    """Build a JPEG photo stand-in: a gradient tinted by n"""
+    from io import BytesIO
+    from PIL import Image
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    img = Image.merge("RGB", (img.getchannel(0), img.getchannel(1).point(lambda v: (v + n * 37) % 256),
+                              img.getchannel(2).point(lambda v: 255 - v)))
+    buffer = BytesIO()
+    img.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+class LocalSiteHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    validators = True
+    robots = None
+    max_concurrent = None
+    stats = None
+    stats_lock = threading.Lock()
+
+    def do_GET(self):
+        if self.max_concurrent:
+            with self.stats_lock:
+                busy = self.stats["active"] >= self.max_concurrent
+                if not busy:
+                    self.stats["active"] += 1
+            if busy:
+                self._count("throttled", 1)
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            try:
+                self._serve()
+            finally:
+                self._count("active", -1)
+        else:
+            self._serve()
+
+    def _serve(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self._count("requests", 1)
+        if urlsplit(self.path).path == "/robots.txt":
+            self._send_robots()
+            return
+        if urlsplit(self.path).path == "/ip":
+            self._send_echo()
+            return
+        if self.path.startswith("/redirect/"):
+            self.send_response(301)
+            self.send_header("Location", "/page/" + self.path.rsplit("/", 1)[-1])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/page/"):
+            try:
+                n = int(self.path.rsplit("/", 1)[-1])
+            except ValueError:
+                n = 0
+            body = render_page(n).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        elif self.path.startswith("/proxies/"):
+            try:
+                n = int(urlsplit(self.path).path.rsplit("/", 1)[-1])
+            except ValueError:
+                n = 0
+            body = render_proxy_list(n).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        elif self.path.startswith("/images/"):
+            try:
+                n = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+            except ValueError:
+                n = 0
+            body = render_image(n)
+            content_type = "image/jpeg"
+        else:
+            body = b"\x89PNG placeholder"
+            content_type = "image/jpeg"
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.validators and (self.headers.get("If-None-Match") == etag or
+                                self.headers.get("If-Modified-Since") == LAST_MODIFIED):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self._count("not_modified", 1)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.validators:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(body)
+        self._count("bytes", len(body))
+
+    def _send_robots(self):
+        body = (self.robots or "").encode("utf-8")
+        self.send_response(200 if self.robots is not None else 404)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_echo(self):
+        body = json.dumps({"origin": self.client_address[0]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, key, amount):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf" if self.path.endswith(".pdf") else "text/html")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalSiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (cancelled checks, timeouts) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(port=0, delay=0.0, validators=True, robots=None, max_concurrent=None):
+    """
+    Start the stand-in server in a daemon thread.
+
+    Returns:
+        tuple: (server, base_url). Call server.shutdown() when done.
+    """
+    stats = {"bytes": 0, "not_modified": 0, "requests": 0, "throttled": 0, "active": 0}
+    handler = type("Handler", (LocalSiteHandler,), {"delay": delay, "validators": validators, "stats": stats,
+                                                    "robots": robots, "max_concurrent": max_concurrent,
+                                                    "stats_lock": threading.Lock()})
+    server = LocalSiteServer(("127.0.0.1", port), handler)
+    server.stats = stats
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server, base_url = start_server(args.port, args.delay)
+    print(f"[INFO] Serving synthetic pages at {base_url}/page/<n> (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
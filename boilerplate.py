@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import re
+
+
+BOILERPLATE_PATH = "database/boilerplate.json"
+
+# Navigation/footer phrases stripped from every page
+DEFAULT_PATTERNS = [
+    r'Skip to main content', r'Sign In', r'Subscribe', r'Log In', r'Privacy Policy',
+    r'© \d{4}', r'Search', r'Home', r'About', r'Contact', r'More', r'Follow us',
+    r'Terms of Use', r'Cookie Preferences', r'Netflix Shop', r'Top 10', r'Trending'
+]
+
+# Any whitespace run except a lone space, so already-clean text has no matches
+_WHITESPACE = re.compile(r'[^\S ]\s*| \s+')
+_REGEX_CHARS = re.compile(r'[\\.^$*+?{}\[\]|()]')
+
+
+def _replace(match):
+    # Leftover tags become a space so the words either side stay apart
+    return ' ' if match.lastgroup == 'tag' else ''
+
+
+def _build_regex(patterns):
+    """
+    One alternation for all patterns, meant to run on lowercased text.
+
+    Plain phrases are lowercased and grouped by first character, so the
+    regex engine can match case-sensitively (much faster than IGNORECASE)
+    and only tries the branches for the current character. Patterns with
+    regex syntax keep case-insensitive matching in a scoped (?i:...) group.
+    """
+    by_first = {}
+    alternatives = ['(?P<tag><[^>]+>)']
+    for pattern in patterns:
+        if _REGEX_CHARS.search(pattern):
+            alternatives.append(f'(?i:{pattern})')
+        elif pattern:
+            pattern = pattern.lower()
+            by_first.setdefault(pattern[0], []).append(re.escape(pattern[1:]))
+    for first, rests in by_first.items():
+        alternatives.append(f"{re.escape(first)}(?:{'|'.join(rests)})")
+    return re.compile('|'.join(alternatives))
+
+
+class BoilerplateStripper:
+    """
+    Removes leftover tags and boilerplate phrases from page text.
+
+    All patterns are compiled into one alternation, so the text is scanned
+    once for removals and once to collapse whitespace, no matter how many
+    patterns there are. Matching is case-insensitive. Domains can add their
+    own patterns; a domain entry also applies to its subdomains.
+
+    Config file format:
+        {"patterns": ["Sign In", ...],
+         "domains": {"netflix.com": ["Netflix Shop", "Top 10"]}}
+    "patterns" replaces DEFAULT_PATTERNS when present.
+    """
+
+    def __init__(self, patterns=None, domain_patterns=None):
+        self.patterns = list(DEFAULT_PATTERNS if patterns is None else patterns)
+        self.domain_patterns = {domain.lower(): list(p) for domain, p in (domain_patterns or {}).items()}
+        self._compiled = {}
+        # Compile up front so a bad pattern fails at load time, not mid-crawl
+        for domain in [None, *self.domain_patterns]:
+            self.regex_for(domain)
+
+    @classmethod
+    def from_file(cls, path=BOILERPLATE_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config.get('patterns'), config.get('domains'))
+
+    def _domain_key(self, domain):
+        """Most specific configured domain that `domain` falls under, or None"""
+        host = domain.lower().split(':')[0]
+        while host:
+            if host in self.domain_patterns:
+                return host
+            host = host.partition('.')[2]
+        return None
+
+    def regex_for(self, domain=None):
+        key = self._domain_key(domain) if domain and self.domain_patterns else None
+        regex = self._compiled.get(key)
+        if regex is None:
+            regex = self._compiled[key] = _build_regex(self.patterns + self.domain_patterns.get(key, []))
+        return regex
+
+    def clean(self, text, domain=None):
+        if not isinstance(text, str):
+            return ""
+        regex = self.regex_for(domain)
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            # Offsets line up, so match on the lowered copy and cut from the original
+            parts = []
+            pos = 0
+            for match in regex.finditer(lowered):
+                parts.append(text[pos:match.start()])
+                parts.append(_replace(match))
+                pos = match.end()
+            parts.append(text[pos:])
+            text = ''.join(parts)
+        else:
+            # A few characters (e.g. U+0130) grow when lowercased
+            text = re.compile(regex.pattern, re.IGNORECASE).sub(_replace, text)
+        return _WHITESPACE.sub(' ', text).strip()
+
+
+def load_stripper(path=BOILERPLATE_PATH):
+    """Stripper from `path` if it exists, otherwise the built-in patterns"""
+    if os.path.exists(path):
+        try:
+            stripper = BoilerplateStripper.from_file(path)
+            logging.info(f"Loaded boilerplate patterns from {path}")
+            return stripper
+        except (OSError, ValueError, re.error) as e:
+            logging.error(f"Invalid boilerplate config {path}: {str(e)}")
+    return BoilerplateStripper()
@@ -0,0 +1,218 @@
+import logging
+import os
+import platform
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+import webbrowser
+from urllib.parse import urlparse
+
+
+# Previews are off unless enabled here, from the GUI settings or with
+# WEBSCRAPER_BROWSER_PREVIEW=1
+PREVIEW_ENV_VAR = "WEBSCRAPER_BROWSER_PREVIEW"
+# Seconds a preview tab stays open, and minimum seconds between two previews
+PREVIEW_DWELL = 5
+PREVIEW_INTERVAL = 30
+# Pending previews beyond this are dropped rather than queued
+PREVIEW_QUEUE_SIZE = 10
+
+
+def open_close_url(url, timeout=5, opened_urls=None):
+    """
+    Open a URL in a web browser, wait for the specified time, and then close the browser tab.
+    Ensures that the same URL is not opened multiple times.
+    
+    Parameters:
+    - url: URL string to open
+    - timeout: Time in seconds to wait before closing (default: 5)
+    - opened_urls: Optional list to track opened URLs across multiple calls
+    
+    Returns:
+    - bool: True if URL was successfully opened and closed, False otherwise
+    """
+    # Initialize tracking list if not provided
+    if opened_urls is None:
+        opened_urls = []
+    
+    try:
+        # Validate URL format
+        if not isinstance(url, str):
+            logging.warning(f"Invalid URL type: {type(url).__name__}. Expected string.")
+            return False
+        
+        # More thorough URL validation
+        url = url.strip()
+        if not url:
+            logging.warning("Empty URL provided")
+            return False
+        
+        # Ensure URL has http/https scheme
+        if not url.startswith(("http://", "https://")):
+            # Try to fix URL by adding https:// prefix
+            logging.info(f"Adding https:// prefix to URL: {url}")
+            url = "https://" + url
+        
+        # Check URL format using regex (basic check)
+        url_pattern = re.compile(
+            r'^https?://'  # http:// or https://
+            r'([a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?\.)+[a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?'  # domain
+            r'(/[^\s]*)?$'  # optional path
+        )
+        
+        if not url_pattern.match(url):
+            logging.warning(f"Invalid URL format: {url}")
+            return False
+            
+        # Parse URL to check components
+        parsed = urlparse(url)
+        if not all([parsed.scheme, parsed.netloc]):
+            logging.warning(f"URL missing required components: {url}")
+            return False
+        
+        # Check for duplicates
+        if url in opened_urls:
+            logging.warning(f"Skipping duplicate URL: {url}")
+            return False
+        
+        # Open the URL in the default web browser
+        success = webbrowser.open(url)
+        if not success:
+            logging.error(f"Failed to open URL: {url}")
+            return False
+            
+        logging.info(f"Opened URL: {url}")
+        opened_urls.append(url)
+        
+        # Wait for specified timeout
+        logging.info(f"Waiting {timeout} seconds before closing...")
+        time.sleep(timeout)
+        
+        # Attempt to close the browser tab based on operating system
+        system = platform.system()
+        
+        try:
+            if system == "Windows":
+                # Send keyboard shortcut to close tab (Ctrl+W)
+                subprocess.run(['powershell', '-command', 
+                              '$wshell = New-Object -ComObject WScript.Shell; $wshell.SendKeys("^w")'])
+            elif system == "Darwin":  # macOS
+                # Send Command+W to close the active tab
+                subprocess.run(['osascript', '-e', 'tell application "System Events" to keystroke "w" using command down'])
+            elif system == "Linux":
+                # Send Ctrl+W using xdotool if available
+                if subprocess.run(['which', 'xdotool'], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode == 0:
+                    subprocess.run(['xdotool', 'key', 'ctrl+w'])
+                else:
+                    logging.warning("Cannot close tab: xdotool not installed on Linux")
+            
+            logging.info(f"Attempted to close URL: {url}")
+            return True
+            
+        except Exception as e:
+            logging.error(f"Error while trying to close tab: {str(e)}")
+            return False
+            
+    except Exception as e:
+        logging.error(f"Error processing URL: {str(e)}")
+        return False
+
+
+def has_display():
+    """False on Linux/BSD sessions without an X11 or Wayland display (servers, CI, SSH)"""
+    if sys.platform.startswith(("linux", "freebsd", "openbsd")):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+class BrowserPreviewQueue:
+    """
+    Opens crawled pages in the browser from a background thread.
+
+    Storage calls submit(), which never blocks: it drops the URL when
+    previews are disabled, when it was previewed before, or when the queue
+    is full. One daemon consumer opens at most one page per `min_interval`
+    seconds with open_close_url, so the crawl never waits on the browser.
+    """
+
+    def __init__(self, enabled=False, min_interval=PREVIEW_INTERVAL, dwell=PREVIEW_DWELL,
+                 max_pending=PREVIEW_QUEUE_SIZE, opener=None):
+        self.min_interval = min_interval
+        self.dwell = dwell
+        self.opener = opener or open_close_url
+        self.stats = {"queued": 0, "shown": 0, "dropped": 0}
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.enabled = False
+        self.configure(enabled)
+
+    def configure(self, enabled, min_interval=None):
+        """Turn previews on or off; on a machine without a display they stay off"""
+        if min_interval is not None:
+            self.min_interval = min_interval
+        if enabled and not has_display():
+            logging.warning("Browser previews requested but no display is available; leaving them disabled")
+            enabled = False
+        self.enabled = bool(enabled)
+        if not self.enabled:
+            self._drain()
+
+    def submit(self, url):
+        """Queue `url` for a preview; returns True if it was queued"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            if url in self._seen:
+                return False
+            try:
+                self._queue.put_nowait(url)
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+            self._seen.add(url)
+            self.stats["queued"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="browser-preview", daemon=True)
+                self._thread.start()
+        return True
+
+    def _drain(self):
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _run(self):
+        next_allowed = 0.0
+        while True:
+            url = self._queue.get()
+            wait = next_allowed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not self.enabled:
+                continue
+            next_allowed = time.monotonic() + self.min_interval
+            try:
+                if self.opener(url, self.dwell):
+                    self.stats["shown"] += 1
+            except Exception as e:
+                logging.error(f"Browser preview failed for {url}: {str(e)}")
+
+
+PREVIEW_QUEUE = BrowserPreviewQueue(enabled=os.environ.get(PREVIEW_ENV_VAR, "") not in ("", "0", "false"))
+
+
+def configure_preview(enabled, min_interval=None):
+    """Enable or disable the shared preview queue"""
+    PREVIEW_QUEUE.configure(enabled, min_interval)
+
+
+def preview_url(url):
+    """Hand `url` to the shared preview queue; a no-op while previews are disabled"""
+    return PREVIEW_QUEUE.submit(url)
@@ -0,0 +1,368 @@
+import heapq
+import itertools
+import logging
+import sqlite3
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+from html_extractor import FILE_EXTENSIONS
+from page_store import DB_PATH
+from url_index import clean_url, url_key
+
+
+# Pages one run of a crawl fetches, in all and from any one site
+MAX_FRONTIER_PAGES = 200
+MAX_PAGES_PER_DOMAIN = 50
+# URLs handed to the fetch engine ahead of those it is fetching; kept small
+# so links found meanwhile can still overtake lower-scored URLs
+FRONTIER_WINDOW = 16
+# Fetched pages between writes of the queue to the database
+SAVE_EVERY = 25
+# Share of a page's score its links inherit
+PARENT_SCORE_WEIGHT = 0.5
+
+FRONTIER_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS crawl_frontier (
+        crawl TEXT NOT NULL,
+        url TEXT NOT NULL,
+        depth INTEGER NOT NULL,
+        score REAL NOT NULL,
+        done INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (crawl, url)
+    ) WITHOUT ROWID
+"""
+
+
+def site_of(url):
+    """Host of a URL without a leading "www.\""""
+    try:
+        host = urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def link_score(url, text, terms):
+    """Relevance of a link to the query: 2 per term in its anchor text, 1 per term in its URL"""
+    text = (text or '').lower()
+    url = url.lower()
+    return float(sum(2 * (term in text) + (term in url) for term in terms))
+
+
+class CrawlFrontier:
+    """
+    The URLs a link-following crawl has still to fetch.
+
+    Entries are (depth, score, URL): start URLs have depth 0 and every link
+    followed adds one, up to `max_depth`. Each site (host without "www.")
+    has its own heap, ordered by depth and then by score, highest first.
+    pop() serves the sites with the shallowest entries in turn, taking the
+    best URL of each, so the crawl goes breadth-first, no site crowds out
+    the others and a site's most relevant pages are fetched first.
+
+    A link scores link_score() of its anchor text and URL against the query
+    `terms`, plus PARENT_SCORE_WEIGHT times the score of the page it is on.
+    Links are only followed to the start URLs' sites unless `offsite` is
+    true, and never to files.
+
+    URLs are deduplicated by url_key() and, through `url_index`, against
+    stored pages: a page fetched recently is not fetched again (unless
+    `refresh`), but its stored links are followed as if it had been. So
+    are those of a re-fetched page that turns out unchanged (add_stored).
+
+    `max_pages` and `max_pages_per_domain` bound the pages fetched per run.
+    Given a `name`, the queue is written through to the crawl_frontier
+    table, so a crawl that was stopped, ran out of budget or was killed
+    carries on from its queued URLs the next time a frontier of that name
+    is loaded. The rows are dropped once the crawl has run dry.
+
+    Thread-safe: the fetch engine reports pages from worker threads.
+    """
+
+    def __init__(self, terms=(), max_depth=1, max_pages=MAX_FRONTIER_PAGES,
+                 max_pages_per_domain=MAX_PAGES_PER_DOMAIN, url_index=None, refresh=False,
+                 offsite=False, name=None, db_path=DB_PATH):
+        self.terms = [term.lower() for term in terms]
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_pages_per_domain = max_pages_per_domain
+        self.url_index = url_index
+        self.refresh = refresh
+        self.offsite = offsite
+        self.name = name
+        self.db_path = db_path
+
+        self._heaps = defaultdict(list)      # site -> [(depth, -score, seq, url)]
+        self._levels = defaultdict(deque)    # depth -> sites whose best entry is that deep
+        self._filed = {}                     # site -> depth it is filed under
+        self._entries = {}                   # url -> (depth, score), queued or taken
+        self._seen = set()
+        self._sites = set()
+        self._taken = defaultdict(int)
+        self._in_flight = set()
+        self._seq = itertools.count()
+        self._unsaved = []
+        self._unsaved_done = []
+        self._cond = threading.Condition()
+        self.pending = 0
+        self.fetched = []
+        self.counts = {"links": 0, "fetched": 0, "expanded": 0}
+
+    def load(self):
+        """Pick up the queue a frontier of the same name left behind"""
+        if not self.name:
+            return self
+        queued = []
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute(FRONTIER_SCHEMA_SQL)
+            rows = conn.execute("SELECT url, depth, score, done FROM crawl_frontier WHERE crawl = ?",
+                                (self.name,)).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"Could not load crawl frontier '{self.name}': {str(e)}")
+            rows = []
+        finally:
+            conn.close()
+
+        done = 0
+        for url, depth, score, is_done in rows:
+            if depth == 0:
+                self._sites.add(site_of(url))
+            if is_done:
+                self._seen.add(url_key(url))
+                done += 1
+            else:
+                queued.append((url, depth, score))
+        if rows:
+            logging.info(f"Resuming crawl '{self.name}': {len(queued)} URLs queued, {done} already fetched")
+        self._expand(self._push(queued, saved=True))
+        return self
+
+    def add(self, urls, depth=0, score=0.0):
+        """Queue start URLs; their sites are the ones links are followed to"""
+        entries = []
+        for url in urls:
+            url = clean_url(url)
+            if url.startswith(('http://', 'https://')):
+                self._sites.add(site_of(url))
+                entries.append((url, depth, score))
+        self._expand(self._push(entries))
+
+    def add_links(self, url, links):
+        """Queue the links found on the page fetched for `url`, one level deeper"""
+        self._expand(self._push(self._link_entries(url, links)))
+
+    def add_stored(self, url):
+        """Queue the stored links of the page fetched for `url`, for a 304 or an unchanged body"""
+        entry = self._entries.get(url)
+        if entry is not None and entry[0] < self.max_depth:
+            self._expand([(url, *entry)])
+
+    def _link_entries(self, url, links):
+        """(url, depth, score) entries for the links on `url` worth following"""
+        parent = self._entries.get(url)
+        if parent is None or parent[0] >= self.max_depth:
+            return []
+        depth, parent_score = parent
+        entries = []
+        for link in links:
+            href = link.get('url') if isinstance(link, dict) else None
+            if not isinstance(href, str):
+                continue
+            href = clean_url(href)
+            if not href.startswith(('http://', 'https://')):
+                continue
+            if urlsplit(href).path.lower().endswith(FILE_EXTENSIONS):
+                continue
+            if not self.offsite and site_of(href) not in self._sites:
+                continue
+            text = f"{link.get('text') or ''} {link.get('title') or ''}"
+            score = link_score(href, text, self.terms) + PARENT_SCORE_WEIGHT * parent_score
+            entries.append((href, depth + 1, score))
+        return entries
+
+    def _push(self, entries, saved=False):
+        """Queue new entries; returns those skipped as recently fetched, to expand"""
+        stored = []
+        with self._cond:
+            for url, depth, score in entries:
+                key = url_key(url)
+                if depth > self.max_depth or key in self._seen:
+                    continue
+                self._seen.add(key)
+                if self.url_index is not None:
+                    fresh = []
+                    selected = self.url_index.select([url], refresh=self.refresh, fresh=fresh)
+                    if fresh and depth < self.max_depth:
+                        self._entries[fresh[0]] = (depth, score)
+                        stored.append((fresh[0], depth, score))
+                    if not selected:
+                        continue
+                    url = selected[0]
+                site = site_of(url)
+                self._entries[url] = (depth, score)
+                heapq.heappush(self._heaps[site], (depth, -score, next(self._seq), url))
+                self._file(site)
+                self.pending += 1
+                if not saved:
+                    self.counts["links"] += depth > 0
+                    if self.name:
+                        self._unsaved.append((self.name, url, depth, score))
+            self._cond.notify_all()
+        return stored
+
+    def _expand(self, stored, chunk_size=500):
+        """Follow the stored links of pages that are not being fetched again"""
+        while stored:
+            urls = [url for url, depth, score in stored]
+            pages = defaultdict(list)
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            try:
+                for start in range(0, len(urls), chunk_size):
+                    chunk = urls[start:start + chunk_size]
+                    rows = conn.execute(
+                        f"""SELECT pages.url, page_links.url, page_links.text, page_links.title
+                            FROM pages JOIN page_links ON page_links.page_id = pages.id
+                            WHERE pages.url IN ({', '.join('?' for _ in chunk)})
+                            ORDER BY page_links.page_id, page_links.position""", chunk)
+                    for url, href, text, title in rows:
+                        pages[url].append({'url': href, 'text': text, 'title': title})
+            except sqlite3.Error as e:
+                logging.error(f"Could not read stored links: {str(e)}")
+            finally:
+                conn.close()
+
+            entries = []
+            for url, links in pages.items():
+                entries.extend(self._link_entries(url, links))
+            with self._cond:
+                self.counts["expanded"] += len(pages)
+            stored = self._push(entries)
+
+    def _file(self, site):
+        """Put a site in the rotation of the depth of its best entry"""
+        heap = self._heaps[site]
+        if not heap or self._taken[site] >= self.max_pages_per_domain:
+            return
+        depth = heap[0][0]
+        if self._filed.get(site) != depth:
+            self._filed[site] = depth
+            self._levels[depth].append(site)
+
+    def pop(self, count):
+        """Take up to `count` URLs to fetch, within the page budgets"""
+        urls = []
+        with self._cond:
+            while len(urls) < count and len(self.fetched) + len(self._in_flight) < self.max_pages:
+                depth = next((d for d in sorted(self._levels) if self._levels[d]), None)
+                if depth is None:
+                    break
+                site = self._levels[depth].popleft()
+                if self._filed.get(site) != depth:
+                    continue
+                del self._filed[site]
+                heap = self._heaps[site]
+                if not heap or heap[0][0] != depth:
+                    self._file(site)
+                    continue
+                url = heapq.heappop(heap)[3]
+                self.pending -= 1
+                self._taken[site] += 1
+                self._in_flight.add(url)
+                urls.append(url)
+                self._file(site)
+        return urls
+
+    def done(self, url):
+        """Mark a URL taken by pop() as fetched (stored or failed)"""
+        with self._cond:
+            if url not in self._in_flight:
+                return
+            self._in_flight.discard(url)
+            self.fetched.append(url)
+            self.counts["fetched"] += 1
+            if self.name:
+                self._unsaved_done.append((self.name, url))
+                if len(self._unsaved_done) >= SAVE_EVERY:
+                    self.save()
+            self._cond.notify_all()
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    def feed(self, feed, window=FRONTIER_WINDOW, should_stop=None, on_batch=None):
+        """
+        Feed an AsyncFetchEngine.run_feed queue until the frontier runs dry,
+        the budget is spent or should_stop() returns true, keeping at most
+        `window` URLs in flight. `on_batch(urls)` is called before each batch
+        is queued, e.g. to load re-crawl validators. Blocks; run it in a
+        thread beside the crawl.
+        """
+        try:
+            while True:
+                with self._cond:
+                    urls = []
+                    while not (should_stop and should_stop()):
+                        urls = self.pop(window - len(self._in_flight))
+                        if urls or not self._in_flight:
+                            break
+                        # Pages in flight may still add links
+                        self._cond.wait(0.5)
+                if not urls:
+                    break
+                if on_batch:
+                    on_batch(urls)
+                feed.put(urls)
+        finally:
+            feed.put(None)
+
+    def save(self):
+        """Write queued and fetched URLs not yet in the crawl_frontier table"""
+        if not self.name:
+            return
+        with self._cond:
+            queued, self._unsaved = self._unsaved, []
+            done, self._unsaved_done = self._unsaved_done, []
+            if not queued and not done:
+                return
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=10)
+                try:
+                    with conn:
+                        conn.execute(FRONTIER_SCHEMA_SQL)
+                        conn.executemany(
+                            """INSERT INTO crawl_frontier (crawl, url, depth, score) VALUES (?, ?, ?, ?)
+                               ON CONFLICT(crawl, url) DO NOTHING""", queued)
+                        conn.executemany("UPDATE crawl_frontier SET done = 1 WHERE crawl = ? AND url = ?", done)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                logging.error(f"Could not save crawl frontier '{self.name}': {str(e)}")
+
+    def close(self):
+        """Save the queue for the next run, or drop it if the crawl has run dry"""
+        if not self.name:
+            return
+        with self._cond:
+            finished = not self.pending and not self._in_flight
+        if not finished:
+            self.save()
+            logging.info(f"Crawl '{self.name}' paused with {self.pending + self.in_flight} URLs queued")
+            return
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            try:
+                with conn:
+                    conn.execute(FRONTIER_SCHEMA_SQL)
+                    conn.execute("DELETE FROM crawl_frontier WHERE crawl = ?", (self.name,))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not clear crawl frontier '{self.name}': {str(e)}")
+
+    def summary(self):
+        return (f"{self.counts['fetched']} pages fetched up to depth {self.max_depth}, "
+                f"{self.counts['links']} links queued, {self.counts['expanded']} stored pages followed, "
+                f"{self.pending} left queued")
@@ -0,0 +1,240 @@
+import math
+import time
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+# Dark theme shared by every chart
+BACKGROUND = "#2b2b2b"
+FOREGROUND = "white"
+FIGURE_SIZE = (4, 3)
+FIGURE_DPI = 100
+# Shortest time between two chart redraws; refreshes in between are merged
+REFRESH_INTERVAL_MS = 500
+
+
+class Chart:
+    """
+    One dashboard figure, created once and updated in place.
+
+    update(data) takes a {label: value} dict. Nothing is redrawn when the
+    data is unchanged; when only the values changed the existing artists
+    are moved; the axes are rebuilt only when the labels change. Redraws
+    go through draw_idle, so Tk paints them once it is idle.
+
+    Figures are made with matplotlib.figure.Figure, not pyplot, so they
+    are not kept alive by pyplot's figure registry. With master=None the
+    chart renders off-screen (Agg), e.g. for benchmarks or exporting.
+    """
+
+    ylabel = None
+
+    def __init__(self, title, master=None):
+        self.title = title
+        self.figure = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI, facecolor=BACKGROUND)
+        self.ax = self.figure.add_subplot()
+        if master is None:
+            self.canvas = FigureCanvasAgg(self.figure)
+        else:
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.data = None
+        self.labels = None
+        self.draws = 0
+        self.rebuilds = 0
+
+    def prepare(self, data):
+        return dict(data)
+
+    def update(self, data):
+        """
+        Show new data.
+
+        Returns:
+            bool: False if the data was unchanged and nothing was redrawn.
+        """
+        data = self.prepare(data)
+        if data == self.data:
+            return False
+        labels = list(data)
+        if labels != self.labels:
+            self.ax.clear()
+            self.style()
+            self.build(labels)
+            self.labels = labels
+            self.rebuilds += 1
+        self.refresh(list(data.values()))
+        self.data = data
+        self.canvas.draw_idle()
+        self.draws += 1
+        return True
+
+    def style(self):
+        self.ax.set_facecolor(BACKGROUND)
+        self.ax.set_title(self.title, color=FOREGROUND)
+        for spine in self.ax.spines.values():
+            spine.set_color(FOREGROUND)
+        self.ax.tick_params(axis='x', colors=FOREGROUND)
+        self.ax.tick_params(axis='y', colors=FOREGROUND)
+        if self.ylabel:
+            self.ax.set_ylabel(self.ylabel, color=FOREGROUND)
+
+    def build(self, labels):
+        raise NotImplementedError
+
+    def refresh(self, values):
+        raise NotImplementedError
+
+    def set_ylimit(self, values):
+        self.ax.set_ylim(0, max(values, default=0) * 1.1 or 1)
+
+
+class PieChart(Chart):
+    """Donut chart with a percentage on each wedge and a legend"""
+
+    start_angle = 90
+    pct_distance = 0.6
+
+    def build(self, labels):
+        self.ax.set_xticks([])
+        self.ax.set_yticks([])
+        self.empty_text = self.ax.text(0.5, 0.5, "No data", ha='center', va='center', color=FOREGROUND,
+                                       transform=self.ax.transAxes)
+        self.wedges, self.pct_texts = [], []
+        if labels:
+            # Equal placeholder wedges; refresh() gives them their real angles
+            self.wedges, _, self.pct_texts = self.ax.pie(
+                [1] * len(labels), autopct='%1.1f%%', startangle=self.start_angle,
+                pctdistance=self.pct_distance, wedgeprops={'width': 0.5}
+            )
+            legend = self.ax.legend(self.wedges, labels, loc="center left", bbox_to_anchor=(1, 0, 0.5, 1),
+                                    facecolor=BACKGROUND)
+            for text in legend.get_texts():
+                text.set_color(FOREGROUND)
+            for text in self.pct_texts:
+                text.set_color(FOREGROUND)
+            # Room on the right for the legend
+            self.figure.subplots_adjust(left=0.02, right=0.68)
+
+    def refresh(self, values):
+        total = sum(values)
+        self.empty_text.set_visible(total <= 0)
+        angle = self.start_angle
+        for wedge, text, value in zip(self.wedges, self.pct_texts, values):
+            share = value / total if total > 0 else 0
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + 360 * share)
+            middle = math.radians(angle + 180 * share)
+            text.set_position((self.pct_distance * math.cos(middle), self.pct_distance * math.sin(middle)))
+            text.set_text(f"{share * 100:.1f}%")
+            wedge.set_visible(share > 0)
+            text.set_visible(share > 0)
+            angle += 360 * share
+
+
+class BarChart(Chart):
+    ylabel = 'Count'
+    color = '#1f6aa5'
+
+    def build(self, labels):
+        self.bars = self.ax.bar(range(len(labels)), [0] * len(labels), color=self.color)
+        self.ax.set_xticks(range(len(labels)))
+        self.ax.set_xticklabels(labels, rotation=45, ha='right')
+        self.figure.tight_layout()
+
+    def refresh(self, values):
+        for bar, value in zip(self.bars, values):
+            bar.set_height(value)
+        self.set_ylimit(values)
+
+
+class LineChart(Chart):
+    """Values over dates, oldest first"""
+
+    ylabel = 'Scrapes'
+    color = '#4CAF50'
+
+    def prepare(self, data):
+        return dict(sorted(data.items()))
+
+    def build(self, labels):
+        self.line, = self.ax.plot(range(len(labels)), [0] * len(labels), marker='o', linestyle='-',
+                                  color=self.color)
+        self.ax.set_xticks(range(len(labels)))
+        self.ax.set_xticklabels(labels, rotation=45, ha='right')
+        self.ax.set_xlim(-0.5, max(len(labels) - 0.5, 0.5))
+        self.figure.tight_layout()
+
+    def refresh(self, values):
+        self.line.set_ydata(values)
+        self.set_ylimit(values)
+
+
+# Dashboard panel title -> (chart class, key in the statistics dict, chart title)
+DASHBOARD_CHARTS = {
+    "Content Types Distribution": (PieChart, "content_types", "Content Types"),
+    "Top Domains": (BarChart, "domains", "Top Domains"),
+    "Scraping History": (LineChart, "scrape_history", "Daily Scrapes"),
+    "File Types Distribution": (PieChart, "file_types", "File Types"),
+}
+
+
+class DashboardCharts:
+    """
+    The dashboard's charts, fed from one statistics dict.
+
+    refresh(stats) redraws at most once per `interval_ms`: a refresh that
+    comes sooner is held back, and only the newest statistics are drawn
+    when the interval is over. `scheduler` is any Tk widget (its after()
+    and after_cancel() are used); without one every refresh is drawn at
+    once.
+
+    Parameters:
+        areas (dict): Panel title (a DASHBOARD_CHARTS key) -> Tk parent of
+                      its chart, or None to render off-screen.
+    """
+
+    def __init__(self, areas, scheduler=None, interval_ms=REFRESH_INTERVAL_MS):
+        self.charts = []
+        for name, master in areas.items():
+            chart_class, key, title = DASHBOARD_CHARTS[name]
+            self.charts.append((key, chart_class(title, master)))
+        self.scheduler = scheduler
+        self.interval = interval_ms / 1000
+        self.pending = None
+        self.timer = None
+        self.last_draw = None
+        self.stats = {"refreshes": 0, "flushes": 0, "draws": 0}
+
+    def refresh(self, stats):
+        self.stats["refreshes"] += 1
+        self.pending = stats
+        if self.timer is not None:
+            return
+        wait = 0 if self.last_draw is None else self.interval - (time.monotonic() - self.last_draw)
+        if wait <= 0 or self.scheduler is None:
+            self.flush()
+        else:
+            self.timer = self.scheduler.after(max(1, int(wait * 1000)), self.flush)
+
+    def flush(self):
+        """Draw the held-back statistics now"""
+        self.timer = None
+        stats, self.pending = self.pending, None
+        if stats is None:
+            return
+        self.last_draw = time.monotonic()
+        self.stats["flushes"] += 1
+        for key, chart in self.charts:
+            self.stats["draws"] += chart.update(stats.get(key) or {})
+
+    def close(self):
+        if self.timer is not None and self.scheduler is not None:
+            try:
+                self.scheduler.after_cancel(self.timer)
+            except Exception:
+                pass
+        self.timer = None
+        self.pending = None
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import queue
+import random
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+# Same retry policy as EnhancedContentSpider.custom_settings
+RETRY_HTTP_CODES = {500, 502, 503, 504, 522, 524, 408, 429}
+
+
+class AsyncFetchEngine:
+    """
+    asyncio/aiohttp fetch engine, an alternative to Scrapy's CrawlerProcess.
+
+    Every run() call gets a fresh event loop and HTTP session, so unlike the
+    Twisted reactor the engine can be started any number of times inside one
+    long-lived process (the GUI, batch runs, retries).
+
+    Responses are handed to `handler(url, status, content_type, html, headers)`
+    in a worker thread, which is where the shared extraction and storage code
+    runs; `headers` has lowercased names. Transport failures go to
+    `on_error(url, error)`, as do exceptions raised for a URL before its
+    handler runs; an exception in the handler is logged and counted as an
+    error. Either way only that URL fails, never the crawl. Items with a
+    'skipped' key (unchanged pages) count as skipped, not as pages.
+    `request_headers(url)` can add per-URL request headers, e.g.
+    If-None-Match for conditional re-crawls. Once `should_stop()` returns
+    true, URLs not yet started are skipped.
+
+    With a HostScheduler as `scheduler`, the fixed `per_domain` limit is
+    replaced by the scheduler's adaptive per-host limits. robots.txt is
+    fetched through the URL's proxy; URLs it disallows are counted and
+    handed to `on_disallowed(url)` instead of being fetched. Every attempt
+    waits for a slot from scheduler.acquire() and reports back to release().
+    One task per host waits on the scheduler at a time; the others queue
+    behind it.
+    """
+
+    def __init__(self, handler, on_error=None, concurrency=8, per_domain=4,
+                 timeout=30, retries=3, proxies=None, headers_factory=None, request_headers=None,
+                 should_stop=None, scheduler=None, on_disallowed=None):
+        self.handler = handler
+        self.on_error = on_error
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self.timeout = timeout
+        self.retries = retries
+        self.proxies = proxies or []
+        self.headers_factory = headers_factory
+        self.request_headers = request_headers
+        self.should_stop = should_stop
+        self.scheduler = scheduler
+        self.on_disallowed = on_disallowed
+        self.stats = {}
+
+    def run(self, urls):
+        """Crawl `urls` to completion and return the crawl stats"""
+        return asyncio.run(self.crawl(urls))
+
+    def run_feed(self, feed):
+        """
+        Crawl URLs as they arrive, in one session.
+
+        `feed` is a queue.Queue of URL lists, ended by None: each list is
+        started as soon as it is taken off the queue, while earlier ones
+        are still being fetched. Returns the crawl stats once every URL is
+        done.
+        """
+        return asyncio.run(self.crawl_feed(feed))
+
+    async def crawl(self, urls):
+        """Fetch all URLs with bounded global and per-domain concurrency"""
+        feed = queue.Queue()
+        feed.put(list(urls))
+        feed.put(None)
+        return await self.crawl_feed(feed)
+
+    async def crawl_feed(self, feed):
+        self.stats = {"pages": 0, "errors": 0, "skipped": 0, "disallowed": 0, "elapsed": 0.0, "pages_per_sec": 0.0}
+        self._global_slots = asyncio.Semaphore(self.concurrency)
+        self._domain_slots = defaultdict(lambda: asyncio.Semaphore(self.per_domain))
+        self._host_gates = defaultdict(asyncio.Lock)
+        self._robots_gates = defaultdict(asyncio.Lock)
+
+        start = time.perf_counter()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        per_host = self.scheduler.max_concurrency if self.scheduler else self.per_domain
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=per_host, ssl=False)
+        loop = asyncio.get_running_loop()
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            tasks = []
+            while True:
+                # Cheap when the whole list is already queued (crawl()); otherwise
+                # this waits in a thread while the queued fetches keep running
+                try:
+                    urls = feed.get_nowait()
+                except queue.Empty:
+                    urls = await loop.run_in_executor(None, feed.get)
+                if urls is None:
+                    break
+                tasks.extend(asyncio.ensure_future(self._fetch(session, url)) for url in urls)
+            await asyncio.gather(*tasks)
+
+        elapsed = time.perf_counter() - start
+        self.stats["elapsed"] = elapsed
+        self.stats["pages_per_sec"] = self.stats["pages"] / elapsed if elapsed else 0.0
+        logging.info(
+            f"Async crawl finished: {self.stats['pages']} pages, {self.stats['skipped']} skipped, "
+            f"{self.stats['errors']} errors "
+            f"in {elapsed:.2f}s ({self.stats['pages_per_sec']:.1f} pages/sec)"
+        )
+        return self.stats
+
+    async def _fetch(self, session, url):
+        """Fetch one URL and hand it on; an exception fails this URL, never the whole crawl"""
+        loop = asyncio.get_running_loop()
+        try:
+            response = await self._response(session, url)
+        except Exception as e:
+            logging.exception(f"Fetch failed for {url}")
+            self.stats["errors"] += 1
+            if self.on_error:
+                # Still reported, so callers can mark the URL done
+                try:
+                    await loop.run_in_executor(None, self.on_error, url, str(e) or type(e).__name__)
+                except Exception:
+                    logging.exception(f"Error callback failed for {url}")
+            return
+        if response is None:
+            return
+
+        status, content_type, html, headers = response
+        try:
+            item = await loop.run_in_executor(None, self.handler, url, status, content_type, html, headers)
+        except Exception:
+            logging.exception(f"Handler failed for {url}")
+            self.stats["errors"] += 1
+            return
+        if item and 'error' in item:
+            self.stats["errors"] += 1
+        elif item and 'skipped' in item:
+            self.stats["skipped"] += 1
+        else:
+            self.stats["pages"] += 1
+
+    async def _response(self, session, url):
+        if self.scheduler:
+            return await self._scheduled_fetch(session, url)
+        domain = urlparse(url).netloc
+        async with self._domain_slots[domain], self._global_slots:
+            if self.should_stop and self.should_stop():
+                self.stats["skipped"] += 1
+                return None
+            return await self._download(session, url, self._proxy_for(url))
+
+    async def _scheduled_fetch(self, session, url):
+        loop = asyncio.get_running_loop()
+        if self.should_stop and self.should_stop():
+            self.stats["skipped"] += 1
+            return None
+        proxy = self._proxy_for(url)
+        # The first URL of a host waits here while its robots.txt is fetched;
+        # the others wait on the gate rather than each holding a worker thread
+        async with self._robots_gates[urlparse(url).netloc]:
+            allowed = await loop.run_in_executor(None, self.scheduler.allowed, url, proxy)
+        if not allowed:
+            self.stats["disallowed"] += 1
+            if self.on_disallowed:
+                await loop.run_in_executor(None, self.on_disallowed, url)
+            return None
+        return await self._download(session, url, proxy)
+
+    async def _host_slot(self, url):
+        """
+        Wait for the scheduler's go-ahead for `url`, then for a global slot.
+        In that order, so URLs of a throttled host never hold global slots.
+        Returns False, holding nothing, once should_stop() is true.
+        """
+        async with self._host_gates[urlparse(url).netloc]:
+            while True:
+                if self.should_stop and self.should_stop():
+                    return False
+                delay = self.scheduler.acquire(url)
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+        await self._global_slots.acquire()
+        return True
+
+    def _proxy_for(self, url):
+        # Match the spider: proxies are only used for plain-http URLs
+        return random.choice(self.proxies) if self.proxies and not url.startswith('https://') else None
+
+    async def _download(self, session, url, proxy=None):
+        """Download a URL with retries; returns (status, content_type, html, headers) or None"""
+        headers = dict(self.headers_factory()) if self.headers_factory else {}
+        if self.request_headers:
+            headers.update(self.request_headers(url))
+
+        backoff = 0
+        for attempt in range(self.retries + 1):
+            if backoff:
+                await asyncio.sleep(backoff)
+            if self.scheduler and not await self._host_slot(url):
+                self.stats["skipped"] += 1
+                return None
+            started = time.perf_counter()
+            status = retry_after = None
+            try:
+                async with session.get(url, headers=headers or None, proxy=proxy) as resp:
+                    status = resp.status
+                    retry_after = resp.headers.get('retry-after')
+                    if resp.status in RETRY_HTTP_CODES and attempt < self.retries:
+                        logging.warning(f"Retrying {url} after status {resp.status} (attempt {attempt + 1})")
+                        backoff = 2 ** attempt
+                        continue
+                    body = await resp.read()
+                    try:
+                        html = body.decode(resp.charset or 'utf-8', errors='replace')
+                    except LookupError:
+                        html = body.decode('utf-8', errors='replace')
+                    response_headers = {name.lower(): value for name, value in resp.headers.items()}
+                    return resp.status, resp.headers.get('content-type', ''), html, response_headers
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = None
+                error = "Request timeout" if isinstance(e, asyncio.TimeoutError) else (str(e) or type(e).__name__)
+                if attempt < self.retries:
+                    logging.warning(f"Retrying {url} after error: {error} (attempt {attempt + 1})")
+                    backoff = 2 ** attempt
+                    continue
+                logging.error(f"Request failed for {url}: {error}")
+                self.stats["errors"] += 1
+                if self.on_error:
+                    await asyncio.get_running_loop().run_in_executor(None, self.on_error, url, error)
+                return None
+
+            finally:
+                if self.scheduler:
+                    self._global_slots.release()
+                    self.scheduler.release(url, status, time.perf_counter() - started, retry_after)
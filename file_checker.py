@@ -0,0 +1,142 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+
+
+def is_downloadable(content_type):
+    downloadable_types = [
+        'application/pdf', 'application/msword', 'application/vnd.ms-excel',
+        'application/zip', 'application/x-rar-compressed', 'application/octet-stream'
+    ]
+    return any(dtype in content_type.lower() for dtype in downloadable_types)
+
+
+class FileCheckCache:
+    """Thread-safe URL -> downloadable? cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl=6 * 3600):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Return True/False for a fresh entry, or None if unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            ok, checked_at = entry
+            if time.monotonic() - checked_at > self.ttl:
+                del self._entries[url]
+                return None
+            return ok
+
+    def set(self, url, ok):
+        with self._lock:
+            self._entries[url] = (ok, time.monotonic())
+
+
+# Shared across crawls in the same process, so a file linked from many
+# pages (or many runs) is only checked once per TTL
+FILE_CHECK_CACHE = FileCheckCache()
+
+
+class FileLinkChecker:
+    """
+    Validates candidate file links with HEAD requests on a bounded worker pool.
+
+    Pages are stored straight away with the files already known (embedded
+    viewers and cached results); links that still need a HEAD check are
+    queued, and once every check for a page finishes its `files` column is
+    back-filled through the PageWriter. Identical links that are in flight
+    at the same time share one request.
+    """
+
+    def __init__(self, writer, cache=FILE_CHECK_CACHE, max_workers=8, timeout=5, headers_factory=None):
+        self.writer = writer
+        self.cache = cache
+        self.timeout = timeout
+        self.headers_factory = headers_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="file-check")
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def split_cached(self, files, candidates):
+        """
+        Resolve what the cache already knows about a page's file links.
+
+        Parameters:
+            files (list): File dicts already known to be valid.
+            candidates (list): (href, title) tuples that need a HEAD check.
+
+        Returns:
+            tuple: (files known right now, (href, title) pairs still to check).
+        """
+        files = list(files)
+        pending = []
+        seen = set()
+        for href, title in candidates:
+            if href in seen:
+                continue
+            seen.add(href)
+            cached = self.cache.get(href)
+            if cached is None:
+                pending.append((href, title))
+            elif cached:
+                files.append({'url': href, 'title': title})
+        return files, pending
+
+    def submit_page(self, page_url, files, pending):
+        """
+        Queue HEAD checks for a page that has already been handed to the writer.
+
+        When the last check finishes, the page's files column is back-filled
+        with `files` plus every pending link that turned out to be downloadable.
+        """
+        if not pending:
+            return
+        state = {'files': list(files), 'known': len(files), 'remaining': len(pending)}
+        for href, title in pending:
+            future = self._submit(href)
+            future.add_done_callback(partial(self._on_checked, page_url, state, href, title))
+
+    def _submit(self, href):
+        with self._lock:
+            future = self._inflight.get(href)
+            if future is None:
+                future = self._executor.submit(self._head, href)
+                self._inflight[href] = future
+            return future
+
+    def _head(self, href):
+        try:
+            headers = self.headers_factory() if self.headers_factory else None
+            head = requests.head(href, headers=headers, timeout=self.timeout, allow_redirects=True)
+            ok = is_downloadable(head.headers.get('content-type', ''))
+            self.cache.set(href, ok)
+        except Exception as e:
+            # Not cached: a timeout or reset says nothing about the link, the next page retries it
+            logging.warning(f"Failed to HEAD-check file link: {href} – {str(e)}")
+            ok = False
+        with self._lock:
+            self._inflight.pop(href, None)
+        return ok
+
+    def _on_checked(self, page_url, state, href, title, future):
+        ok = future.result()
+        with self._lock:
+            if ok:
+                state['files'].append({'url': href, 'title': title})
+            state['remaining'] -= 1
+            done = state['remaining'] == 0
+        if done and len(state['files']) > state['known']:
+            self.writer.update_files(page_url, json.dumps(state['files']))
+
+    def close(self, wait=True):
+        """Stop accepting checks; by default wait for queued ones to back-fill"""
+        self._executor.shutdown(wait=wait)
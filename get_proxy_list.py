@@ -1,9 +1,14 @@
-import requests
+import asyncio
+import contextlib
+import json
+import os
+import aiohttp
 import colorama
 from colorama import Fore, Style
 import re
 import random
 import time
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
 
 
@@ -36,6 +41,19 @@ PROXY_URLS = [
 # Path to save proxies
 PROXY_FILE = "database/proxies.txt"
 
+# Proxies found per source site; a site is not scraped again within SOURCE_CACHE_TTL seconds
+SOURCE_CACHE_FILE = "database/proxy_sources.json"
+SOURCE_CACHE_TTL = 60 * 60
+
+# Sources are fetched concurrently; requests to the same host are made one
+# at a time with a random pause (seconds) in between
+FETCH_CONCURRENCY = 10
+FETCH_TIMEOUT = 15
+HOST_DELAY = (2, 4)
+
+# IP:Port
+PROXY_PATTERN = re.compile(r"(\d{1,3}(?:\.\d{1,3}){3}):(\d+)")
+
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -45,74 +63,178 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
 ]
 
-def fetch_proxies_with_regex(limit=None):
+
+def load_source_cache(path=SOURCE_CACHE_FILE):
+    """Per-source cache: {url: {"fetched": unix time, "proxies": [...]}}"""
+    try:
+        with open(path, "r") as file:
+            cache = json.load(file)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_source_cache(cache, path=SOURCE_CACHE_FILE):
+    try:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(cache, file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[ERROR] Could not save proxy source cache: {e}")
+
+
+class HostThrottle:
+    """Lets one request per host through at a time, pausing `delay` seconds between them"""
+
+    def __init__(self, delay=HOST_DELAY):
+        self.delay = delay
+        self._locks = {}
+        self._next_allowed = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host):
+        loop = asyncio.get_running_loop()
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            wait = self._next_allowed.get(host, 0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                yield
+            finally:
+                self._next_allowed[host] = loop.time() + random.uniform(*self.delay)
+
+
+async def fetch_source(session, url, throttle, semaphore, timeout=FETCH_TIMEOUT):
+    """Download one proxy list page; returns (url, text), text is None on failure"""
+    # Add a random query parameter to bypass caching
+    random_query = f"?nocache={int(time.time())}_{random.randint(1, 1000)}"
+    headers = {
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept": "text/html,application/xhtml+xml,application/xml",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Cache-Control": "no-cache",
+        "Pragma": "no-cache",
+        "Referer": "https://www.google.com/"
+    }
+    async with throttle.slot(urlsplit(url).netloc), semaphore:
+        print(f"[INFO] Trying to fetch from {url}...")
+        try:
+            async with session.get(url + random_query, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                return url, await response.text(errors="replace")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[ERROR] Failed to fetch from {url}: {e or 'timed out'}")
+            return url, None
+
+
+async def fetch_sources_async(urls, limit=None, cache=None, max_age=SOURCE_CACHE_TTL,
+                              concurrency=FETCH_CONCURRENCY, timeout=FETCH_TIMEOUT, host_delay=None):
+    """
+    Collect unique proxies from `urls`, cached sources first.
+
+    Proxies are deduplicated as each page arrives; once `limit` unique
+    proxies are known the remaining downloads are cancelled. Freshly
+    scraped sources are written into `cache`.
+
+    Returns:
+        tuple: (list of "ip:port" in discovery order, number of sites that yielded proxies)
+    """
+    cache = {} if cache is None else cache
+    unique = {}
+    successful_sites = 0
+
+    def collect(proxies):
+        for proxy in proxies:
+            unique.setdefault(proxy)
+            if limit is not None and len(unique) >= limit:
+                return True
+        return False
+
+    now = time.time()
+    pending = []
+    for url in dict.fromkeys(urls):
+        entry = cache.get(url)
+        if max_age and entry and now - entry.get("fetched", 0) < max_age:
+            print(f"[INFO] Using {len(entry['proxies'])} cached proxies from {url}")
+            successful_sites += bool(entry["proxies"])
+            if collect(entry["proxies"]):
+                return list(unique), successful_sites
+        else:
+            pending.append(url)
+
+    throttle = HostThrottle(host_delay or HOST_DELAY)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession() as session:
+        tasks = [asyncio.ensure_future(fetch_source(session, url, throttle, semaphore, timeout)) for url in pending]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                url, text = await next_page
+                if text is None:
+                    continue
+                found = list(dict.fromkeys(f"{ip}:{port}" for ip, port in PROXY_PATTERN.findall(text)))
+                cache[url] = {"fetched": time.time(), "proxies": found}
+                if not found:
+                    print(f"[WARNING] No proxies found on {url}")
+                    continue
+                print(f"[SUCCESS] Found {len(found)} proxies from {url}")
+                successful_sites += 1
+                if collect(found):
+                    print(f"[INFO] Reached {limit} unique proxies; cancelling remaining sources")
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return list(unique), successful_sites
+
+
+def fetch_proxies_with_regex(limit=None, max_age=SOURCE_CACHE_TTL, sources=None,
+                             proxy_file=PROXY_FILE, cache_file=SOURCE_CACHE_FILE):
     """
     Fetch the latest proxy list from multiple proxy sites using regular expressions and save to a file.
+
+    Sites are fetched concurrently (one request at a time per host) and a
+    site scraped less than `max_age` seconds ago is served from the source
+    cache instead (max_age=0 always re-scrapes).
+
+    Parameters:
+        limit (int): Stop after this many unique proxies.
+        max_age (int): Source cache window in seconds.
+        sources (list): Proxy list pages; defaults to PROXY_URLS.
+
+    Returns:
+        list: The saved "ip:port" proxies.
     """
     print("[INFO] Fetching latest proxies using regex...")
-    
-    proxies_found = []
-    successful_sites = 0
+    start_time = time.perf_counter()
 
     try:
-        for url in PROXY_URLS:  # Note: Using PROXY_URLS (plural) instead of PROXY_URL
-            try:
-                # Add a random query parameter to bypass caching
-                random_query = f"?nocache={int(time.time())}_{random.randint(1, 1000)}"
-                url_with_query = url + random_query  # Use url from the loop, not PROXY_URL
-
-                headers = {
-                    "User-Agent": random.choice(USER_AGENTS),
-                    "Accept": "text/html,application/xhtml+xml,application/xml",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Cache-Control": "no-cache",
-                    "Pragma": "no-cache",
-                    "Referer": "https://www.google.com/"
-                }
-                
-                print(f"[INFO] Trying to fetch from {url}...")
-                response = requests.get(url_with_query, headers=headers, timeout=15)
-                response.raise_for_status()
+        cache = load_source_cache(cache_file)
+        unique_proxies, successful_sites = asyncio.run(
+            fetch_sources_async(sources or PROXY_URLS, limit, cache, max_age))
+        save_source_cache(cache, cache_file)
 
-                # Regular expression to match IP:Port format
-                proxy_pattern = r"(\d{1,3}(?:\.\d{1,3}){3}):(\d+)"
-                found = re.findall(proxy_pattern, response.text)
-                
-                if found:
-                    print(f"[SUCCESS] Found {len(found)} proxies from {url}")
-                    proxies_found.extend(found)
-                    successful_sites += 1
-                else:
-                    print(f"[WARNING] No proxies found on {url}")
-                    
-                # Add a delay between requests to avoid getting blocked
-                time.sleep(random.uniform(2, 4))
-                
-            except requests.exceptions.RequestException as e:
-                print(f"[ERROR] Failed to fetch from {url}: {e}")
-                continue
-        
-        if not proxies_found:
+        if not unique_proxies:
             print("[WARNING] No proxies found from any source.")
-            return
-        
-        # Remove duplicates
-        unique_proxies = list(set([f"{p[0]}:{p[1]}" for p in proxies_found]))
-        print(f"[INFO] Found {len(unique_proxies)} unique proxies from {successful_sites} sites")
-        
-        # Apply the limit if specified
-        if limit is not None:
-            unique_proxies = unique_proxies[:limit]
-        
+            return []
+
+        print(f"[INFO] Found {len(unique_proxies)} unique proxies from {successful_sites} sites "
+              f"in {time.perf_counter() - start_time:.1f} sec")
+
         # Save proxies to a file
-        with open(PROXY_FILE, "w") as file:
+        with open(proxy_file, "w") as file:
             for proxy in unique_proxies:
                 file.write(f"{proxy}\n")
-        
-        print(f"[SUCCESS] Saved {len(unique_proxies)} proxies to {PROXY_FILE}")
+
+        print(f"[SUCCESS] Saved {len(unique_proxies)} proxies to {proxy_file}")
+        return unique_proxies
 
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
+        return []
 
 if __name__ == "__main__":
-    fetch_proxies_with_regex()
\ No newline at end of file
+    fetch_proxies_with_regex()
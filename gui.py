@@ -4,16 +4,13 @@ import customtkinter as ctk
 import threading
 import os
 import json
-from PIL import Image, ImageTk, ImageOps, ImageDraw
+from PIL import Image, ImageTk, ImageDraw
 import requests
-from io import BytesIO
 import webbrowser
 import time
 from tkinter import messagebox
 import csv
 import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib
 matplotlib.use("TkAgg")
 from collections import Counter, defaultdict
@@ -25,6 +22,19 @@ import logging
 import sys
 import subprocess
 
+from browser_preview import configure_preview
+from query_cache import QUERY_CACHE, configure_query_cache
+from search_backend import SEARCH_CACHE
+from thumbnail_cache import DEFAULT_CACHE_LIMIT_MB, ThumbnailCache, ThumbnailLoader
+from result_view import VirtualResultList
+from dashboard_charts import DashboardCharts
+from result_sink import get_result_sink, legacy_dumps, load_legacy_dump, load_results
+
+# Columns the result views need from query_pages, and the longest text preview shown
+RESULT_VIEW_COLUMNS = ['id', 'url', 'title', 'snippet', 'preview', 'timestamp',
+                       'image_count', 'video_count', 'file_count', 'thumbnails']
+RESULT_PREVIEW_CHARS = 800
+
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
@@ -94,7 +104,9 @@ class WebScraperGUI(ctk.CTk):
             "auto_save": True,
             "notifications": True,
             "thumbnail_size": 200,
-            "default_exports_folder": "database/exports"
+            "default_exports_folder": "database/exports",
+            "browser_preview": False,
+            "search_disk_cache": True
         }
         
         # Content type checkboxes will be created in create_filters
@@ -108,6 +120,15 @@ class WebScraperGUI(ctk.CTk):
         
         # Load settings
         self.load_settings()
+        configure_preview(self.settings.get("browser_preview", False))
+        configure_query_cache(self.settings.get("search_disk_cache", True))
+
+        # Thumbnails are fetched and resized off the Tk thread, through a disk cache
+        self.thumbnail_loader = ThumbnailLoader(ThumbnailCache(
+            limit_mb=self.settings.get("cache_limit_mb", DEFAULT_CACHE_LIMIT_MB),
+            auto_evict=self.settings.get("auto_clear_cache", True)
+        ))
+        self.placeholder_images = {}
         
         # Create interface components
         self.create_sidebar()
@@ -371,7 +392,7 @@ class WebScraperGUI(ctk.CTk):
         # letest scrape result see button        
         ctk.CTkButton(
             self.sidebar,
-            text="📂 Open Latest Scrape File",
+            text="📂 Open Latest Results",
             command=self.open_latest_scrape_file,
             fg_color="#607d8b",
             hover_color="#455a64",
@@ -622,9 +643,9 @@ class WebScraperGUI(ctk.CTk):
         )
         self.stats_label.pack(side="right", padx=10)
         
-        # Results area
-        self.results_canvas = ctk.CTkScrollableFrame(self.results_tab)
-        self.results_canvas.pack(fill="both", expand=True)
+        # Results area: only the rows on screen get widgets
+        self.result_list = VirtualResultList(self.results_tab, self, mode=self.view_toggle_var.get())
+        self.result_list.pack(fill="both", expand=True)
         
         # Dashboard Tab with analytics
         self.dashboard_tab = self.tabs.add("📊 Dashboard")
@@ -707,17 +728,29 @@ class WebScraperGUI(ctk.CTk):
 
     def toggle_view_mode(self, mode):
         """Toggle between different result view modes"""
-        self.clear_results()
-        
-        if self.current_results:
-            for result in self.current_results:
-                self.display_result(result)
+        self.result_list.set_mode(mode)
             
     def clear_logs(self):
         """Clear the logs display"""
         self.logs_text.delete("1.0", "end")
         self.log_message("Logs cleared")
         
+    def log_crawl_stats(self, stats):
+        """Log how many pages a crawl stored vs skipped as unchanged"""
+        if not stats:
+            return
+        skipped = stats.get('not_modified', 0) + stats.get('unchanged', 0)
+        self.log_message(
+            f"Crawl: {stats.get('new', 0)} new, {stats.get('changed', 0)} changed, "
+            f"{skipped} unchanged pages skipped; {stats.get('fresh', 0)} recently fetched and "
+            f"{stats.get('duplicates', 0)} duplicate URLs not fetched", "INFO"
+        )
+        if 'links' in stats:
+            self.log_message(
+                f"Links followed: {stats['fetched']} pages fetched, {stats['links']} links queued, "
+                f"{stats['expanded']} stored pages' links reused", "INFO"
+            )
+
     def log_message(self, message, level="INFO"):
         """Add a message to the logs with timestamp and level"""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -804,6 +837,12 @@ class WebScraperGUI(ctk.CTk):
             chart_area.pack(fill="both", expand=True, padx=10, pady=10)
             
             self.chart_frames.append({"frame": frame, "title": title, "area": chart_area})
+
+        # The figures are made once here; update_dashboard only feeds them new data
+        self.dashboard_charts = DashboardCharts(
+            {chart_frame["title"]: chart_frame["area"] for chart_frame in self.chart_frames},
+            scheduler=self
+        )
     
     def create_stat_card(self, parent, data):
         """Create a statistics card for dashboard"""
@@ -900,6 +939,18 @@ class WebScraperGUI(ctk.CTk):
                         "text": "Use System Proxy",
                         "variable": "use_proxy",
                         "default": False
+                    },
+                    {
+                        "type": "switch",
+                        "text": "Preview Scraped Pages in Browser",
+                        "variable": "browser_preview",
+                        "default": False
+                    },
+                    {
+                        "type": "switch",
+                        "text": "Keep Search Results in Disk Cache",
+                        "variable": "search_disk_cache",
+                        "default": True
                     }
                 ]
             },
@@ -1312,9 +1363,10 @@ class WebScraperGUI(ctk.CTk):
         try:
             # Import database module
             from webscraper_o2 import query_database
+            from result_sink import NullSink
             
-            # Run a simple query to test connection
-            results = query_database(limit=1)
+            # Run a simple query to test connection (not recorded in the history)
+            results = query_database(limit=1, sink=NullSink())
             
             if results:
                 self.log_message("Database connection refreshed successfully", "INFO")
@@ -1324,14 +1376,36 @@ class WebScraperGUI(ctk.CTk):
             self.log_message(f"Error reconnecting to database: {str(e)}", "ERROR")
             raise e
 
-    def create_thumbnail(self, url, size=(200, 200)):
-        try:
-            response = requests.get(url, timeout=5)
-            img = Image.open(BytesIO(response.content))
-            img = ImageOps.fit(img, size, Image.LANCZOS)
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            return self.create_placeholder_image(f"⚠️ Image Error", size)
+    def load_thumbnail(self, label, url, size=(200, 200)):
+        """
+        Show a placeholder in `label` now, swapped for the thumbnail of `url`
+        once a worker has fetched and resized it (or found it in the cache).
+        """
+        placeholder = self.cached_placeholder("Loading...", size)
+        label.configure(image=placeholder)
+        label.image = placeholder
+        label.thumbnail_url = url
+        self.thumbnail_loader.request(
+            url, size, lambda img: self.after(0, lambda: self.swap_thumbnail(label, url, img, size))
+        )
+
+    def swap_thumbnail(self, label, url, img, size):
+        """Show a loaded thumbnail (None if loading failed) in its placeholder label"""
+        if not label.winfo_exists() or getattr(label, "thumbnail_url", None) != url:
+            # The label was destroyed, or recycled for another result, while the image loaded
+            return
+        if img is None:
+            photo = self.cached_placeholder("⚠️ Image Error", size)
+        else:
+            photo = ImageTk.PhotoImage(img)
+        label.configure(image=photo)
+        label.image = photo
+
+    def cached_placeholder(self, text, size):
+        key = (text, tuple(size))
+        if key not in self.placeholder_images:
+            self.placeholder_images[key] = self.create_placeholder_image(text, size)
+        return self.placeholder_images[key]
 
     def create_placeholder_image(self, text, size=(200, 200)):
         img = Image.new("RGB", size, "#2b2b2b")
@@ -1339,399 +1413,49 @@ class WebScraperGUI(ctk.CTk):
         draw.text((10, 80), text, fill="white")
         return ImageTk.PhotoImage(img)
 
+    def search_results(self, search_terms, content_type, limit):
+        """
+        Search the database for the results panel: only the columns the
+        result views show, with the page text cut to a preview in SQL.
+        """
+        from webscraper_o2 import query_pages
+
+        page = query_pages(
+            search_terms=search_terms,
+            columns=RESULT_VIEW_COLUMNS,
+            content_type=content_type,
+            limit=limit,
+            preview_chars=RESULT_PREVIEW_CHARS + 1  # one extra to tell whether the text was cut
+        )
+        self.log_message(QUERY_CACHE.summary(), "INFO")
+        return page["rows"]
+
+    def result_images(self, result):
+        """Image URLs of a result, from query_pages thumbnails or a full row's images JSON"""
+        if result.get('thumbnails') is not None:
+            return json.loads(result['thumbnails'])
+        return [image['src'] for image in json.loads(result.get('images') or '[]')]
+
+    def result_count(self, result, kind):
+        """Number of images/videos/files on a result page"""
+        count = result.get(f"{kind}_count")
+        if count is None:
+            count = len(json.loads(result.get(f"{kind}s") or '[]'))
+        return count
+
+    def result_preview(self, result, length, prefer="preview"):
+        """Up to `length` characters of the page text, with "..." if it was cut"""
+        text = result.get(prefer) or result.get('preview') or result.get('body_content') or ''
+        return text[:length] + "..." if len(text) > length else text
+
     def display_result(self, result):
-        view_mode = self.view_toggle_var.get()
-        
-        if view_mode == "List":
-            self._display_result_list(result)
-        elif view_mode == "Grid":
-            self._display_result_grid(result)
-        else:  # Cards
-            self._display_result_card(result)
-    
-    def _display_result_list(self, result):
-        """Display result in list view (compact)"""
-        result_frame = ctk.CTkFrame(self.results_canvas, corner_radius=10)
-        result_frame.pack(fill="x", pady=5, padx=5)
-        
-        # Main content
-        main_frame = ctk.CTkFrame(result_frame, fg_color="transparent")
-        main_frame.pack(fill="x", padx=10, pady=10)
-        
-        # Try to get first image for thumbnail
-        thumbnail_frame = ctk.CTkFrame(main_frame, width=80, height=80, fg_color="transparent")
-        thumbnail_frame.pack(side="left", padx=(0, 15))
-        
-        # Get first image if available
-        images = json.loads(result['images'])
-        if images:
-            try:
-                thumbnail = self.create_thumbnail(images[0]['src'])
-                if thumbnail:
-                    img_label = ctk.CTkLabel(thumbnail_frame, image=thumbnail, text="")
-                    img_label.image = thumbnail
-                    self.image_references.append(thumbnail)
-                    img_label.pack(fill="both", expand=True)
-            except Exception:
-                # Fallback icon if image fails
-                ctk.CTkLabel(thumbnail_frame, text="🌐", font=("Arial", 30)).pack(pady=20)
-        else:
-            # No image available
-            ctk.CTkLabel(thumbnail_frame, text="🌐", font=("Arial", 30)).pack(pady=20)
-        
-        # Text content
-        text_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        text_frame.pack(side="left", fill="both", expand=True)
-        
-        # Title with "open in browser" icon button
-        title_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
-        title_frame.pack(fill="x")
-        
-        title_label = ctk.CTkLabel(
-            title_frame, 
-            text=result['title'], 
-            font=("Arial", 16, "bold"),
-            anchor="w")
-        title_label.pack(side="left", fill="x", expand=True)
-        
-        # URL label
-        url_label = ctk.CTkLabel(
-            text_frame,
-            text=result['url'],
-            font=("Arial", 12),
-            text_color="gray",
-            anchor="w"
-        )
-        url_label.pack(anchor="w", pady=(2, 5))
-        
-        # Text preview
-        text_preview = result['body_content'][:200] + "..." if len(result['body_content']) > 200 else result['body_content']
-        preview_label = ctk.CTkLabel(
-            text_frame, 
-            text=text_preview, 
-            wraplength=800,
-            font=("Arial", 13),
-            anchor="w",
-            justify="left")
-        preview_label.pack(anchor="w", fill="x")
-        
-        # Bottom info bar
-        info_frame = ctk.CTkFrame(result_frame, fg_color=self.colors["card_bg"])
-        info_frame.pack(fill="x")
-        
-        # Metadata items
-        metadata_items = [
-            f"🔗 {urlparse(result['url']).netloc}",
-            f"🕒 {result['timestamp']}",
-            f"🖼️ {len(json.loads(result['images']))}",
-            f"🎥 {len(json.loads(result['videos']))}",
-            f"📁 {len(json.loads(result['files']))}"
-        ]
-        
-        for item in metadata_items:
-            ctk.CTkLabel(
-                info_frame,
-                text=item,
-                font=("Arial", 12),
-                padx=5
-            ).pack(side="left", padx=5)
-        
-        # Action buttons
-        action_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
-        action_frame.pack(side="right")
-        
-        # Open button
-        open_btn = ctk.CTkButton(
-            action_frame,
-            text="Open",
-            command=lambda url=result['url']: webbrowser.open(url),
-            width=70,
-            height=24,
-            font=("Arial", 12)
-        )
-        open_btn.pack(side="left", padx=(0, 5))
-        
-        # Save button
-        save_btn = ctk.CTkButton(
-            action_frame,
-            text="Save",
-            command=lambda r=result: self.save_single_result(r),
-            width=70,
-            height=24,
-            fg_color=self.colors["secondary"],
-            font=("Arial", 12)
-        )
-        save_btn.pack(side="left", padx=5)
-    
-    def _display_result_grid(self, result):
-        """Display result in grid view (image-focused)"""
-        # Create a frame for this grid item - set fixed width for grid layout
-        if not hasattr(self, 'grid_container'):
-            # Create a container for the grid layout
-            self.grid_container = ctk.CTkFrame(self.results_canvas, fg_color="transparent")
-            self.grid_container.pack(fill="both", expand=True)
-            
-            # Initialize rows for grid layout
-            self.current_grid_row = None
-            self.grid_items_in_row = 0
-            self.max_grid_items_per_row = 3
-        
-        # Check if we need a new row
-        if self.grid_items_in_row == 0 or self.grid_items_in_row >= self.max_grid_items_per_row:
-            self.current_grid_row = ctk.CTkFrame(self.grid_container, fg_color="transparent")
-            self.current_grid_row.pack(fill="x", pady=5)
-            self.grid_items_in_row = 0
-        
-        # Create the grid item
-        grid_item = ctk.CTkFrame(self.current_grid_row, width=240, height=300, corner_radius=10)
-        grid_item.pack(side="left", padx=5, pady=5)
-        grid_item.pack_propagate(False)  # Prevent the frame from shrinking
-        
-        # Image container (fixed height)
-        img_container = ctk.CTkFrame(grid_item, height=180, fg_color=self.colors["card_bg"])
-        img_container.pack(fill="x")
-        img_container.pack_propagate(False)
-        
-        # Get first image if available
-        images = json.loads(result['images'])
-        if images:
-            try:
-                thumbnail = self.create_thumbnail(images[0]['src'])
-                if thumbnail:
-                    img_label = ctk.CTkLabel(img_container, image=thumbnail, text="")
-                    img_label.image = thumbnail
-                    self.image_references.append(thumbnail)
-                    img_label.pack(pady=10)
-            except Exception:
-                # Fallback icon if image fails
-                ctk.CTkLabel(img_container, text="🌐", font=("Arial", 40)).pack(pady=40)
-        else:
-            # No image available
-            ctk.CTkLabel(img_container, text="🌐", font=("Arial", 40)).pack(pady=40)
-        
-        # Content area
-        content_area = ctk.CTkFrame(grid_item, fg_color="transparent")
-        content_area.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        # Title
-        title_label = ctk.CTkLabel(
-            content_area, 
-            text=result['title'][:40] + "..." if len(result['title']) > 40 else result['title'], 
-            font=("Arial", 14, "bold"),
-            wraplength=220)
-        title_label.pack(anchor="w")
-        
-        # Domain
-        domain_label = ctk.CTkLabel(
-            content_area,
-            text=urlparse(result['url']).netloc,
-            font=("Arial", 12),
-            text_color="gray"
-        )
-        domain_label.pack(anchor="w", pady=(0, 5))
-        
-        # Button container
-        button_container = ctk.CTkFrame(grid_item, fg_color="transparent", height=40)
-        button_container.pack(fill="x", side="bottom", padx=10, pady=10)
-        
-        # Action buttons
-        open_btn = ctk.CTkButton(
-            button_container,
-            text="Open",
-            command=lambda url=result['url']: webbrowser.open(url),
-            width=70,
-            height=28,
-            font=("Arial", 12)
-        )
-        open_btn.pack(side="left", padx=(0, 5))
-        
-        # Save button
-        save_btn = ctk.CTkButton(
-            button_container,
-            text="Save",
-            command=lambda r=result: self.save_single_result(r),
-            width=70,
-            height=28,
-            fg_color=self.colors["secondary"],
-            font=("Arial", 12)
-        )
-        save_btn.pack(side="left")
-        
-        # Increment the counter for grid items in this row
-        self.grid_items_in_row += 1
-    
-    def _display_result_card(self, result):
-        """Display result as a detailed card"""
-        result_frame = ctk.CTkFrame(self.results_canvas, corner_radius=10)
-        result_frame.pack(fill="x", pady=10, padx=10)
-        
-        # Header with title and buttons
-        header_frame = ctk.CTkFrame(result_frame, height=50)
-        header_frame.pack(fill="x", pady=(0, 10))
-        
-        # Title
-        ctk.CTkLabel(
-            header_frame, 
-            text=result['title'], 
-            font=("Arial", 18, "bold")).pack(side="left", padx=15, pady=10)
-        
-        # Action buttons container
-        actions_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
-        actions_frame.pack(side="right", padx=15, pady=10)
-        
-        # Buttons
-        ctk.CTkButton(
-            actions_frame, 
-            text="🌐 Open URL", 
-            width=100,
-            command=lambda url=result['url']: webbrowser.open(url),
-            fg_color=self.colors["primary"],
-            font=("Arial", 12)
-        ).pack(side="left", padx=5)
-        
-        ctk.CTkButton(
-            actions_frame, 
-            text="💾 Save", 
-            width=80,
-            command=lambda r=result: self.save_single_result(r),
-            fg_color=self.colors["secondary"],
-            font=("Arial", 12)
-        ).pack(side="left", padx=5)
-        
-        ctk.CTkButton(
-            actions_frame, 
-            text="🔄 Similar", 
-            width=80,
-            command=lambda r=result: self.search_similar(r),
-            fg_color=self.colors["accent"],
-            font=("Arial", 12)
-        ).pack(side="left", padx=5)
-        
-        # Content area with image gallery and text
-        content_frame = ctk.CTkFrame(result_frame)
-        content_frame.pack(fill="x", pady=10, padx=15)
-        
-        # Two columns: image gallery and text
-        content_frame.grid_columnconfigure(0, weight=0)
-        content_frame.grid_columnconfigure(1, weight=1)
-        
-        # Image gallery on the left (if available)
-        gallery_frame = ctk.CTkFrame(content_frame, width=300, height=300)
-        gallery_frame.grid(row=0, column=0, padx=(0, 15), sticky="ns")
-        
-        # Get images
-        images = json.loads(result['images'])
-        if images:
-            # Show the first image as main image
-            try:
-                main_img = self.create_thumbnail(images[0]['src'])
-                if main_img:
-                    img_label = ctk.CTkLabel(gallery_frame, image=main_img, text="")
-                    img_label.image = main_img
-                    self.image_references.append(main_img)
-                    img_label.pack(pady=(10, 5))
-                    
-                # Show thumbnails of additional images (up to 3)
-                if len(images) > 1:
-                    thumbnails_frame = ctk.CTkFrame(gallery_frame, fg_color="transparent")
-                    thumbnails_frame.pack(fill="x", pady=5)
-                    
-                    for i in range(1, min(4, len(images))):
-                        try:
-                            thumb = self.create_thumbnail(images[i]['src'], size=(80, 80))
-                            if thumb:
-                                img_thumb = ctk.CTkLabel(thumbnails_frame, image=thumb, text="")
-                                img_thumb.image = thumb
-                                self.image_references.append(thumb)
-                                img_thumb.pack(side="left", padx=5)
-                        except Exception:
-                            pass
-                            
-                    if len(images) > 4:
-                        more_label = ctk.CTkLabel(
-                            thumbnails_frame,
-                            text=f"+{len(images) - 4} more",
-                            font=("Arial", 12)
-                        )
-                        more_label.pack(side="left", padx=10)
-            except Exception:
-                ctk.CTkLabel(gallery_frame, text="No images available", font=("Arial", 14)).pack(pady=50)
-        else:
-            ctk.CTkLabel(gallery_frame, text="No images available", font=("Arial", 14)).pack(pady=50)
-        
-        # Text content on the right
-        text_frame = ctk.CTkFrame(content_frame)
-        text_frame.grid(row=0, column=1, sticky="nsew")
-        
-        # URL
-        url_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
-        url_frame.pack(fill="x", pady=(10, 15))
-        
-        ctk.CTkLabel(
-            url_frame,
-            text="URL:",
-            font=("Arial", 12, "bold"),
-            width=50
-        ).pack(side="left", padx=(10, 0))
-        
-        ctk.CTkLabel(
-            url_frame,
-            text=result['url'],
-            font=("Arial", 12),
-            anchor="w"
-        ).pack(side="left", fill="x", expand=True, padx=5)
-        
-        # Content preview
-        content_label = ctk.CTkLabel(
-            text_frame,
-            text="Content Preview:",
-            font=("Arial", 12, "bold"),
-            anchor="w"
-        )
-        content_label.pack(anchor="w", padx=10, pady=(0, 5))
-        
-        # Text preview in a scrollable frame
-        preview_frame = ctk.CTkScrollableFrame(text_frame, height=180)
-        preview_frame.pack(fill="x", padx=10, pady=(0, 10))
-        
-        text_preview = result['body_content'][:800] + "..." if len(result['body_content']) > 800 else result['body_content']
-        preview_text = ctk.CTkLabel(
-            preview_frame, 
-            text=text_preview, 
-            wraplength=600,
-            font=("Arial", 13),
-            anchor="w",
-            justify="left")
-        preview_text.pack(anchor="w", fill="x")
-        
-        # Metadata section
-        meta_frame = ctk.CTkFrame(result_frame, fg_color=self.colors["card_bg"])
-        meta_frame.pack(fill="x", pady=(0, 10))
-        
-        meta_items = [
-            {"label": "Domain", "value": urlparse(result['url']).netloc, "icon": "🌐"},
-            {"label": "Updated", "value": result['timestamp'], "icon": "🕒"},
-            {"label": "Images", "value": str(len(json.loads(result['images']))), "icon": "🖼️"},
-            {"label": "Videos", "value": str(len(json.loads(result['videos']))), "icon": "🎥"},
-            {"label": "Files", "value": str(len(json.loads(result['files']))), "icon": "📁"}
-        ]
-        
-        for item in meta_items:
-            item_frame = ctk.CTkFrame(meta_frame, fg_color="transparent")
-            item_frame.pack(side="left", padx=15, pady=10, expand=True)
-            
-            ctk.CTkLabel(
-                item_frame,
-                text=f"{item['icon']} {item['label']}:",
-                font=("Arial", 12),
-            ).pack(anchor="w")
-            
-            ctk.CTkLabel(
-                item_frame,
-                text=item['value'],
-                font=("Arial", 13, "bold"),
-            ).pack(anchor="w")
-            
+        """Add one result to the results panel"""
+        self.result_list.add_result(result)
+
+    def show_results(self, results):
+        """Replace the results panel contents with `results`"""
+        self.result_list.set_results(results)
+
     def save_single_result(self, result):
         """Save a single result to a file"""
         try:
@@ -1802,7 +1526,7 @@ class WebScraperGUI(ctk.CTk):
     def run_scraper(self, query=None, filters=None, urls=None):
         try:
             try:
-                from webscraper_o2 import scrape_urls, query_database
+                from webscraper_o2 import scrape_urls
             except ImportError as e:
                 self.log_message(f"Could not import webscraper_o2 module: {str(e)}", "ERROR")
                 self.after(0, lambda: self.update_status("❌ Error: Web scraper module not found"))
@@ -1837,15 +1561,19 @@ class WebScraperGUI(ctk.CTk):
             limit = filters.get("limit", 10)
             
             # Call scrape_urls with the appropriate parameters
+            crawl_stats = {}
             if urls:
                 # If URLs are directly provided, use them
                 self.log_message(f"Scraping specific URLs: {urls}", "INFO")
-                scrape_result = scrape_urls(urls=urls, max_retries=3)
+                scrape_result = scrape_urls(urls=urls, max_retries=3, engine="async", stats=crawl_stats,
+                                            depth=depth)
             else:
                 # Otherwise use the query
-                scrape_result = scrape_urls(query=query, max_retries=3)
+                scrape_result = scrape_urls(query=query, max_retries=3, engine="async", stats=crawl_stats,
+                                            depth=depth)
             
             if scrape_result:
+                self.log_crawl_stats(crawl_stats)
                 self.after(100, lambda: self.progress.set(0.5))
                 
                 # Use the query for database search if available, otherwise use a generic term
@@ -1854,23 +1582,15 @@ class WebScraperGUI(ctk.CTk):
                 self.log_message(f"Scraping complete. Querying database with terms: {search_terms}", "INFO")
                 
                 # Query the database with all filters
-                results = query_database(
-                    search_terms=search_terms,
-                    content_type=filters["content_types"] or None,
-                    limit=limit
-                )
+                results = self.search_results(search_terms, filters["content_types"] or None, limit)
 
                 self.after(100, lambda: self.progress.set(0.8))
                 self.current_results = results
                 
                 # Update UI
-                self.after(0, self.clear_results)
-                
                 if results:
                     self.log_message(f"Found {len(results)} results for {query or urls }", "INFO")
-                    # Display each result
-                    for result in results:
-                        self.after(0, lambda r=result: self.display_result(r))
+                    self.after(0, lambda: self.show_results(results))
                 else:
                     self.log_message("No results found", "WARNING")
                     self.after(0, self.show_empty_message)
@@ -1890,11 +1610,7 @@ class WebScraperGUI(ctk.CTk):
             self.after(0, lambda: self.scrape_btn.configure(state="normal"))
 
     def show_empty_message(self):
-        empty_frame = ctk.CTkFrame(self.results_canvas)
-        empty_frame.pack(pady=50)
-        ctk.CTkLabel(empty_frame, 
-                    text="🔍 No results found!\nTry adjusting your search filters.",
-                    font=("Arial", 16)).pack()
+        self.result_list.show_message("🔍 No results found!\nTry adjusting your search filters.")
 
     def export_results(self):
         if not self.current_results:
@@ -1925,23 +1641,31 @@ class WebScraperGUI(ctk.CTk):
                     result["title"],
                     result["url"],
                     urlparse(result["url"]).netloc,
-                    len(json.loads(result["images"])),
-                    len(json.loads(result["videos"])),
-                    len(json.loads(result["files"]))
+                    self.result_count(result, "image"),
+                    self.result_count(result, "video"),
+                    self.result_count(result, "file")
                 ])
 
     def export_to_json(self, path):
-        export_data = [{
-            "title": res["title"],
-            "url": res["url"],
-            "domain": urlparse(res["url"]).netloc,
-            "content": res["body_content"][:1000],
-            "metadata": {
-                "images": len(json.loads(res["images"])),
-                "videos": len(json.loads(res["videos"])),
-                "files": len(json.loads(res["files"]))
-            }
-        } for res in self.current_results]
+        from webscraper_o2 import get_page
+
+        export_data = []
+        for res in self.current_results:
+            # Result rows only carry a preview; the full text is loaded per page
+            body = res.get("body_content")
+            if body is None:
+                body = (get_page(res["id"]) or {}).get("body_content") or ""
+            export_data.append({
+                "title": res["title"],
+                "url": res["url"],
+                "domain": urlparse(res["url"]).netloc,
+                "content": body[:1000],
+                "metadata": {
+                    "images": self.result_count(res, "image"),
+                    "videos": self.result_count(res, "video"),
+                    "files": self.result_count(res, "file")
+                }
+            })
         
         with open(path, "w", encoding="utf-8") as f:
             json.dump(export_data, f, indent=2)
@@ -1950,22 +1674,20 @@ class WebScraperGUI(ctk.CTk):
         """Get all downloadable files from the database"""
         try:
             # Connect to database
+            from page_store import ensure_schema
+
             conn = sqlite3.connect("database/scraped_data.db", timeout=10)
             conn.row_factory = sqlite3.Row
+            ensure_schema(conn)
             cursor = conn.cursor()
             
-            # Query for files
+            # Query for files (page_files is keyed by page id, so this is a join, not a JSON scan)
             query = """
-                SELECT p.url as page_url, p.title as page_title, 
-                       json_extract(value, '$.url') as url, 
-                       json_extract(value, '$.filename') as filename,
-                       json_extract(value, '$.extension') as extension,
-                       json_extract(value, '$.size') as size
-                FROM pages p, 
-                     json_each(p.files) as files
-                WHERE json_valid(p.files) 
-                  AND p.files != '[]'
-                ORDER BY p.timestamp DESC
+                SELECT p.url as page_url, p.title as page_title,
+                       f.url as url, f.title as title
+                FROM page_files f
+                JOIN pages p ON p.id = f.page_id
+                ORDER BY p.timestamp DESC, f.page_id, f.position
             """
             
             cursor.execute(query)
@@ -2414,36 +2136,21 @@ class WebScraperGUI(ctk.CTk):
         )
         info_label.pack(anchor="w", pady=(0, 10))
         
-        # Current query label
-        current_query_label = ctk.CTkLabel(
-            progress_frame,
-            text="Current query: -",
-            font=("Arial", 14)
-        )
-        current_query_label.pack(anchor="w", pady=5)
-        
-        # Progress bars
-        query_progress_label = ctk.CTkLabel(
-            progress_frame,
-            text="Query progress:",
-            font=("Arial", 14)
-        )
-        query_progress_label.pack(anchor="w", pady=(15, 5))
-        
-        query_progress = ctk.CTkProgressBar(progress_frame)
-        query_progress.pack(fill="x", pady=(0, 15))
-        query_progress.set(0)
-        
-        total_progress_label = ctk.CTkLabel(
-            progress_frame,
-            text="Total progress:",
-            font=("Arial", 14)
-        )
-        total_progress_label.pack(anchor="w", pady=(5, 5))
-        
-        total_progress = ctk.CTkProgressBar(progress_frame)
-        total_progress.pack(fill="x")
-        total_progress.set(0)
+        # One progress bar per pipeline stage; the stages run side by side
+        stage_titles = {"search": "Web search", "crawl": "Crawl", "results": "Database results"}
+        stage_progress = {}
+        for stage in stage_titles:
+            stage_label = ctk.CTkLabel(
+                progress_frame,
+                text=f"{stage_titles[stage]}: waiting",
+                font=("Arial", 14)
+            )
+            stage_label.pack(anchor="w", pady=(10, 5))
+
+            stage_bar = ctk.CTkProgressBar(progress_frame)
+            stage_bar.pack(fill="x")
+            stage_bar.set(0)
+            stage_progress[stage] = (stage_titles[stage], stage_label, stage_bar)
         
         # Status label
         status_label = ctk.CTkLabel(
@@ -2478,84 +2185,72 @@ class WebScraperGUI(ctk.CTk):
         # Start the batch processing thread
         threading.Thread(
             target=self.process_batch_queries,
-            args=(queries, filters, export_results, popup, current_query_label, 
-                  query_progress, total_progress, status_label, results_label),
+            args=(queries, filters, export_results, popup, stage_progress, status_label, results_label),
             daemon=True
         ).start()
     
-    def process_batch_queries(self, queries, filters, export_results, popup, 
-                             current_query_label, query_progress, total_progress, 
-                             status_label, results_label):
-        """Process batch queries in a thread"""
+    def process_batch_queries(self, queries, filters, export_results, popup, stage_progress,
+                              status_label, results_label):
+        """Process batch queries in a thread, searching, crawling and querying as a pipeline"""
         try:
-            from webscraper_o2 import scrape_urls, query_database
+            from batch_pipeline import BatchPipeline
         except ImportError as e:
             self.log_message(f"Could not import webscraper_o2 module: {str(e)}", "ERROR")
             self.after(0, lambda: status_label.configure(text="❌ Error: Web scraper module not found"))
             return
         
-        total_results = []
         self.log_message(f"Starting batch processing of {len(queries)} queries", "INFO")
-        
-        for i, query in enumerate(queries):
-            if self.cancel_flag:
-                self.log_message("Batch processing cancelled by user", "WARNING")
-                self.after(0, lambda: status_label.configure(text="Cancelled"))
-                break
-                
-            # Update UI
-            self.after(0, lambda q=query: current_query_label.configure(text=f"Current query: {q}"))
-            self.after(0, lambda p=i/len(queries): total_progress.set(p))
-            self.after(0, lambda: status_label.configure(text=f"Scraping for query {i+1} of {len(queries)}"))
-            
-            try:
-                # Reset query progress
-                self.after(0, lambda: query_progress.set(0))
-                
-                # Ensure directories
-                self.ensure_directories()
-                
-                self.log_message(f"Processing batch query {i+1}/{len(queries)}: '{query}'", "INFO")
-                
-                # Scrape URLs
-                if scrape_urls(query=query):
-                    self.after(0, lambda: query_progress.set(0.5))
-                    
-                    # Query database
-                    search_terms = query.split()
-                    self.log_message(f"Querying database for batch query: '{query}'", "INFO")
-                    
-                    results = query_database(
-                        search_terms=search_terms,
-                        content_type=filters["content_types"] if filters else None,
-                        limit=int(filters["limit"]) if filters and filters["limit"] else 10
-                    )
-                    
-                    # Update results
-                    if results:
-                        total_results.extend(results)
-                        self.log_message(f"Found {len(results)} results for batch query: '{query}'", "INFO")
-                        self.after(0, lambda r=len(total_results): results_label.configure(text=f"Results: {r}"))
-                    else:
-                        self.log_message(f"No results found for batch query: '{query}'", "WARNING")
-                    
-                    # Complete this query
-                    self.after(0, lambda: query_progress.set(1))
-                    
-                    # Save results for this query if needed
-                    if export_results and results:
-                        self.after(0, lambda: status_label.configure(text=f"Saving results for query {i+1}"))
-                        self.save_batch_results(results, query)
-                        
-            except Exception as e:
-                self.log_message(f"Error processing batch query '{query}': {str(e)}", "ERROR")
-                self.after(0, lambda err=str(e): status_label.configure(text=f"Error: {err}"))
-                
+        self.after(0, lambda: status_label.configure(text=f"Searching and crawling for {len(queries)} queries"))
+        self.ensure_directories()
+
+        def show_progress(stage, done, total):
+            title, label, bar = stage_progress[stage]
+            self.after(0, lambda: label.configure(text=f"{title}: {done} of {total}"))
+            self.after(0, lambda: bar.set(done / total if total else 0))
+
+        pipeline = BatchPipeline(on_progress=show_progress, cancelled=lambda: self.cancel_flag)
+        total_results = []
+        try:
+            outcomes = pipeline.run(
+                queries,
+                content_type=filters["content_types"] if filters else None,
+                limit=int(filters["limit"]) if filters and filters["limit"] else 10
+            )
+        except Exception as e:
+            self.log_message(f"Error processing batch: {str(e)}", "ERROR")
+            self.after(0, lambda err=str(e): status_label.configure(text=f"Error: {err}"))
+            outcomes = []
+        self.log_crawl_stats(pipeline.crawl_stats)
+        self.log_message(f"Web search cache: {SEARCH_CACHE.summary()}", "INFO")
+
+        failed = 0
+        for outcome in outcomes:
+            query, results = outcome["query"], outcome["results"]
+            if outcome["error"]:
+                failed += 1
+                self.log_message(f"Search failed for batch query: '{query}': {outcome['error']}", "ERROR")
+            if results:
+                total_results.extend(results)
+                self.log_message(f"Found {len(results)} results for batch query: '{query}' "
+                                 f"({len(outcome['urls'])} URLs found, {len(outcome['new_urls'])} new)", "INFO")
+            elif not outcome["error"]:
+                self.log_message(f"No results found for batch query: '{query}'", "WARNING")
+
+            # Save results for this query if needed
+            if export_results and results:
+                self.save_batch_results(results, query)
+        self.after(0, lambda r=len(total_results): results_label.configure(text=f"Results: {r}"))
+
+        if self.cancel_flag:
+            self.log_message("Batch processing cancelled by user", "WARNING")
+            return
+
         # Complete
-        self.log_message(f"Batch processing complete. Found {len(total_results)} total results", "INFO")
-        self.after(0, lambda: total_progress.set(1))
+        failures = f", {failed} searches failed" if failed else ""
+        self.log_message(f"Batch processing complete. Found {len(total_results)} total results{failures}",
+                         "ERROR" if failed else "INFO")
         self.after(0, lambda: status_label.configure(
-            text=f"Completed: {len(total_results)} results from {len(queries)} queries"))
+            text=f"Completed: {len(total_results)} results from {len(queries)} queries{failures}"))
         
         # Store results
         self.batch_results = total_results
@@ -2616,13 +2311,9 @@ class WebScraperGUI(ctk.CTk):
         """Show batch results in the main window"""
         popup.destroy()
         
-        # Clear current results
-        self.clear_results()
-        
         # Display batch results
         self.current_results = results
-        for result in results:
-            self.display_result(result)
+        self.show_results(results)
             
         # Update stats
         self.stats_label.configure(text=f"Found: {len(results)} results")
@@ -2657,9 +2348,9 @@ class WebScraperGUI(ctk.CTk):
                 stat_cards[3].winfo_children()[1].winfo_children()[1].configure(
                     text=f"{stats['avg_search_time']:.1f}s")
             
-            # Update charts
-            if hasattr(self, 'chart_frames'):
-                self.create_dashboard_charts(stats)
+            # Update charts (throttled, and redrawn only where the data changed)
+            if hasattr(self, 'dashboard_charts'):
+                self.dashboard_charts.refresh(stats)
                 
         except Exception as e:
             print(f"Error updating dashboard: {e}")
@@ -2679,221 +2370,51 @@ class WebScraperGUI(ctk.CTk):
         
         # Count files in history
         try:
-            history_files = os.listdir("database/scraped_results")
-            stats["total_scrapes"] = len([f for f in history_files if f.endswith(".txt")])
-            
-            # Read database to get more stats (mock data for now)
-            # In a real implementation, this would connect to SQLite or another database
-            stats["pages_indexed"] = stats["total_scrapes"] * 5  # Estimate
-            stats["media_files"] = stats["total_scrapes"] * 15  # Estimate
-            stats["avg_search_time"] = 2.3  # Mock average search time
-            
-            # Mock content type distribution
-            stats["content_types"] = {
-                "images": 65,
-                "videos": 15,
-                "files": 10,
-                "links": 120,
-                "text": 200
-            }
-            
-            # Mock top domains
-            stats["domains"] = {
-                "example.com": 25,
-                "wikipedia.org": 18,
-                "github.com": 15,
-                "medium.com": 12,
-                "stackoverflow.com": 10,
-                "other": 20
-            }
-            
-            # Mock scraping history (last 7 days)
-            today = datetime.datetime.now().date()
-            stats["scrape_history"] = {
-                (today - datetime.timedelta(days=i)).strftime("%Y-%m-%d"): 
-                stats["total_scrapes"] // 7 + (5 - i if i < 5 else 0)
-                for i in range(7)
-            }
-            
-            # Mock file types
-            stats["file_types"] = {
-                "jpg": 45,
-                "png": 25,
-                "pdf": 15,
-                "zip": 8,
-                "doc": 5,
-                "other": 12
+            stats["total_scrapes"] = get_result_sink().count() + len(legacy_dumps())
+
+            # Everything else comes from the summary tables kept by stats_store,
+            # so this reads a few dozen rows however large pages gets
+            from page_store import ensure_schema
+            from stats_store import read_stats
+
+            conn = sqlite3.connect("database/scraped_data.db", timeout=10)
+            try:
+                ensure_schema(conn)
+                summary = read_stats(conn)
+            finally:
+                conn.close()
+
+            counters = summary["counters"]
+            stats["pages_indexed"] = counters["pages"]
+            stats["media_files"] = counters["images"] + counters["videos"] + counters["audio"] + counters["files"]
+            stats["avg_search_time"] = summary["durations"].get("search", {}).get("average", 0)
+
+            # Pages containing each kind of content
+            content_types = {
+                "images": counters["with_images"],
+                "videos": counters["with_videos"],
+                "files": counters["with_files"],
+                "links": counters["with_links"],
+                "text": counters["text_pages"]
             }
+            stats["content_types"] = {kind: count for kind, count in content_types.items() if count}
+
+            stats["domains"] = summary["domains"]
+            stats["scrape_history"] = {day: counts["pages"] for day, counts in summary["daily"].items()}
+            stats["file_types"] = summary["file_types"]
             
         except Exception as e:
             print(f"Error getting statistics: {e}")
             
         return stats
         
-    def create_dashboard_charts(self, stats):
-        """Create charts for dashboard"""
-        for chart_frame in self.chart_frames:
-            # Clear previous chart if any
-            for widget in chart_frame["area"].winfo_children():
-                widget.destroy()
-                
-            # Create appropriate chart based on title
-            title = chart_frame["title"]
-            
-            if title == "Content Types Distribution":
-                self.create_pie_chart(
-                    chart_frame["area"],
-                    stats["content_types"],
-                    "Content Types"
-                )
-            elif title == "Top Domains":
-                self.create_bar_chart(
-                    chart_frame["area"],
-                    stats["domains"],
-                    "Top Domains"
-                )
-            elif title == "Scraping History":
-                self.create_line_chart(
-                    chart_frame["area"],
-                    stats["scrape_history"],
-                    "Daily Scrapes"
-                )
-            elif title == "File Types Distribution":
-                self.create_pie_chart(
-                    chart_frame["area"],
-                    stats["file_types"],
-                    "File Types"
-                )
-                
-    def create_pie_chart(self, parent, data, title):
-        """Create a pie chart in the given parent frame"""
-        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
-        
-        # Plot data
-        wedges, texts, autotexts = ax.pie(
-            data.values(),
-            labels=None,
-            autopct='%1.1f%%',
-            startangle=90,
-            wedgeprops={'width': 0.5}
-        )
-        
-        # Equal aspect ratio ensures that pie is drawn as a circle
-        ax.axis('equal')
-        ax.set_title(title)
-        
-        # Add legend
-        ax.legend(
-            wedges,
-            data.keys(),
-            loc="center left",
-            bbox_to_anchor=(1, 0, 0.5, 1)
-        )
-        
-        # Style for dark theme
-        fig.patch.set_facecolor('#2b2b2b')
-        ax.set_facecolor('#2b2b2b')
-        
-        for text in texts + autotexts + [ax.title] + ax.get_legend().get_texts():
-            text.set_color('white')
-            
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        
-    def create_bar_chart(self, parent, data, title):
-        """Create a bar chart in the given parent frame"""
-        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
-        
-        # Plot data
-        keys = list(data.keys())
-        vals = list(data.values())
-        
-        bars = ax.bar(
-            range(len(keys)),
-            vals,
-            color='#1f6aa5'
-        )
-        
-        # Customize
-        ax.set_title(title)
-        ax.set_ylabel('Count')
-        
-        # Properly set ticks first, then labels
-        ax.set_xticks(range(len(keys)))
-        ax.set_xticklabels(keys, rotation=45, ha='right')
-        
-        # Style for dark theme
-        fig.patch.set_facecolor('#2b2b2b')
-        ax.set_facecolor('#2b2b2b')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('white')
-        ax.spines['left'].set_color('white')
-        ax.spines['right'].set_color('white')
-        ax.tick_params(axis='x', colors='white')
-        ax.tick_params(axis='y', colors='white')
-        ax.set_title(title, color='white')
-        ax.yaxis.label.set_color('white')
-        
-        # Tight layout
-        fig.tight_layout()
-        
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        
-    def create_line_chart(self, parent, data, title):
-        """Create a line chart in the given parent frame"""
-        fig, ax = plt.subplots(figsize=(4, 3), dpi=100)
-        
-        # Sort data by date
-        sorted_data = sorted(data.items())
-        dates = [item[0] for item in sorted_data]
-        values = [item[1] for item in sorted_data]
-        
-        # Plot data
-        ax.plot(
-            range(len(dates)),
-            values,
-            marker='o',
-            linestyle='-',
-            color='#4CAF50'
-        )
-        
-        # Customize
-        ax.set_title(title)
-        ax.set_ylabel('Scrapes')
-        
-        # Properly set ticks first, then labels
-        ax.set_xticks(range(len(dates)))
-        ax.set_xticklabels(dates, rotation=45, ha='right')
-        
-        # Style for dark theme
-        fig.patch.set_facecolor('#2b2b2b')
-        ax.set_facecolor('#2b2b2b')
-        ax.spines['bottom'].set_color('white')
-        ax.spines['top'].set_color('white')
-        ax.spines['left'].set_color('white')
-        ax.spines['right'].set_color('white')
-        ax.tick_params(axis='x', colors='white')
-        ax.tick_params(axis='y', colors='white')
-        ax.set_title(title, color='white')
-        ax.yaxis.label.set_color('white')
-        
-        # Tight layout
-        fig.tight_layout()
-        
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, master=parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        
     def clear_database_cache(self):
         """Clear database cache files"""
         try:
             cache_path = "database/cache"
+            QUERY_CACHE.clear()
+            SEARCH_CACHE.clear()
+            self.thumbnail_loader.cache.clear()
             if os.path.exists(cache_path):
                 shutil.rmtree(cache_path)
                 os.makedirs(cache_path)
@@ -3107,6 +2628,11 @@ class WebScraperGUI(ctk.CTk):
         try:
             cache_dir = os.path.join("database", "cache")
             type_path = os.path.join(cache_dir, cache_type)
+            if cache_type == "search":
+                QUERY_CACHE.clear()
+                SEARCH_CACHE.clear()
+            elif cache_type == "thumbnails":
+                self.thumbnail_loader.cache.clear()
             
             if os.path.exists(type_path):
                 if os.path.isdir(type_path):
@@ -3145,6 +2671,9 @@ class WebScraperGUI(ctk.CTk):
         try:
             # Clear main cache directory
             cache_dir = os.path.join("database", "cache")
+            QUERY_CACHE.clear()
+            SEARCH_CACHE.clear()
+            self.thumbnail_loader.cache.clear()
             if os.path.exists(cache_dir):
                 shutil.rmtree(cache_dir)
                 os.makedirs(cache_dir)
@@ -3177,6 +2706,7 @@ class WebScraperGUI(ctk.CTk):
             # Update settings
             self.settings["cache_limit_mb"] = limit
             self.settings["auto_clear_cache"] = bool(auto_clear)
+            self.thumbnail_loader.cache.configure(limit, auto_clear)
             
             # Save settings
             self.save_settings()
@@ -3263,6 +2793,9 @@ class WebScraperGUI(ctk.CTk):
                 elif isinstance(control, ctk.CTkSlider):
                     self.settings[key] = int(control.get())
             
+            configure_preview(self.settings.get("browser_preview", False))
+            configure_query_cache(self.settings.get("search_disk_cache", True))
+
             # Save settings to file
             self.save_settings()
             
@@ -3273,7 +2806,7 @@ class WebScraperGUI(ctk.CTk):
             self.add_notification(f"Error saving settings: {str(e)}", "error")
 
     def clear_history(self):
-        """Clear all history files after confirmation"""
+        """Clear the recorded searches and old result files after confirmation"""
         confirm = messagebox.askyesno(
             "Clear History",
             "Are you sure you want to delete all search history?\nThis action cannot be undone.",
@@ -3282,30 +2815,20 @@ class WebScraperGUI(ctk.CTk):
         
         if confirm:
             try:
-                folder_path = os.path.join("database", "scraped_results")
-                files_deleted = 0
-                
-                for filename in os.listdir(folder_path):
-                    file_path = os.path.join(folder_path, filename)
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                        files_deleted += 1
+                entries_deleted = get_result_sink().clear()
+                for file_path in legacy_dumps():
+                    os.remove(file_path)
+                    entries_deleted += 1
                 
                 self.refresh_history()
-                self.add_notification(f"History cleared. {files_deleted} files deleted.", "success")
+                self.add_notification(f"History cleared. {entries_deleted} entries deleted.", "success")
             except Exception as e:
                 self.add_notification(f"Error clearing history: {str(e)}", "error")
 
     def clear_results(self):
         """Clear all results from the display"""
-        for widget in self.results_canvas.winfo_children():
-            widget.destroy()
-            
-        # Reset grid display variables
-        if hasattr(self, 'grid_container'):
-            delattr(self, 'grid_container')
-            self.grid_items_in_row = 0
-            
+        self.result_list.clear()
+
     def refresh_history(self):
         """Refresh the history view with recent searches"""
         try:
@@ -3313,46 +2836,61 @@ class WebScraperGUI(ctk.CTk):
             for widget in self.history_list.winfo_children():
                 widget.destroy()
                 
-            # Get history files
-            history_path = os.path.join("database", "scraped_results")
-            if os.path.exists(history_path):
-                history_files = [f for f in os.listdir(history_path) if f.endswith(".txt")]
-                history_files.sort(key=lambda x: os.path.getmtime(os.path.join(history_path, x)), reverse=True)
-                
-                self.history_files = set(history_files)
+            history_items = self.get_history_items()
+            self.history_files = {item["key"] for item in history_items}
+            
+            # Display history items
+            for item in history_items[:50]:  # Show only the latest 50 entries
+                self.create_history_item(item)
                 
-                # Display history items
-                for file in history_files[:50]:  # Show only the latest 50 entries
-                    self.create_history_item(file, os.path.join(history_path, file))
-                    
-                # Update history count
-                if hasattr(self, 'history_title'):
-                    self.history_title.configure(text=f"Search History ({len(history_files)})")
+            # Update history count
+            if hasattr(self, 'history_title'):
+                self.history_title.configure(text=f"Search History ({len(history_items)})")
         except Exception as e:
             print(f"Error refreshing history: {e}")
-            
-    def create_history_item(self, filename, filepath):
+
+    def get_history_items(self, limit=50):
+        """
+        Recorded searches from the result sink, newest first, followed by
+        result files written by older versions.
+        """
+        items = []
+        for entry in get_result_sink().history(limit):
+            items.append({
+                "key": ("sink", entry["id"]),
+                "query": entry["query"] or "(all pages)",
+                "date": entry["timestamp"].replace("T", " "),
+                "count": entry["result_count"],
+            })
+        for file_path in legacy_dumps():
+            items.append({
+                "key": ("file", file_path),
+                "query": os.path.basename(file_path).split("__")[0].replace("_", " "),
+                "date": datetime.datetime.fromtimestamp(os.path.getmtime(file_path)).strftime("%Y-%m-%d %H:%M:%S"),
+                "count": None,
+            })
+        return items
+            
+    def create_history_item(self, item):
         """Create a history item entry"""
         try:
             # Create history item frame
             item_frame = ctk.CTkFrame(self.history_list, corner_radius=8)
             item_frame.pack(fill="x", padx=10, pady=5)
             
-            # Try to extract the search query from the filename
-            search_query = filename.replace(".txt", "").replace("_", " ")
-            timestamp = datetime.datetime.fromtimestamp(os.path.getmtime(filepath))
-            date_str = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-            
             # Query and timestamp
             ctk.CTkLabel(
                 item_frame,
-                text=search_query,
+                text=item["query"],
                 font=("Arial", 14, "bold")
             ).pack(anchor="w", padx=15, pady=(10, 5))
             
+            details = f"🕒 {item['date']}"
+            if item["count"] is not None:
+                details += f"  ·  {item['count']} results"
             ctk.CTkLabel(
                 item_frame,
-                text=f"🕒 {date_str}",
+                text=details,
                 font=("Arial", 12),
                 text_color="gray"
             ).pack(anchor="w", padx=15, pady=(0, 5))
@@ -3365,7 +2903,7 @@ class WebScraperGUI(ctk.CTk):
             ctk.CTkButton(
                 btn_frame,
                 text="Load Results",
-                command=lambda f=filepath: self.load_history_results(f),
+                command=lambda i=item: self.load_history_results(i),
                 font=("Arial", 12),
                 width=120,
                 height=30
@@ -3375,7 +2913,7 @@ class WebScraperGUI(ctk.CTk):
             ctk.CTkButton(
                 btn_frame,
                 text="Delete",
-                command=lambda f=filepath: self.delete_history_item(f),
+                command=lambda i=item: self.delete_history_item(i),
                 font=("Arial", 12),
                 fg_color=self.colors["error"],
                 width=80,
@@ -3384,125 +2922,63 @@ class WebScraperGUI(ctk.CTk):
         except Exception as e:
             print(f"Error creating history item: {e}")
             
-    def load_history_results(self, file_path):
-        """Load results from a history file and display them"""
+    def load_history_results(self, item):
+        """Load the results of a recorded search from the database and display them"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                results_data = f.read()
-            
-            # Clear previous results
-            self.clear_results()
-            
-            # Parse the results
-            results = []
-            current_result = {}
-            lines = results_data.split('\n')
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if line.startswith("Title:"):
-                    # Start of a new result
-                    if current_result and any(current_result.values()):
-                        results.append(current_result)
-                    current_result = {"title": line[6:].strip()}
-                elif line.startswith("URL:") and current_result:
-                    current_result["url"] = line[4:].strip()
-                elif line.startswith("Body:") and current_result:
-                    # Body content spans multiple lines
-                    body_content = []
-                    i += 1
-                    while i < len(lines) and not (lines[i].strip().startswith("Title:") or 
-                                                 lines[i].strip() == "--------------------"):
-                        body_content.append(lines[i])
-                        i += 1
-                    current_result["body"] = "\n".join(body_content)
-                    continue  # Skip the i+=1 at the end of the loop
-                elif line == "--------------------":
-                    # End of current result
-                    if current_result and any(current_result.values()):
-                        results.append(current_result)
-                    current_result = {}
-                
-                i += 1
+            kind, key = item["key"]
+            if kind == "sink":
+                results = load_results(get_result_sink().result_ids(key))
+            else:
+                results = load_legacy_dump(key)
             
-            # Add the last result if exists
-            if current_result and any(current_result.values()):
-                results.append(current_result)
+            self.current_results = results
             
-            # Display results in the UI
             if results:
-                for result in results:
-                    if not all(key in result for key in ["title", "url", "body"]):
-                        continue
-                        
-                    self.add_search_result(
-                        title=result.get("title", "No Title"),
-                        url=result.get("url", ""),
-                        body=result.get("body", "No content"),
-                        update_count=False
-                    )
-                
-                # Update the results count
-                self.update_results_count(len(results))
-                
-                # Extract query from filename
-                filename = os.path.basename(file_path)
-                query = filename.split('__')[0].replace('_', ' ')
+                self.show_results(results)
                 
                 # Update search entry with the original query
                 self.search_entry.delete(0, ctk.END)
-                self.search_entry.insert(0, query)
+                self.search_entry.insert(0, item["query"])
                 
                 # Show success notification
                 self.add_notification(f"Loaded {len(results)} results from history", "success")
             else:
-                self.add_notification("No valid results found in the history file", "warning")
+                self.show_empty_message()
+                self.add_notification("None of the pages from this search are in the database anymore", "warning")
         
         except Exception as e:
             print(f"Error loading history results: {str(e)}")
             self.add_notification(f"Error loading history: {str(e)}", "error")
             
     def open_latest_scrape_file(self):
-        """Opens the latest .txt file in database/scraped_results"""
+        """Show the results of the most recent recorded search"""
         try:
-            folder = os.path.join("database", "scraped_results")
-            if not os.path.exists(folder):
-                self.add_notification("No 'scraped_results' folder found.", "error")
+            history_items = self.get_history_items(limit=1)
+            if not history_items:
+                self.add_notification("No recorded searches found.", "warning")
                 return
 
-            files = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".txt")]
-            if not files:
-                self.add_notification("No result files found.", "warning")
-                return
-
-            latest_file = max(files, key=os.path.getmtime)
-
-            # Cross-platform file opener
-            if platform.system() == "Windows":
-                os.startfile(latest_file)
-            elif platform.system() == "Darwin":  # macOS
-                subprocess.run(["open", latest_file])
-            else:  # Linux, etc.
-                subprocess.run(["xdg-open", latest_file])
-
-            self.log_message(f"Opened latest scrape result: {latest_file}", "INFO")
+            self.load_history_results(history_items[0])
+            self.tabs.set("📄 Current Results")
+            self.log_message(f"Opened latest search results: {history_items[0]['query']}", "INFO")
 
         except Exception as e:
-            self.log_message(f"Error opening scrape result: {str(e)}", "ERROR")
-            self.add_notification(f"❌ Failed to open file: {str(e)}", "error")
+            self.log_message(f"Error opening latest results: {str(e)}", "ERROR")
+            self.add_notification(f"❌ Failed to open results: {str(e)}", "error")
 
 
-    def delete_history_item(self, filepath):
+    def delete_history_item(self, item):
         """Delete a history item"""
         try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                self.refresh_history()
-                self.add_notification("History item deleted", "success")
+            kind, key = item["key"]
+            if kind == "sink":
+                get_result_sink().delete(key)
+            elif os.path.exists(key):
+                os.remove(key)
+            self.refresh_history()
+            self.add_notification("History item deleted", "success")
         except Exception as e:
-            self.add_notification(f"Error deleting file: {str(e)}", "error")
+            self.add_notification(f"Error deleting history item: {str(e)}", "error")
 
     def toggle_sidebar(self):
         """Toggle the sidebar between collapsed and expanded states"""
@@ -3562,7 +3038,7 @@ class WebScraperGUI(ctk.CTk):
         """Run a search on the local database only"""
         try:
             try:
-                from webscraper_o2 import query_database
+                from webscraper_o2 import query_pages  # noqa: F401
             except ImportError as e:
                 self.log_message(f"Could not import webscraper_o2 module: {str(e)}", "ERROR")
                 self.after(0, lambda: self.update_status("❌ Error: Web scraper module not found"))
@@ -3582,23 +3058,15 @@ class WebScraperGUI(ctk.CTk):
             
             self.log_message(f"Querying database with terms: {search_terms}", "INFO")
             
-            results = query_database(
-                search_terms=search_terms,
-                content_type=filters["content_types"] or None,
-                limit=limit
-            )
+            results = self.search_results(search_terms, filters["content_types"] or None, limit)
 
             self.after(100, lambda: self.progress.set(0.7))
             self.current_results = results
             
             # Update UI
-            self.after(0, self.clear_results)
-            
             if results:
                 self.log_message(f"Found {len(results)} results in database", "INFO")
-                # Display each result
-                for result in results:
-                    self.after(0, lambda r=result: self.display_result(r))
+                self.after(0, lambda: self.show_results(results))
             else:
                 self.log_message("No results found in database", "WARNING")
                 self.after(0, self.show_empty_message)
@@ -3617,4 +3085,5 @@ class WebScraperGUI(ctk.CTk):
 
 if __name__ == "__main__":
     app = WebScraperGUI()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
+    app.thumbnail_loader.shutdown()
\ No newline at end of file
@@ -0,0 +1,401 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import requests
+
+from page_store import DB_PATH
+
+
+# Each host starts at START_RATE requests per second with START_CONCURRENCY
+# in flight; both grow while it answers quickly, up to the MAX_ values, and
+# halve on every 429/503, timeout or connection error (AIMD). Until the
+# first such signal or latency rise a host is in slow start: its rate grows
+# by SLOW_START_FACTOR per response instead of by RATE_STEP
+START_RATE = 2.0
+MAX_RATE = 10.0
+MIN_RATE = 0.1
+RATE_STEP = 0.25
+SLOW_START_FACTOR = 1.5
+START_CONCURRENCY = 2
+MAX_CONCURRENCY = 8
+# A host answering this many times slower than its best is treated as
+# overloaded: no more growth, concurrency shrinks a little
+SLOW_LATENCY_FACTOR = 3.0
+LATENCY_SMOOTHING = 0.3
+THROTTLE_STATUSES = {429, 503}
+# Longest Retry-After (and Crawl-delay) honored, in seconds
+MAX_RETRY_AFTER = 60
+MAX_CRAWL_DELAY = 30
+# How often a host at its concurrency limit is checked for a free slot
+POLL_INTERVAL = 0.05
+
+OBEY_ROBOTS = True
+# robots.txt group the crawler's rules are read from
+ROBOTS_USER_AGENT = "*"
+ROBOTS_TIMEOUT = 10
+ROBOTS_TTL_HOURS = 24
+# robots.txt answering 5xx is retried sooner; until then the host is off limits
+ROBOTS_ERROR_TTL_HOURS = 1
+
+ROBOTS_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS robots_cache (
+        origin TEXT PRIMARY KEY,
+        status INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        crawl_delay REAL,
+        fetched_at REAL NOT NULL
+    ) WITHOUT ROWID
+"""
+
+
+def origin_of(url):
+    """scheme://host[:port] of a URL, the unit robots.txt and the scheduler work per"""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def parse_robots(status, body):
+    """
+    A RobotFileParser for a robots.txt response: rules from a 2xx body,
+    everything allowed on 4xx (no robots.txt), nothing on 5xx or when the
+    server could not be reached at all (status 0).
+    """
+    parser = robotparser.RobotFileParser()
+    if 200 <= status < 300:
+        parser.parse(body.splitlines())
+    else:
+        parser.parse([])
+        if 400 <= status < 500:
+            parser.allow_all = True
+        else:
+            parser.disallow_all = True
+    return parser
+
+
+def robots_delay(parser):
+    """Seconds robots.txt asks between requests (Crawl-delay or Request-rate), or None"""
+    delays = []
+    crawl_delay = parser.crawl_delay(ROBOTS_USER_AGENT)
+    if crawl_delay:
+        delays.append(float(crawl_delay))
+    request_rate = parser.request_rate(ROBOTS_USER_AGENT)
+    if request_rate and request_rate.requests:
+        delays.append(request_rate.seconds / request_rate.requests)
+    return max(delays) if delays else None
+
+
+class RobotsCache:
+    """
+    Parsed robots.txt per origin, in memory and in the robots_cache table,
+    so a host's robots.txt is downloaded at most once per ROBOTS_TTL_HOURS
+    across runs. Each origin is fetched once even when many threads ask for
+    it at the same time. Thread-safe; the first lookup of an origin blocks
+    on the download.
+    """
+
+    def __init__(self, db_path=DB_PATH, ttl_hours=ROBOTS_TTL_HOURS, headers_factory=None):
+        self.db_path = db_path
+        self.ttl = ttl_hours * 3600
+        self.headers_factory = headers_factory
+        self._parsers = {}
+        self._lock = threading.Lock()
+        self._origin_locks = defaultdict(threading.Lock)
+        self.stats = {"memory": 0, "disk": 0, "fetched": 0}
+
+    def _fresh(self, status, fetched_at):
+        ttl = self.ttl if status < 500 and status else ROBOTS_ERROR_TTL_HOURS * 3600
+        return fetched_at >= time.time() - ttl
+
+    def rules(self, url, proxy=None):
+        """
+        (RobotFileParser, delay in seconds or None) for the origin of `url`.
+        A download goes through `proxy`, the one the page itself is fetched
+        through, and like page fetches does not verify TLS certificates.
+        """
+        origin = origin_of(url)
+        with self._lock:
+            cached = self._parsers.get(origin)
+            origin_lock = self._origin_locks[origin]
+        if cached and self._fresh(cached[2], cached[3]):
+            self.stats["memory"] += 1
+            return cached[0], cached[1]
+
+        with origin_lock:
+            with self._lock:
+                cached = self._parsers.get(origin)
+            if cached and self._fresh(cached[2], cached[3]):
+                self.stats["memory"] += 1
+                return cached[0], cached[1]
+
+            row = self._load(origin)
+            if row and self._fresh(row[0], row[1]):
+                status, fetched_at, body = row
+                self.stats["disk"] += 1
+            else:
+                status, body = self._download(origin, proxy)
+                fetched_at = time.time()
+                self.stats["fetched"] += 1
+            parser = parse_robots(status, body)
+            delay = robots_delay(parser)
+            if status:
+                self._save(origin, status, body, delay, fetched_at)
+            with self._lock:
+                self._parsers[origin] = (parser, delay, status, fetched_at)
+            return parser, delay
+
+    def _download(self, origin, proxy=None):
+        headers = dict(self.headers_factory()) if self.headers_factory else {}
+        proxies = {'http': proxy, 'https': proxy} if proxy else None
+        try:
+            response = requests.get(f"{origin}/robots.txt", headers=headers, proxies=proxies,
+                                    timeout=ROBOTS_TIMEOUT, verify=False)
+            logging.info(f"Fetched {origin}/robots.txt ({response.status_code})")
+            return response.status_code, response.text if response.ok else ''
+        except requests.RequestException as e:
+            # Not cached on disk: the next run tries again
+            logging.warning(f"Could not fetch {origin}/robots.txt: {str(e)}")
+            return 0, ''
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute(ROBOTS_SCHEMA_SQL)
+        return conn
+
+    def _load(self, origin):
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT status, fetched_at, body FROM robots_cache WHERE origin = ?",
+                                    (origin,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not read robots.txt cache: {str(e)}")
+            return None
+
+    def _save(self, origin, status, body, delay, fetched_at):
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        """INSERT INTO robots_cache (origin, status, body, crawl_delay, fetched_at)
+                           VALUES (?, ?, ?, ?, ?)
+                           ON CONFLICT(origin) DO UPDATE SET status = excluded.status, body = excluded.body,
+                               crawl_delay = excluded.crawl_delay, fetched_at = excluded.fetched_at""",
+                        (origin, status, body, delay, fetched_at)
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not store robots.txt for {origin}: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._parsers.clear()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM robots_cache")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not clear robots.txt cache: {str(e)}")
+
+
+class HostState:
+    """Token bucket and concurrency limit of one origin"""
+
+    def __init__(self, now):
+        self.rate = START_RATE
+        self.max_rate = MAX_RATE
+        self.burst = START_CONCURRENCY
+        self.tokens = 1.0
+        self.updated = now
+        self.concurrency = float(START_CONCURRENCY)
+        self.in_flight = 0
+        self.slow_start = True
+        self.latency = None
+        self.best_latency = None
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+
+
+class HostScheduler:
+    """
+    Decides when each request may start, per origin (scheme://host:port).
+
+    Every origin has a token bucket (rate requests per second) and a limit
+    on requests in flight. Both adapt to how the host answers: they grow
+    additively while responses come back quickly (the rate multiplicatively
+    at first, until the host first slows down or pushes back) and are
+    halved on a 429/503, a timeout or a connection error, and a Retry-After
+    header blocks the host for that long. Crawl-delay and Request-rate from
+    robots.txt cap the rate and stop bursts, and disallowed URLs are not
+    fetched at all (with `obey_robots`). Many hosts can therefore be
+    crawled at full speed at once while no single one is hit harder than
+    it copes with.
+
+    acquire(url) either takes a slot (returns 0) or says how many seconds
+    to wait before asking again; every acquired slot must be given back
+    with release(url, status, latency). Thread-safe and independent of any
+    event loop, so the asyncio engine and the Scrapy middleware share it.
+    """
+
+    def __init__(self, robots=None, obey_robots=OBEY_ROBOTS, max_concurrency=MAX_CONCURRENCY):
+        self.robots = robots or RobotsCache()
+        self.obey_robots = obey_robots
+        self.max_concurrency = max_concurrency
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "throttled": 0, "disallowed": 0}
+
+    def _state(self, origin, now):
+        state = self._hosts.get(origin)
+        if state is None:
+            state = self._hosts[origin] = HostState(now)
+        return state
+
+    def allowed(self, url, proxy=None):
+        """
+        Whether robots.txt lets us fetch `url`; also applies the host's
+        crawl delay. Blocks while the host's robots.txt is downloaded,
+        through `proxy` when the page is fetched through one.
+        """
+        if not self.obey_robots:
+            return True
+        try:
+            parser, delay = self.robots.rules(url, proxy)
+        except Exception as e:
+            logging.error(f"robots.txt check failed for {url}: {str(e)}")
+            return True
+        if delay:
+            if delay > MAX_CRAWL_DELAY:
+                logging.warning(f"Crawl-delay of {delay:g}s for {origin_of(url)} capped at {MAX_CRAWL_DELAY}s")
+                delay = MAX_CRAWL_DELAY
+            with self._lock:
+                state = self._state(origin_of(url), time.monotonic())
+                state.max_rate = 1.0 / delay
+                state.rate = min(state.rate, state.max_rate)
+                state.burst = 1
+        if parser.can_fetch(ROBOTS_USER_AGENT, url):
+            return True
+        with self._lock:
+            self.counts["disallowed"] += 1
+        logging.info(f"Disallowed by robots.txt: {url}")
+        return False
+
+    def acquire(self, url):
+        """Take a request slot for `url`: 0 when it may start now, else seconds to wait first"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(origin_of(url), now)
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.in_flight >= int(state.concurrency):
+                return POLL_INTERVAL
+            state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+            state.in_flight += 1
+            state.requests += 1
+            self.counts["requests"] += 1
+            return 0.0
+
+    def release(self, url, status=None, latency=None, retry_after=None):
+        """
+        Give back a slot once the response (status None for a transport
+        error) has been read, and adapt the host's limits to it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(origin_of(url), now)
+            state.in_flight = max(0, state.in_flight - 1)
+            if status is None or status in THROTTLE_STATUSES:
+                state.slow_start = False
+                state.concurrency = max(1.0, state.concurrency / 2)
+                state.rate = max(MIN_RATE, state.rate / 2)
+                state.tokens = min(state.tokens, 0.0)
+                if status is not None:
+                    state.throttled += 1
+                    self.counts["throttled"] += 1
+                wait = _retry_after_seconds(retry_after)
+                if wait:
+                    state.blocked_until = max(state.blocked_until, now + min(wait, MAX_RETRY_AFTER))
+                return
+
+            if latency is not None:
+                state.latency = latency if state.latency is None else (
+                    LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * state.latency)
+                state.best_latency = latency if state.best_latency is None else min(state.best_latency, latency)
+                if state.latency > state.best_latency * SLOW_LATENCY_FACTOR:
+                    state.slow_start = False
+                    state.concurrency = max(1.0, state.concurrency * 0.9)
+                    return
+            state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+            if state.slow_start:
+                state.rate = min(state.max_rate, state.rate * SLOW_START_FACTOR)
+            else:
+                state.rate = min(state.max_rate, state.rate + RATE_STEP)
+            if state.burst > 1:
+                state.burst = max(2, int(state.concurrency))
+
+    def summary(self):
+        with self._lock:
+            hosts = len(self._hosts)
+            slowest = sorted(self._hosts.items(), key=lambda item: item[1].rate)[:3]
+            counts = dict(self.counts)
+        limits = ", ".join(f"{origin} {state.rate:.1f}/s x{int(state.concurrency)}" for origin, state in slowest)
+        return (f"{counts['requests']} requests to {hosts} hosts, {counts['throttled']} throttled, "
+                f"{counts['disallowed']} disallowed by robots.txt" + (f"; slowest: {limits}" if limits else ""))
+
+
+def _retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delay in seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_host_scheduler():
+    """The process-wide scheduler, so what it learns about hosts carries over between crawls"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = HostScheduler()
+        return _scheduler
+
+
+def configure_host_scheduler(db_path=DB_PATH, obey_robots=OBEY_ROBOTS, max_concurrency=MAX_CONCURRENCY,
+                             headers_factory=None):
+    """Replace the process-wide scheduler, e.g. to stop obeying robots.txt"""
+    global _scheduler
+    scheduler = HostScheduler(RobotsCache(db_path, headers_factory=headers_factory), obey_robots=obey_robots,
+                              max_concurrency=max_concurrency)
+    with _scheduler_lock:
+        _scheduler = scheduler
+    return scheduler
@@ -0,0 +1,164 @@
+import logging
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+
+# <meta> attribute/value pairs -> page_data field. First match wins, like
+# the css(...).get() selectors in the BeautifulSoup path.
+META_FIELDS = {
+    ('name', 'description'): 'meta_description',
+    ('name', 'keywords'): 'meta_keywords',
+    ('property', 'og:title'): 'og_title',
+    ('property', 'og:description'): 'og_description',
+    ('property', 'og:image'): 'og_image',
+    ('name', 'twitter:card'): 'twitter_card',
+    ('name', 'twitter:title'): 'twitter_title',
+    ('name', 'twitter:description'): 'twitter_description',
+    ('name', 'twitter:image'): 'twitter_image',
+    ('name', 'robots'): 'robots',
+    ('name', 'author'): 'author',
+    ('property', 'article:published_time'): 'published_date',
+    ('property', 'article:modified_time'): 'modified_date',
+}
+
+FILE_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.zip', '.rar')
+
+# Elements whose text is not page content (BeautifulSoup's get_text skips these too)
+SKIP_TEXT_TAGS = {'script', 'style', 'template'}
+
+_PARSER = lxml_html.HTMLParser(encoding='utf-8', remove_comments=False)
+
+
+def _absolute(base_url, rel_url):
+    if not rel_url:
+        return ""
+    if rel_url.startswith(('http://', 'https://')):
+        return rel_url
+    try:
+        return urljoin(base_url, rel_url)
+    except ValueError as e:
+        logging.warning(f"URL joining error: {e}")
+        return ""
+
+
+def _first_source(element):
+    for source in element.iter('source'):
+        src = source.get('src')
+        if src:
+            return src
+    return None
+
+
+def _link_text(element):
+    return ''.join(s.strip() for s in element.itertext())
+
+
+def extract_document(url, html):
+    """
+    Extract everything parse() needs from an HTML document in one lxml pass.
+
+    Parameters:
+        url (str): URL the document was fetched from, used to absolutize links.
+        html (str): Decoded HTML body.
+
+    Returns:
+        dict: title, text (raw, not yet cleaned), meta (field -> value),
+              canonical_url, images, videos, audio, links, files and
+              file_candidates ((href, title) pairs that need a HEAD check).
+    """
+    root = lxml_html.document_fromstring(html.encode('utf-8'), parser=_PARSER)
+
+    title = None
+    canonical_url = None
+    meta = {}
+    images, videos, audio, links, files, file_candidates = [], [], [], [], [], []
+    text_parts = []
+    skip_depth = 0
+
+    # Depth-first walk with an explicit stack: (node, closing). Unlike
+    # etree.iterwalk this also visits comments, whose tails are page text.
+    stack = [(root, False)]
+    while stack:
+        element, closing = stack.pop()
+        tag = element.tag
+        if closing or not isinstance(tag, str):
+            if closing and tag in SKIP_TEXT_TAGS:
+                skip_depth -= 1
+            if skip_depth == 0 and element.tail:
+                text_parts.append(element.tail)
+            continue
+
+        if tag in SKIP_TEXT_TAGS:
+            skip_depth += 1
+        elif skip_depth == 0 and element.text:
+            text_parts.append(element.text)
+        stack.append((element, True))
+        stack.extend((child, False) for child in reversed(element))
+
+        if tag == 'a':
+            href = element.get('href')
+            if href is None:
+                continue
+            href = _absolute(url, href)
+            if not href:
+                continue
+            link_text = _link_text(element)
+            links.append({'url': href, 'text': link_text, 'title': element.get('title', '')})
+            if href.lower().endswith(FILE_EXTENSIONS):
+                file_candidates.append((href, element.get('title', '') or link_text))
+
+        elif tag == 'img':
+            src = element.get('src')
+            if src:
+                images.append({
+                    'src': _absolute(url, src),
+                    'alt': element.get('alt', ''),
+                    'title': element.get('title', '')
+                })
+
+        elif tag in ('video', 'iframe'):
+            src = element.get('src') or _first_source(element)
+            if src:
+                videos.append({
+                    'src': _absolute(url, src),
+                    'type': element.get('type', ''),
+                    'title': element.get('title', '')
+                })
+            if tag == 'iframe' and '.pdf' in element.get('src', ''):
+                files.append({'url': _absolute(url, element.get('src')), 'title': 'Embedded PDF'})
+                logging.info(f"Found embedded PDF: {element.get('src')}")
+
+        elif tag == 'audio':
+            src = element.get('src') or _first_source(element)
+            if src:
+                audio.append({'src': _absolute(url, src), 'type': element.get('type', '')})
+
+        elif tag == 'meta':
+            for attr in ('name', 'property'):
+                field = META_FIELDS.get((attr, element.get(attr)))
+                if field and field not in meta:
+                    meta[field] = element.get('content', '')
+
+        elif tag == 'title':
+            if title is None:
+                title = element.text or ''
+
+        elif tag == 'link':
+            if canonical_url is None and element.get('rel') == 'canonical':
+                canonical_url = element.get('href', '')
+
+    text = ' '.join(part.strip() for part in text_parts if part.strip())
+
+    return {
+        'title': title or '',
+        'text': text,
+        'meta': meta,
+        'canonical_url': canonical_url or '',
+        'images': images,
+        'videos': videos,
+        'audio': audio,
+        'links': links,
+        'files': files,
+        'file_candidates': file_candidates,
+    }
@@ -0,0 +1,608 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+import time
+from datetime import datetime
+
+from stats_store import migrate_stats, trigger_exists
+
+
+# Default location of the scraped pages database
+DB_PATH = "database/scraped_data.db"
+
+# Columns written to the pages row for every page, in insert order
+PAGE_COLUMNS = [
+    'url', 'title', 'body_content', 'meta_description', 'meta_keywords',
+    'og_title', 'og_description', 'og_image',
+    'twitter_card', 'twitter_title', 'twitter_description', 'twitter_image',
+    'canonical_url', 'robots', 'author', 'published_date', 'modified_date',
+    'image_count', 'video_count', 'audio_count', 'link_count', 'social_count', 'file_count',
+    'etag', 'last_modified', 'content_hash',
+    'timestamp'
+]
+
+# Columns added to pages after it was first created, with their types;
+# migrate_columns adds any that an existing database is missing
+ADDED_COLUMNS = {
+    'etag': 'TEXT',
+    'last_modified': 'TEXT',
+    'content_hash': 'TEXT',
+}
+
+# page_data keys that hold JSON arrays (stored in side tables), and the
+# precomputed count column on pages for each
+JSON_COLUMNS = {'images', 'videos', 'audio', 'links', 'social_media', 'files'}
+COUNT_COLUMNS = {
+    'images': 'image_count', 'videos': 'video_count', 'audio': 'audio_count',
+    'links': 'link_count', 'social_media': 'social_count', 'files': 'file_count',
+}
+
+# media kind in page_media -> page_data key
+MEDIA_KINDS = {'image': 'images', 'video': 'videos', 'audio': 'audio'}
+
+PAGES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS pages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT UNIQUE,
+        title TEXT,
+        body_content TEXT,
+        meta_description TEXT,
+        meta_keywords TEXT,
+        og_title TEXT,
+        og_description TEXT,
+        og_image TEXT,
+        twitter_card TEXT,
+        twitter_title TEXT,
+        twitter_description TEXT,
+        twitter_image TEXT,
+        canonical_url TEXT,
+        robots TEXT,
+        author TEXT,
+        published_date TEXT,
+        modified_date TEXT,
+        image_count INTEGER NOT NULL DEFAULT 0,
+        video_count INTEGER NOT NULL DEFAULT 0,
+        audio_count INTEGER NOT NULL DEFAULT 0,
+        link_count INTEGER NOT NULL DEFAULT 0,
+        social_count INTEGER NOT NULL DEFAULT 0,
+        file_count INTEGER NOT NULL DEFAULT 0,
+        etag TEXT,
+        last_modified TEXT,
+        content_hash TEXT,
+        timestamp TEXT
+    )
+"""
+
+# Links, media and files live in side tables keyed by page id; `position`
+# keeps the order they appeared in on the page.
+NORMALIZED_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS page_links (
+        page_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        text TEXT,
+        title TEXT,
+        is_social INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (page_id, position)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS page_media (
+        page_id INTEGER NOT NULL,
+        kind TEXT NOT NULL CHECK (kind IN ('image', 'video', 'audio')),
+        position INTEGER NOT NULL,
+        src TEXT NOT NULL,
+        alt TEXT,
+        title TEXT,
+        type TEXT,
+        PRIMARY KEY (page_id, kind, position)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS page_files (
+        page_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        title TEXT,
+        PRIMARY KEY (page_id, position)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_page_links_url ON page_links(url)",
+    "CREATE INDEX IF NOT EXISTS idx_page_media_src ON page_media(src)",
+    "CREATE INDEX IF NOT EXISTS idx_page_files_url ON page_files(url)",
+    "CREATE INDEX IF NOT EXISTS idx_pages_timestamp ON pages(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_pages_image_count ON pages(image_count)",
+    "CREATE INDEX IF NOT EXISTS idx_pages_video_count ON pages(video_count)",
+    "CREATE INDEX IF NOT EXISTS idx_pages_link_count ON pages(link_count)",
+    "CREATE INDEX IF NOT EXISTS idx_pages_file_count ON pages(file_count)",
+    """
+    CREATE TRIGGER IF NOT EXISTS pages_children_ad AFTER DELETE ON pages BEGIN
+        DELETE FROM page_links WHERE page_id = old.id;
+        DELETE FROM page_media WHERE page_id = old.id;
+        DELETE FROM page_files WHERE page_id = old.id;
+    END
+    """,
+    # The old one-table shape, JSON columns rebuilt from the side tables.
+    # The subqueries walk the primary key, so items come back in page order.
+    """
+    CREATE VIEW IF NOT EXISTS pages_compat AS
+    SELECT p.id, p.url, p.title, p.body_content, p.meta_description, p.meta_keywords,
+        (SELECT json_group_array(json_object('src', src, 'alt', alt, 'title', title))
+         FROM page_media WHERE page_id = p.id AND kind = 'image') AS images,
+        (SELECT json_group_array(json_object('src', src, 'type', type, 'title', title))
+         FROM page_media WHERE page_id = p.id AND kind = 'video') AS videos,
+        (SELECT json_group_array(json_object('src', src, 'type', type))
+         FROM page_media WHERE page_id = p.id AND kind = 'audio') AS audio,
+        (SELECT json_group_array(json_object('url', url, 'text', text, 'title', title))
+         FROM page_links WHERE page_id = p.id) AS links,
+        (SELECT json_group_array(json_object('url', url, 'text', text, 'title', title))
+         FROM page_links WHERE page_id = p.id AND is_social) AS social_media,
+        (SELECT json_group_array(json_object('url', url, 'title', title))
+         FROM page_files WHERE page_id = p.id) AS files,
+        p.og_title, p.og_description, p.og_image,
+        p.twitter_card, p.twitter_title, p.twitter_description, p.twitter_image,
+        p.canonical_url, p.robots, p.author, p.published_date, p.modified_date,
+        p.timestamp,
+        p.image_count, p.video_count, p.audio_count, p.link_count, p.social_count, p.file_count
+    FROM pages p
+    """,
+]
+
+# One-shot copy of the legacy JSON columns into the side tables
+LEGACY_MIGRATION_SQL = [
+    """
+    INSERT INTO page_links (page_id, position, url, text, title, is_social)
+    SELECT p.id, j.key, json_extract(j.value, '$.url'), json_extract(j.value, '$.text'),
+           json_extract(j.value, '$.title'),
+           EXISTS (SELECT 1 FROM json_each(CASE WHEN json_valid(p.social_media) THEN p.social_media ELSE '[]' END) s
+                   WHERE json_extract(s.value, '$.url') = json_extract(j.value, '$.url'))
+    FROM pages p, json_each(p.links) j
+    WHERE json_valid(p.links) AND json_extract(j.value, '$.url') IS NOT NULL
+    """,
+    """
+    INSERT INTO page_media (page_id, kind, position, src, alt, title, type)
+    SELECT p.id, 'image', j.key, json_extract(j.value, '$.src'), json_extract(j.value, '$.alt'),
+           json_extract(j.value, '$.title'), NULL
+    FROM pages p, json_each(p.images) j
+    WHERE json_valid(p.images) AND json_extract(j.value, '$.src') IS NOT NULL
+    """,
+    """
+    INSERT INTO page_media (page_id, kind, position, src, alt, title, type)
+    SELECT p.id, 'video', j.key, json_extract(j.value, '$.src'), NULL,
+           json_extract(j.value, '$.title'), json_extract(j.value, '$.type')
+    FROM pages p, json_each(p.videos) j
+    WHERE json_valid(p.videos) AND json_extract(j.value, '$.src') IS NOT NULL
+    """,
+    """
+    INSERT INTO page_media (page_id, kind, position, src, alt, title, type)
+    SELECT p.id, 'audio', j.key, json_extract(j.value, '$.src'), NULL, NULL, json_extract(j.value, '$.type')
+    FROM pages p, json_each(p.audio) j
+    WHERE json_valid(p.audio) AND json_extract(j.value, '$.src') IS NOT NULL
+    """,
+    """
+    INSERT INTO page_files (page_id, position, url, title)
+    SELECT p.id, j.key, json_extract(j.value, '$.url'), json_extract(j.value, '$.title')
+    FROM pages p, json_each(p.files) j
+    WHERE json_valid(p.files) AND json_extract(j.value, '$.url') IS NOT NULL
+    """,
+    """
+    UPDATE pages SET
+        image_count = (SELECT COUNT(*) FROM page_media WHERE page_id = pages.id AND kind = 'image'),
+        video_count = (SELECT COUNT(*) FROM page_media WHERE page_id = pages.id AND kind = 'video'),
+        audio_count = (SELECT COUNT(*) FROM page_media WHERE page_id = pages.id AND kind = 'audio'),
+        link_count = (SELECT COUNT(*) FROM page_links WHERE page_id = pages.id),
+        social_count = (SELECT COUNT(*) FROM page_links WHERE page_id = pages.id AND is_social),
+        file_count = (SELECT COUNT(*) FROM page_files WHERE page_id = pages.id)
+    """,
+]
+
+# External-content FTS5 index over the searchable text columns, kept in
+# sync with pages by triggers. Column order matters for bm25() weights.
+
+FTS_SCHEMA_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+        title, meta_description, body_content,
+        content='pages', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pages_fts_ai AFTER INSERT ON pages BEGIN
+        INSERT INTO pages_fts(rowid, title, meta_description, body_content)
+        VALUES (new.id, new.title, new.meta_description, new.body_content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pages_fts_ad AFTER DELETE ON pages BEGIN
+        INSERT INTO pages_fts(pages_fts, rowid, title, meta_description, body_content)
+        VALUES ('delete', old.id, old.title, old.meta_description, old.body_content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pages_fts_au
+    AFTER UPDATE OF title, meta_description, body_content ON pages BEGIN
+        INSERT INTO pages_fts(pages_fts, rowid, title, meta_description, body_content)
+        VALUES ('delete', old.id, old.title, old.meta_description, old.body_content);
+        INSERT INTO pages_fts(rowid, title, meta_description, body_content)
+        VALUES (new.id, new.title, new.meta_description, new.body_content);
+    END
+    """,
+]
+
+# Write generation: bumped by every write_pages call so readers (the query
+# cache) can tell whether results may have changed, across processes too.
+# It starts at a random value so a database file swapped in from elsewhere
+# does not reuse a generation a cache has already seen.
+GENERATION_SCHEMA_SQL = [
+    "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID",
+    "INSERT OR IGNORE INTO store_meta (key, value) VALUES ('generation', abs(random() % 1000000000000))",
+]
+BUMP_GENERATION_SQL = "UPDATE store_meta SET value = value + 1 WHERE key = 'generation'"
+
+# UPSERT rather than INSERT OR REPLACE so a re-crawled page keeps its id
+# (and its side-table rows stay attached to it)
+INSERT_PAGE_SQL = f"""
+    INSERT INTO pages ({', '.join(PAGE_COLUMNS)})
+    VALUES ({', '.join('?' for _ in PAGE_COLUMNS)})
+    ON CONFLICT(url) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in PAGE_COLUMNS[1:])}
+"""
+
+PAGE_ID_SQL = "(SELECT id FROM pages WHERE url = ?)"
+
+DELETE_CHILDREN_SQL = [
+    f"DELETE FROM {table} WHERE page_id = {PAGE_ID_SQL}"
+    for table in ('page_links', 'page_media', 'page_files')
+]
+
+INSERT_LINK_SQL = f"""
+    INSERT INTO page_links (page_id, position, url, text, title, is_social)
+    VALUES ({PAGE_ID_SQL}, ?, ?, ?, ?, ?)
+"""
+
+INSERT_MEDIA_SQL = f"""
+    INSERT INTO page_media (page_id, kind, position, src, alt, title, type)
+    VALUES ({PAGE_ID_SQL}, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_FILE_SQL = f"""
+    INSERT INTO page_files (page_id, position, url, title)
+    VALUES ({PAGE_ID_SQL}, ?, ?, ?)
+"""
+
+DELETE_FILES_SQL = f"DELETE FROM page_files WHERE page_id = {PAGE_ID_SQL}"
+
+UPDATE_FILE_COUNT_SQL = "UPDATE pages SET file_count = ? WHERE url = ?"
+
+UPDATE_VALIDATORS_SQL = "UPDATE pages SET etag = ?, last_modified = ? WHERE url = ?"
+
+
+def table_exists(conn, name):
+    """Return True if a table (or virtual table) called `name` exists"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def init_schema(conn):
+    """Create the pages table, its side tables, full-text index and statistics on an open connection"""
+    conn.execute(PAGES_TABLE_SQL)
+    migrate_columns(conn)
+    migrate_normalized(conn)
+    migrate_fts(conn)
+    migrate_stats(conn)
+    for statement in GENERATION_SCHEMA_SQL:
+        conn.execute(statement)
+    conn.commit()
+
+
+def ensure_schema(conn):
+    """Run init_schema only if the database predates the current layout, for read paths"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+    if (not table_exists(conn, 'page_files') or not table_exists(conn, 'store_meta')
+            or not trigger_exists(conn, 'stats_pages_ai') or not set(PAGE_COLUMNS) <= columns):
+        init_schema(conn)
+
+
+def store_generation(conn):
+    """Current write generation of the pages database (see GENERATION_SCHEMA_SQL)"""
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'generation'").fetchone()
+    return row[0] if row else None
+
+
+def migrate_columns(conn):
+    """Add any ADDED_COLUMNS that pages is missing"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+    for column, column_type in ADDED_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE pages ADD COLUMN {column} {column_type}")
+            logging.info(f"Added pages.{column}")
+
+
+def migrate_normalized(conn):
+    """
+    Create the side tables, indexes and pages_compat view.
+
+    When pages still has the old JSON columns (images, links, ...) their
+    contents are copied into the side tables, the count columns are filled
+    in and the JSON columns are dropped, all in one transaction.
+
+    Returns:
+        bool: True if a legacy table was migrated by this call.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+    legacy = 'images' in columns
+
+    conn.execute("SAVEPOINT migrate_normalized")
+    try:
+        if legacy:
+            for column in COUNT_COLUMNS.values():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE pages ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        for statement in NORMALIZED_SCHEMA_SQL:
+            conn.execute(statement)
+        if legacy:
+            for statement in LEGACY_MIGRATION_SQL:
+                conn.execute(statement)
+            for column in sorted(JSON_COLUMNS & columns):
+                conn.execute(f"ALTER TABLE pages DROP COLUMN {column}")
+        conn.execute("RELEASE migrate_normalized")
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO migrate_normalized")
+        conn.execute("RELEASE migrate_normalized")
+        raise
+
+    if legacy:
+        logging.info("Moved links, media and files into side tables")
+    return legacy
+
+
+def migrate_fts(conn):
+    """
+    Create the pages_fts index and triggers, back-filling it from existing rows.
+
+    Safe to run repeatedly: the rebuild only happens the first time the
+    index is created, i.e. when an older database is opened.
+
+    Returns:
+        bool: True if the index was created by this call.
+    """
+    created = not table_exists(conn, 'pages_fts')
+    for statement in FTS_SCHEMA_SQL:
+        conn.execute(statement)
+    if created:
+        conn.execute("INSERT INTO pages_fts(pages_fts) VALUES ('rebuild')")
+        logging.info("Built full-text index for existing pages")
+    return created
+
+
+def _as_list(value):
+    """page_data carries JSON strings; accept decoded lists too"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value if isinstance(value, list) else []
+
+
+def file_rows(url, files):
+    """INSERT_FILE_SQL parameters for a page's file list"""
+    return [(url, position, f.get('url'), f.get('title', ''))
+            for position, f in enumerate(_as_list(files)) if f.get('url')]
+
+
+def page_row(url, page_data, timestamp=None):
+    """
+    Build the parameter tuple for INSERT_PAGE_SQL from a page_data dict.
+
+    Count columns are left at 0; page_record fills them in.
+
+    Parameters:
+        url (str): URL the page was fetched from.
+        page_data (dict): Extracted fields, as built by extract_page_data.
+        timestamp (str): Optional timestamp; defaults to now.
+
+    Returns:
+        tuple: Values in PAGE_COLUMNS order.
+    """
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    row = [url]
+    for column in PAGE_COLUMNS[1:-1]:
+        row.append(page_data.get(column, 0 if column in COUNT_COLUMNS.values() else ''))
+    row.append(timestamp)
+    return tuple(row)
+
+
+def page_record(url, page_data, timestamp=None):
+    """
+    Split a page_data dict into its pages row and side-table rows.
+
+    Returns:
+        tuple: (page row, link rows, media rows, file rows), ready for write_pages.
+    """
+    social = {link.get('url') for link in _as_list(page_data.get('social_media'))}
+
+    links = [(url, position, link.get('url'), link.get('text', ''), link.get('title', ''),
+              int(link.get('url') in social))
+             for position, link in enumerate(_as_list(page_data.get('links'))) if link.get('url')]
+
+    media = []
+    for kind, key in MEDIA_KINDS.items():
+        media.extend((url, kind, position, item.get('src'), item.get('alt'), item.get('title'), item.get('type'))
+                     for position, item in enumerate(_as_list(page_data.get(key))) if item.get('src'))
+
+    files = file_rows(url, page_data.get('files'))
+
+    counts = {
+        'image_count': sum(1 for m in media if m[1] == 'image'),
+        'video_count': sum(1 for m in media if m[1] == 'video'),
+        'audio_count': sum(1 for m in media if m[1] == 'audio'),
+        'link_count': len(links),
+        'social_count': sum(link[-1] for link in links),
+        'file_count': len(files),
+    }
+    return page_row(url, {**page_data, **counts}, timestamp), links, media, files
+
+
+def write_pages(conn, records, file_updates=()):
+    """
+    Write page records and back-filled file lists inside the caller's transaction,
+    and bump the write generation.
+
+    Parameters:
+        conn (sqlite3.Connection): Open connection.
+        records (list): page_record() tuples, at most one per URL.
+        file_updates (list): (url, files) pairs, at most one per URL, applied
+            after the pages so they can target pages from the same batch.
+    """
+    if records:
+        urls = [(record[0][0],) for record in records]
+        conn.executemany(INSERT_PAGE_SQL, [record[0] for record in records])
+        for statement in DELETE_CHILDREN_SQL:
+            conn.executemany(statement, urls)
+        conn.executemany(INSERT_LINK_SQL, [row for record in records for row in record[1]])
+        conn.executemany(INSERT_MEDIA_SQL, [row for record in records for row in record[2]])
+        conn.executemany(INSERT_FILE_SQL, [row for record in records for row in record[3]])
+
+    if file_updates:
+        rows = {url: file_rows(url, files) for url, files in file_updates}
+        conn.executemany(DELETE_FILES_SQL, [(url,) for url in rows])
+        conn.executemany(INSERT_FILE_SQL, [row for url_rows in rows.values() for row in url_rows])
+        conn.executemany(UPDATE_FILE_COUNT_SQL, [(len(url_rows), url) for url, url_rows in rows.items()])
+
+    if records or file_updates:
+        conn.execute(BUMP_GENERATION_SQL)
+
+
+def fetch_pages(conn, keys, key_column='id', chunk_size=500):
+    """
+    Load pages_compat rows for page ids (or URLs with key_column='url').
+
+    Returns:
+        list: Row dicts in the order of `keys`; keys with no stored page are skipped.
+    """
+    if key_column not in ('id', 'url'):
+        raise ValueError(f"Unsupported key column: {key_column}")
+    keys = list(dict.fromkeys(keys))
+    found = {}
+    cursor = conn.cursor()
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+        cursor.execute(
+            f"SELECT * FROM pages_compat WHERE {key_column} IN ({', '.join('?' for _ in chunk)})", chunk
+        )
+        names = [column[0] for column in cursor.description]
+        for row in cursor:
+            row = dict(zip(names, row))
+            found[row[key_column]] = row
+    return [found[key] for key in keys if key in found]
+
+
+class PageWriter:
+    """
+    Long-lived writer for the pages table and its side tables.
+
+    Keeps one WAL-mode connection open for the whole crawl and buffers rows,
+    writing them with a single executemany/commit once `batch_size` rows are
+    pending or `flush_interval` seconds have passed since the last flush.
+    Call close() when the crawl ends so the remaining rows are written.
+
+    Back-filled `files` values (see update_files) and refreshed cache
+    validators (see update_validators) are applied in the same flush, after
+    the page rows, so they never target a row not yet written.
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=200, flush_interval=2.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        # Keyed by URL: a page queued twice before a flush is written once
+        self._pending = {}
+        self._pending_files = {}
+        self._pending_validators = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def add(self, url, page_data):
+        """Queue a page for writing, flushing if a threshold is reached"""
+        record = page_record(url, page_data)
+        with self._lock:
+            self._pending[url] = record
+            self._pending_files.pop(url, None)
+            due = (len(self._pending) >= self.batch_size or
+                   time.monotonic() - self._last_flush >= self.flush_interval)
+            if due:
+                self._flush_locked()
+
+    def update_files(self, url, files):
+        """Queue a back-filled file list (JSON or list) for an already queued or stored page"""
+        with self._lock:
+            self._pending_files[url] = files
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def update_validators(self, url, etag, last_modified):
+        """Queue new ETag/Last-Modified values for a stored page whose content is unchanged"""
+        with self._lock:
+            self._pending_validators[url] = (etag, last_modified)
+
+    def flush(self):
+        """Write all pending rows in one transaction"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not (self._pending or self._pending_files or self._pending_validators) or self._conn is None:
+            return
+        records, self._pending = list(self._pending.values()), {}
+        file_updates, self._pending_files = list(self._pending_files.items()), {}
+        validators, self._pending_validators = self._pending_validators, {}
+        try:
+            with self._conn:
+                write_pages(self._conn, records, file_updates)
+                self._conn.executemany(UPDATE_VALIDATORS_SQL,
+                                       [(etag, modified, url) for url, (etag, modified) in validators.items()])
+            self.rows_written += len(records)
+            logging.info(f"Stored {len(records)} pages and {len(file_updates)} file lists in {self.db_path}")
+        except sqlite3.Error as e:
+            logging.error(f"Database store error for batch of {len(records)} pages: {str(e)}")
+
+    def close(self):
+        """Flush remaining rows and close the connection"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+
+
+def migrate_database(db_path=DB_PATH):
+    """Bring an existing database file up to the current schema"""
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        init_schema(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    migrate_database(path)
+    print(f"[INFO] Migrated {path}")
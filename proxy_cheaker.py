@@ -1,13 +1,14 @@
+import asyncio
 import random
 import threading
+import aiohttp
 import colorama
 import requests
 import time
-import queue
 from colorama import Fore, Style
-from concurrent.futures import ThreadPoolExecutor
 
 from get_proxy_list import fetch_proxies_with_regex
+from proxy_health import HEALTH_MAX_AGE, ProxyHealthStore
 
 
 colorama.init(autoreset=True)
@@ -25,6 +26,12 @@ test_urls = [
     "http://httpbin.org/ip"
 ]
 
+# Validation defaults: stop once this many proxies work, with this many
+# checks in flight, each echo request limited to CHECK_TIMEOUT seconds
+TARGET_PROXIES = 20
+CHECK_CONCURRENCY = 200
+CHECK_TIMEOUT = 5
+
 
 def load_proxies(file_path):
     """
@@ -45,13 +52,19 @@ def load_proxies(file_path):
         return []
 
 
-def test_proxy(proxy, result_queue):
+def test_proxy(proxy, result_queue=None):
     """
     Test a single proxy by sending a request to httpbin.org/ip.
-    
+
+    The proxy counts as working as soon as one test URL succeeds. Exactly one
+    result is produced per call; it is returned and, if a queue is given,
+    also put on it (the queue is never read, so concurrent callers cannot
+    pick up each other's results).
+
     Parameters:
         proxy (str): Proxy URL in the form "http://ip:port"
-        
+        result_queue (queue.Queue): Optional queue to also publish the result on.
+
     Returns:
         dict: Contains proxy, status (True/False), response time, and detected IP.
     """
@@ -59,28 +72,116 @@ def test_proxy(proxy, result_queue):
         "http": f"http://{proxy}",
         "https": f"https://{proxy}",
     }
-    headers = {"User-Agent": random.choice(USER_AGENTS)}    
+    headers = {"User-Agent": random.choice(USER_AGENTS)}
+    result = {"proxy": proxy, "status": False, "time": None, "ip": None}
 
     for test_url in test_urls:
         try:
             start_time = time.time()
             response = requests.get(test_url, proxies=proxies, timeout=10,headers=headers, verify=False)
             elapsed = time.time() - start_time
-            
+
             if response.status_code == 200:
                 ip_info = response.json()
                 print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Proxy {proxy} works! with {test_url} Response time: {elapsed:.2f} sec. Detected IP: {ip_info['origin']}")
-                result_queue.put({"proxy": proxy, "status": True, "time": elapsed, "ip": ip_info["origin"]})
-            else:
-                print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} Proxy {proxy} failed with {test_url} with status code: {response.status_code}")
-                result_queue.put({"proxy": proxy, "status": False})
+                result = {"proxy": proxy, "status": True, "time": elapsed, "ip": ip_info["origin"]}
+                break
+            print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} Proxy {proxy} failed with {test_url} with status code: {response.status_code}")
 
         except Exception as e:
             print(f"{Fore.RED}[FAIL]{Style.RESET_ALL} Proxy {proxy} failed with {test_url}: {str(e)}")
-                    # return {"proxy": proxy, "status": False, "time": None, "ip": None}
-            result_queue.put({"proxy": proxy, "status": False})
-            
-    return result_queue.get()
+
+    if result_queue is not None:
+        result_queue.put(result)
+    return result
+
+async def check_proxy_async(session, proxy, echo_urls, timeout=CHECK_TIMEOUT):
+    """
+    Check one proxy against the echo endpoints, stopping at the first that works.
+
+    An echo endpoint must answer like httpbin.org/ip: JSON with an "origin" key.
+
+    Returns:
+        dict: proxy, status (True/False), time (latency in seconds) and ip.
+    """
+    proxy_url = proxy if proxy.startswith(("http://", "https://")) else f"http://{proxy}"
+    headers = {"User-Agent": random.choice(USER_AGENTS)}
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    for echo_url in echo_urls:
+        try:
+            start_time = time.perf_counter()
+            async with session.get(echo_url, proxy=proxy_url, headers=headers, timeout=client_timeout) as response:
+                if response.status != 200:
+                    continue
+                ip_info = await response.json(content_type=None)
+            elapsed = time.perf_counter() - start_time
+            return {"proxy": proxy, "status": True, "time": elapsed, "ip": ip_info["origin"]}
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, TypeError):
+            continue
+
+    return {"proxy": proxy, "status": False, "time": None, "ip": None}
+
+
+async def validate_proxies_async(proxies, target=TARGET_PROXIES, concurrency=CHECK_CONCURRENCY,
+                                 timeout=CHECK_TIMEOUT, echo_urls=None, on_result=None):
+    """Async implementation of validate_proxies"""
+    echo_urls = echo_urls or test_urls
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, ssl=False, force_close=True)
+    working = []
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def bounded_check(proxy):
+            async with semaphore:
+                return await check_proxy_async(session, proxy, echo_urls, timeout)
+
+        tasks = [asyncio.ensure_future(bounded_check(proxy)) for proxy in dict.fromkeys(proxies)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                if on_result:
+                    on_result(result)
+                if not result["status"]:
+                    continue
+                print(f"{Fore.GREEN}[SUCCESS]{Style.RESET_ALL} Proxy {result['proxy']} works! "
+                      f"Response time: {result['time']:.2f} sec. Detected IP: {result['ip']}")
+                working.append(result)
+                if target and len(working) >= target:
+                    print(f"[INFO] Found {target} working proxies; cancelling remaining checks")
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return sorted(working, key=lambda r: r["time"])
+
+
+def validate_proxies(proxies, target=TARGET_PROXIES, concurrency=CHECK_CONCURRENCY,
+                     timeout=CHECK_TIMEOUT, echo_urls=None, on_result=None):
+    """
+    Check many proxies concurrently and return the working ones, fastest first.
+
+    Parameters:
+        proxies (list): Proxies as "ip:port" or "http://ip:port".
+        target (int): Stop as soon as this many proxies work (None checks all).
+        concurrency (int): Maximum checks in flight.
+        timeout (float): Per-request timeout in seconds.
+        echo_urls (list): Endpoints answering like httpbin.org/ip; defaults to test_urls.
+        on_result (callable): Called with every completed check, working or not.
+
+    Returns:
+        list: Result dicts (proxy, status, time, ip) sorted by latency.
+    """
+    if not proxies:
+        return []
+    start_time = time.perf_counter()
+    working = asyncio.run(validate_proxies_async(proxies, target, concurrency, timeout, echo_urls, on_result))
+    print(f"[INFO] Validated {len(working)} working proxies out of {len(proxies)} "
+          f"in {time.perf_counter() - start_time:.1f} sec")
+    return working
+
 
 def save_working_proxies(proxies, filename="working_proxies.txt"):
     """
@@ -96,80 +197,67 @@ def save_working_proxies(proxies, filename="working_proxies.txt"):
     print(f"[INFO] Saved {len(proxies)} working proxies to '{filename}'")
 
 
-def proxy_cheaker():
+def revalidate(store, proxies, target=TARGET_PROXIES, echo_urls=None):
     """
-    Check proxies from the working proxies file first. If none work, fall back to proxies.txt.
-    """
-    print("Using default proxy file path.")
-    working_proxy_file = "database/working_proxies.txt"  # File containing previously working proxies
-    proxy_file = "database/proxies.txt"  # File containing all proxies
+    Validate `proxies` and record every completed check in the health store.
 
-    # Step 1: Load working proxies from the working proxies file
-    print("[INFO] Checking working proxies from 'working_proxies.txt'...")
-    working_proxies = load_proxies(working_proxy_file)
-    
-    if working_proxies:
-        print("[INFO] Testing working proxies...")
-        result_queue = queue.Queue()
-
-        # Test working proxies
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for proxy in working_proxies:
-                executor.submit(test_proxy, proxy, result_queue)
-
-        results = []
-        while not result_queue.empty():
-            results.append(result_queue.get())
-
-        # Filter out valid working proxies
-        valid_working_proxies = [r["proxy"] for r in results if r["status"]]
-
-        if valid_working_proxies:
-            print(f"[SUCCESS] Found {len(valid_working_proxies)} valid working proxies.")
-            print(f"Using these proxies: {valid_working_proxies}")
-            
-            with open(working_proxy_file, "w") as file:
-                for proxy in valid_working_proxies:
-                    file.write(proxy + "\n")
-
-            print(f"[INFO] Saved {len(valid_working_proxies)} valid working proxies to '{working_proxy_file}'")
-            
-            return valid_working_proxies
-        else:
-            print("[WARNING] No valid working proxies found in 'working_proxies.txt'. Falling back to 'proxies.txt'.")
-
-
-     # Step 2: Load proxies from proxies.txt if no valid working proxies are found
-    print("[INFO] Checking proxies from 'proxies.txt'...")
-    fetch_proxies_with_regex(100)
-    proxy_list = load_proxies(proxy_file)
-
-    if not proxy_list:
-        print("[ERROR] No proxies loaded from 'database/proxies.txt'. Exiting.")
+    Checks cancelled by the early exit are not recorded, so those proxies
+    stay stale and are first in line next time.
+    """
+    if not proxies:
         return []
+    checked = []
+    try:
+        return validate_proxies(proxies, target=target, echo_urls=echo_urls, on_result=checked.append)
+    finally:
+        store.record(checked)
 
-    result_queue = queue.Queue()
 
-    # Test proxies from proxies.txt
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        for proxy in proxy_list:
-            executor.submit(test_proxy, proxy, result_queue)
+def proxy_cheaker(target=TARGET_PROXIES, echo_urls=None, max_age=HEALTH_MAX_AGE, store=None):
+    """
+    Return up to `target` working proxies, fastest first.
 
-    results = []
-    while not result_queue.empty():
-        results.append(result_queue.get())
+    Proxy health (success rate, EWMA latency, last check, failure streak) is
+    kept in a ProxyHealthStore. Proxies that passed a check within `max_age`
+    seconds are used without re-testing; only stale entries are validated,
+    and failing proxies are retried with exponential backoff. Only if no
+    proxy is healthy afterwards is a fresh list fetched into proxies.txt.
+    """
+    working_proxy_file = "database/working_proxies.txt"  # Mirror of the healthy proxies, fastest first
+    proxy_file = "database/proxies.txt"  # File containing all proxies
+    store = store or ProxyHealthStore()
+
+    # Step 1: Known proxies; working_proxies.txt may hold hand-added entries
+    store.add(load_proxies(working_proxy_file))
+    healthy = store.healthy(target, max_age)
+    if len(healthy) < target:
+        stale = store.stale(max_age)
+        print(f"[INFO] {len(healthy)} proxies checked recently; revalidating {len(stale)} stale proxies...")
+        revalidate(store, stale, target - len(healthy), echo_urls)
+        healthy = store.healthy(target, max_age)
+    else:
+        print(f"[INFO] Using {len(healthy)} proxies checked within the last {max_age // 60} min")
 
-    # Filter out valid working proxies
-    working_proxies = [r["proxy"] for r in results if r["status"]]
+    # Step 2: Fetch a fresh list into proxies.txt if no known proxy works
+    if not healthy:
+        print("[WARNING] No healthy known proxies. Falling back to 'proxies.txt'.")
+        fetch_proxies_with_regex(100)
+        proxy_list = load_proxies(proxy_file)
+        if not proxy_list:
+            print("[ERROR] No proxies loaded from 'database/proxies.txt'. Exiting.")
+            return []
+        store.add(proxy_list)
+        revalidate(store, store.stale(max_age), target, echo_urls)
+        healthy = store.healthy(target, max_age)
 
-    if working_proxies:
-        print(f"[SUCCESS] Found {len(working_proxies)} working proxies.")
-        print(f"Using these proxies: {working_proxies}")
-        save_working_proxies(working_proxies, working_proxy_file)
+    if healthy:
+        print(f"[SUCCESS] Found {len(healthy)} working proxies.")
+        print(f"Using these proxies: {healthy}")
+        save_working_proxies(healthy, working_proxy_file)
     else:
         print("[ERROR] No working proxies found.")
 
-    return working_proxies
+    return healthy
 
 if __name__ == "__main__":
-    proxy_cheaker()
\ No newline at end of file
+    proxy_cheaker()
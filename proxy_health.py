@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+
+# Proxy health lives in its own file so checks never contend with crawl writes
+HEALTH_DB_PATH = "database/proxy_health.db"
+
+# A working proxy is trusted for this many seconds before it is re-checked;
+# failing proxies back off exponentially (x2 per failure, up to x32)
+HEALTH_MAX_AGE = 30 * 60
+MAX_BACKOFF_SHIFT = 5
+# Proxies failing this many checks in a row are dropped
+MAX_FAILURE_STREAK = 8
+# Weight of the newest sample in the latency moving average
+EWMA_ALPHA = 0.3
+
+HEALTH_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS proxy_health (
+        proxy TEXT PRIMARY KEY,
+        checks INTEGER NOT NULL DEFAULT 0,
+        successes INTEGER NOT NULL DEFAULT 0,
+        ewma_latency REAL,
+        last_checked REAL,
+        last_ip TEXT,
+        failure_streak INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+
+class ProxyHealthStore:
+    """
+    Per-proxy health history: checks, successes, EWMA latency, last-checked
+    time (unix seconds) and current failure streak.
+
+    proxy_cheaker asks for healthy() proxies first and only re-validates
+    the stale() ones, instead of re-testing every known proxy on each run.
+    """
+
+    def __init__(self, path=HEALTH_DB_PATH, alpha=EWMA_ALPHA):
+        self.path = path
+        self.alpha = alpha
+        db_dir = os.path.dirname(path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(HEALTH_TABLE_SQL)
+
+    def _connect(self):
+        # Callers close it with closing(); "with conn" only ends the transaction
+        return sqlite3.connect(self.path, timeout=10)
+
+    def add(self, proxies):
+        """Register proxies that have never been checked; known ones are left alone"""
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR IGNORE INTO proxy_health (proxy) VALUES (?)",
+                             [(proxy,) for proxy in dict.fromkeys(proxies)])
+
+    def record(self, results, now=None):
+        """
+        Fold check results into the history.
+
+        Parameters:
+            results (list): Dicts with proxy, status, and for successes time and ip.
+        """
+        now = time.time() if now is None else now
+        successes = [(r["time"], self.alpha, r.get("ip"), now, r["proxy"])
+                     for r in results if r["status"]]
+        failures = [(now, r["proxy"]) for r in results if not r["status"]]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR IGNORE INTO proxy_health (proxy) VALUES (?)",
+                             [(r["proxy"],) for r in results])
+            conn.executemany("""
+                UPDATE proxy_health SET
+                    checks = checks + 1,
+                    successes = successes + 1,
+                    ewma_latency = COALESCE(ewma_latency + ?2 * (?1 - ewma_latency), ?1),
+                    last_ip = ?3,
+                    last_checked = ?4,
+                    failure_streak = 0
+                WHERE proxy = ?5
+            """, successes)
+            conn.executemany("""
+                UPDATE proxy_health SET
+                    checks = checks + 1,
+                    last_checked = ?,
+                    failure_streak = failure_streak + 1
+                WHERE proxy = ?
+            """, failures)
+            conn.execute("DELETE FROM proxy_health WHERE failure_streak >= ?", (MAX_FAILURE_STREAK,))
+
+    def healthy(self, limit=None, max_age=HEALTH_MAX_AGE, now=None):
+        """Proxies whose latest check (within max_age) succeeded, fastest first"""
+        now = time.time() if now is None else now
+        query = """
+            SELECT proxy FROM proxy_health
+            WHERE failure_streak = 0 AND successes > 0 AND last_checked >= ?
+            ORDER BY ewma_latency
+        """
+        params = [now - max_age]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(query, params)]
+
+    def stale(self, max_age=HEALTH_MAX_AGE, now=None):
+        """
+        Proxies due for a check: never checked, or last checked longer ago
+        than max_age (doubled for every consecutive failure). Previously
+        good proxies come first.
+        """
+        now = time.time() if now is None else now
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT proxy FROM proxy_health
+                WHERE last_checked IS NULL
+                   OR last_checked < ? - ? * (1 << MIN(failure_streak, ?))
+                ORDER BY failure_streak, successes * 1.0 / MAX(checks, 1) DESC, ewma_latency
+            """, (now, max_age, MAX_BACKOFF_SHIFT))
+            return [row[0] for row in rows]
+
+    def stats(self, proxy):
+        """Health summary for one proxy, or None if unknown"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("""
+                SELECT checks, successes, ewma_latency, last_checked, failure_streak
+                FROM proxy_health WHERE proxy = ?
+            """, (proxy,)).fetchone()
+        if row is None:
+            return None
+        checks, successes, ewma_latency, last_checked, failure_streak = row
+        return {
+            "proxy": proxy,
+            "success_rate": successes / checks if checks else None,
+            "ewma_latency": ewma_latency,
+            "last_checked": last_checked,
+            "failure_streak": failure_streak,
+        }
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+
+# Optional on-disk tier for cached search results, under the cache directory
+# the GUI already manages ("Search Results" in the cache manager). Off unless
+# enabled here, from the GUI settings or with WEBSCRAPER_SEARCH_DISK_CACHE=1
+SEARCH_CACHE_DIR = "database/cache/search"
+SEARCH_DISK_CACHE_ENV_VAR = "WEBSCRAPER_SEARCH_DISK_CACHE"
+# In-memory bounds: entries, and result rows summed over all entries (full
+# query_database rows carry whole page bodies)
+CACHE_MAX_ENTRIES = 128
+CACHE_MAX_ROWS = 20000
+# Files kept in the on-disk tier; the least recently written go first
+DISK_MAX_ENTRIES = 500
+
+
+def normalize_terms(search_terms, ordered=True):
+    """
+    Search terms as the cache sees them: split on whitespace and lowercased
+    (FTS and LIKE both match case-insensitively). With ordered=False the
+    terms are also sorted, for queries whose results ignore term order.
+    """
+    if not search_terms:
+        return ()
+    if isinstance(search_terms, str):
+        search_terms = [search_terms]
+    terms = [token.lower() for term in search_terms for token in str(term).split()]
+    return tuple(terms if ordered else sorted(terms))
+
+
+def normalize_content_type(content_type):
+    """content_type as a sorted tuple, so "images" and ["images"] share an entry"""
+    if not content_type:
+        return ()
+    if isinstance(content_type, str):
+        content_type = [content_type]
+    return tuple(sorted(set(content_type)))
+
+
+def result_rows(value):
+    """Row count of a cached value: a list of rows or a query_pages page"""
+    return len(value["rows"]) if isinstance(value, dict) else len(value)
+
+
+def copy_value(value):
+    """Fresh row dicts, so callers can modify what they get back"""
+    if isinstance(value, dict):
+        return {**value, "rows": [dict(row) for row in value["rows"]]}
+    return [dict(row) for row in value]
+
+
+class QueryCache:
+    """
+    LRU cache of search results, invalidated by the pages write generation.
+
+    Every entry remembers the generation (page_store.store_generation) it
+    was computed at; a lookup with a different generation is a miss and
+    drops the entry, so any write to pages invalidates everything without
+    the writer knowing about the cache.
+
+    With disk_dir set, entries are also written there as JSON and a memory
+    miss falls back to the file, so results survive a restart as long as
+    the database has not been written to since.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_rows=CACHE_MAX_ROWS, disk_dir=None,
+                 disk_max_entries=DISK_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "stale": 0}
+
+    def configure(self, disk_dir=None):
+        """Turn the on-disk tier on (a directory) or off (None)"""
+        self.disk_dir = disk_dir
+
+    def get(self, key, generation):
+        """Cached value for `key` computed at `generation`, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == generation:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return copy_value(entry[1])
+                self._discard(key)
+                self.stats["stale"] += 1
+
+        value = self._disk_get(key, generation)
+        with self._lock:
+            if value is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+            self._store(key, generation, value)
+        return copy_value(value)
+
+    def put(self, key, generation, value):
+        """Cache `value` (a list of row dicts, or a dict with rows) for `key`"""
+        if generation is None or result_rows(value) > self.max_rows:
+            return
+        value = copy_value(value)
+        with self._lock:
+            self._store(key, generation, value)
+            self.stats["stores"] += 1
+        self._disk_put(key, generation, value)
+
+    def clear(self):
+        """Drop every in-memory entry (the disk tier is cleared with its directory)"""
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def summary(self):
+        """One line of hit/miss counters for logs"""
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        rate = 100 * stats["hits"] / lookups if lookups else 0
+        return (f"Search cache: {stats['hits']} hits ({stats['disk_hits']} from disk), {stats['misses']} misses, "
+                f"{rate:.0f}% hit rate, {len(self)} entries")
+
+    def _store(self, key, generation, value):
+        self._discard(key)
+        self._entries[key] = (generation, value)
+        self._rows += result_rows(value)
+        while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+            self._discard(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._rows -= result_rows(entry[1])
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.json")
+
+    def _disk_get(self, key, generation):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("generation") == generation and data.get("key") == repr(key):
+            return data["value"]
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+    def _disk_put(self, key, generation, value):
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"generation": generation, "key": repr(key), "value": value}, f,
+                          separators=(",", ":"), default=str)
+            os.replace(tmp_path, path)
+            self._disk_prune()
+        except OSError as e:
+            logging.error(f"Could not write search cache file: {str(e)}")
+
+    def _disk_prune(self):
+        paths = [entry.path for entry in os.scandir(self.disk_dir) if entry.name.endswith(".json")]
+        if len(paths) <= self.disk_max_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.disk_max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+QUERY_CACHE = QueryCache(
+    disk_dir=SEARCH_CACHE_DIR if os.environ.get(SEARCH_DISK_CACHE_ENV_VAR, "") not in ("", "0", "false") else None
+)
+
+
+def configure_query_cache(disk):
+    """Enable or disable the on-disk tier of the shared search cache"""
+    QUERY_CACHE.configure(SEARCH_CACHE_DIR if disk else None)
+
+
+def query_cache_stats():
+    """Hit/miss counters of the shared search cache, plus its entry count"""
+    return {**QUERY_CACHE.stats, "entries": len(QUERY_CACHE)}
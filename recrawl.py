@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+
+from page_store import DB_PATH
+
+
+def content_hash(html):
+    """Stable fingerprint of a response body"""
+    return hashlib.blake2b(html.encode('utf-8', errors='replace'), digest_size=16).hexdigest()
+
+
+class RecrawlTracker:
+    """
+    Conditional-GET state for one crawl.
+
+    load() reads the stored ETag, Last-Modified and content hash of the URLs
+    about to be fetched; request_headers() turns them into If-None-Match /
+    If-Modified-Since headers. process_response asks the tracker whether a
+    response can be skipped (a 304, or a body whose hash is unchanged) and
+    records the outcome of every page in `counts`:
+
+        new           - URL not stored before
+        changed       - stored page whose content differs
+        not_modified  - server answered 304
+        unchanged     - full response, but identical to the stored body
+    """
+
+    OUTCOMES = ('new', 'changed', 'not_modified', 'unchanged')
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.counts = dict.fromkeys(self.OUTCOMES, 0)
+        self._known = {}
+        self._refreshed = {}
+        self._lock = threading.Lock()
+
+    def load(self, urls, chunk_size=500):
+        """Fetch stored validators for `urls` in a few IN (...) queries"""
+        urls = list(dict.fromkeys(urls))
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            for start in range(0, len(urls), chunk_size):
+                chunk = urls[start:start + chunk_size]
+                rows = conn.execute(
+                    f"""SELECT url, etag, last_modified, content_hash FROM pages
+                        WHERE url IN ({', '.join('?' for _ in chunk)}) AND content_hash != ''""",
+                    chunk
+                )
+                for url, etag, last_modified, stored_hash in rows:
+                    self._known[url] = (etag or '', last_modified or '', stored_hash)
+        except sqlite3.Error as e:
+            logging.error(f"Could not load cache validators: {str(e)}")
+        finally:
+            conn.close()
+        logging.info(f"Loaded cache validators for {len(self._known)} of {len(urls)} URLs")
+        return self
+
+    def request_headers(self, url):
+        """Conditional request headers for a previously stored URL"""
+        etag, last_modified, _ = self._known.get(url, ('', '', None))
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def not_modified(self, url, status):
+        """True (and counted) if `status` is a 304 for a page we hold"""
+        if status != 304 or url not in self._known:
+            return False
+        self._record('not_modified')
+        return True
+
+    def unchanged(self, url, body_hash, etag='', last_modified=''):
+        """
+        True (and counted) if the body matches the stored copy; otherwise
+        counts the page as new or changed.
+
+        If an unchanged page came back with different validators they are
+        kept for save_validators, so the next crawl can get a 304.
+        """
+        known = self._known.get(url)
+        if known is None:
+            self._record('new')
+            return False
+        if known[2] != body_hash:
+            self._record('changed')
+            return False
+        self._record('unchanged')
+        if (known[0], known[1]) != (etag, last_modified):
+            with self._lock:
+                self._refreshed[url] = (etag, last_modified)
+        return True
+
+    def save_validators(self, writer):
+        """Queue refreshed validators of unchanged pages on a PageWriter"""
+        with self._lock:
+            refreshed, self._refreshed = self._refreshed, {}
+        for url, (etag, last_modified) in refreshed.items():
+            writer.update_validators(url, etag, last_modified)
+
+    def _record(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def summary(self):
+        skipped = self.counts['not_modified'] + self.counts['unchanged']
+        return (f"{self.counts['new']} new, {self.counts['changed']} changed, {skipped} skipped "
+                f"({self.counts['not_modified']} not modified, {self.counts['unchanged']} unchanged)")
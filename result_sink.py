@@ -0,0 +1,369 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+
+from page_store import DB_PATH, ensure_schema, fetch_pages
+from stats_store import migrate_query_log_stats
+
+
+# Where query_database records searches: "table" (query_log tables in the
+# pages database), "ndjson" (one compact line per search) or "none"
+RESULT_SINK_ENV_VAR = "WEBSCRAPER_RESULT_SINK"
+DEFAULT_RESULT_SINK = "table"
+NDJSON_LOG_PATH = "database/scraped_results/query_log.ndjson"
+# Full-row dumps written by query_database before sinks existed
+LEGACY_RESULTS_DIR = "database/scraped_results"
+
+QUERY_LOG_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS query_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        query TEXT,
+        content_type TEXT,
+        mode TEXT,
+        timestamp TEXT,
+        elapsed REAL,
+        result_count INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS query_log_results (
+        query_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        page_id INTEGER NOT NULL,
+        score REAL,
+        PRIMARY KEY (query_id, position)
+    ) WITHOUT ROWID
+    """,
+]
+
+
+def query_entry(search_terms, content_type, mode, timestamp, elapsed, results):
+    """
+    The record a sink stores for one search: the query and, per result,
+    only the page id and relevance score.
+    """
+    return {
+        "query": " ".join(str(term) for term in search_terms) if search_terms else "",
+        "content_type": ",".join(content_type) if isinstance(content_type, list) else (content_type or ""),
+        "mode": mode,
+        "timestamp": timestamp,
+        "elapsed": round(elapsed, 4),
+        "results": [[row["id"], row.get("relevance") or 0] for row in results],
+    }
+
+
+class NullSink:
+    """Records nothing"""
+
+    name = "none"
+
+    def submit(self, entry):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def history(self, limit=50):
+        return []
+
+    def count(self):
+        return 0
+
+    def result_ids(self, entry_id):
+        return []
+
+    def delete(self, entry_id):
+        pass
+
+    def clear(self):
+        return 0
+
+
+class BackgroundSink(NullSink):
+    """
+    Base for sinks that write on a daemon thread.
+
+    submit() only puts the entry on a queue, so a search never waits on
+    disk; the worker writes whatever has piled up in one go. flush()
+    blocks until everything submitted so far is written.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-result-sink", daemon=True)
+        self._thread.start()
+
+    def submit(self, entry):
+        self._queue.put(entry)
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+
+    def _run(self):
+        while True:
+            entries = [self._queue.get()]
+            try:
+                while True:
+                    entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                with self._lock:
+                    self.write(entries)
+            except Exception as e:
+                logging.error(f"Could not record {len(entries)} searches in the {self.name} result sink: {str(e)}")
+            finally:
+                for _ in entries:
+                    self._queue.task_done()
+
+    def write(self, entries):
+        raise NotImplementedError
+
+
+class NdjsonSink(BackgroundSink):
+    """
+    Appends one JSON line per search to `path`; an entry's id is the byte
+    offset of its line.
+    """
+
+    name = "ndjson"
+
+    def __init__(self, path=NDJSON_LOG_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        super().__init__()
+
+    def write(self, entries):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+    def _entries(self):
+        try:
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        try:
+                            yield offset, json.loads(line)
+                        except ValueError:
+                            pass
+                    offset += len(line)
+        except FileNotFoundError:
+            return
+
+    def history(self, limit=50):
+        self.flush()
+        entries = [
+            {"id": offset, "query": entry.get("query", ""), "timestamp": entry.get("timestamp", ""),
+             "result_count": len(entry.get("results", []))}
+            for offset, entry in self._entries()
+        ]
+        return entries[::-1][:limit] if limit else entries[::-1]
+
+    def count(self):
+        self.flush()
+        return sum(1 for _ in self._entries())
+
+    def result_ids(self, entry_id):
+        self.flush()
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(int(entry_id))
+                return [tuple(result) for result in json.loads(f.readline()).get("results", [])]
+        except (OSError, ValueError):
+            return []
+
+    def _rewrite(self, keep):
+        with self._lock:
+            entries = [entry for offset, entry in self._entries() if keep(offset)]
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+    def delete(self, entry_id):
+        self.flush()
+        self._rewrite(lambda offset: offset != int(entry_id))
+
+    def clear(self):
+        removed = self.count()
+        self._rewrite(lambda offset: False)
+        return removed
+
+
+class QueryLogSink(BackgroundSink):
+    """Stores searches in the query_log / query_log_results tables"""
+
+    name = "table"
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            with conn:
+                for statement in QUERY_LOG_SCHEMA_SQL:
+                    conn.execute(statement)
+                migrate_query_log_stats(conn)
+        finally:
+            conn.close()
+        super().__init__()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def write(self, entries):
+        conn = self._connect()
+        try:
+            with conn:
+                for entry in entries:
+                    cursor = conn.execute(
+                        """INSERT INTO query_log (query, content_type, mode, timestamp, elapsed, result_count)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        (entry["query"], entry["content_type"], entry["mode"], entry["timestamp"],
+                         entry["elapsed"], len(entry["results"]))
+                    )
+                    conn.executemany(
+                        "INSERT INTO query_log_results (query_id, position, page_id, score) VALUES (?, ?, ?, ?)",
+                        [(cursor.lastrowid, position, page_id, score)
+                         for position, (page_id, score) in enumerate(entry["results"])]
+                    )
+        finally:
+            conn.close()
+
+    def _read(self, sql, params=()):
+        self.flush()
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def history(self, limit=50):
+        rows = self._read(
+            "SELECT id, query, timestamp, result_count FROM query_log ORDER BY id DESC LIMIT ?",
+            (limit or -1,)
+        )
+        return [{"id": id, "query": query, "timestamp": timestamp, "result_count": result_count}
+                for id, query, timestamp, result_count in rows]
+
+    def count(self):
+        return self._read("SELECT COUNT(*) FROM query_log")[0][0]
+
+    def result_ids(self, entry_id):
+        return self._read(
+            "SELECT page_id, score FROM query_log_results WHERE query_id = ? ORDER BY position", (entry_id,)
+        )
+
+    def _delete(self, where, params=()):
+        self.flush()
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(f"DELETE FROM query_log_results WHERE query_id IN (SELECT id FROM query_log {where})",
+                                 params)
+                    return conn.execute(f"DELETE FROM query_log {where}", params).rowcount
+            finally:
+                conn.close()
+
+    def delete(self, entry_id):
+        self._delete("WHERE id = ?", (entry_id,))
+
+    def clear(self):
+        return self._delete("")
+
+
+def load_results(ranked, db_path=DB_PATH):
+    """
+    Rebuild result rows for (page_id, score) pairs from the pages database.
+
+    Returns:
+        list: pages_compat dicts with a relevance key, in ranked order; pages
+        deleted since the search are skipped.
+    """
+    if not ranked:
+        return []
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        ensure_schema(conn)
+        pages = fetch_pages(conn, [page_id for page_id, _ in ranked])
+    finally:
+        conn.close()
+    scores = {page_id: score for page_id, score in ranked}
+    for page in pages:
+        page["relevance"] = scores[page["id"]]
+    return pages
+
+
+def legacy_dumps(results_dir=LEGACY_RESULTS_DIR):
+    """Paths of the old per-query .txt dumps, newest first"""
+    try:
+        paths = [os.path.join(results_dir, name) for name in os.listdir(results_dir) if name.endswith(".txt")]
+    except FileNotFoundError:
+        return []
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def load_legacy_dump(path, db_path=DB_PATH):
+    """Result rows for an old .txt dump, looked up by the URLs it lists"""
+    urls = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("  url: "):
+                urls.append(line[len("  url: "):].rstrip("\n"))
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        ensure_schema(conn)
+        return fetch_pages(conn, urls, key_column="url")
+    finally:
+        conn.close()
+
+
+SINK_TYPES = {"none": NullSink, "ndjson": NdjsonSink, "table": QueryLogSink}
+
+_active_sink = None
+_active_lock = threading.Lock()
+
+
+def make_result_sink(kind):
+    """Build a sink by name ("none", "ndjson" or "table")"""
+    try:
+        return SINK_TYPES[kind]()
+    except KeyError:
+        raise ValueError(f"Unknown result sink {kind!r}; expected one of {', '.join(SINK_TYPES)}")
+
+
+def get_result_sink():
+    """The process-wide sink, chosen by WEBSCRAPER_RESULT_SINK on first use"""
+    global _active_sink
+    with _active_lock:
+        if _active_sink is None:
+            kind = os.environ.get(RESULT_SINK_ENV_VAR, DEFAULT_RESULT_SINK).strip().lower()
+            try:
+                _active_sink = make_result_sink(kind)
+            except (ValueError, OSError, sqlite3.Error) as e:
+                logging.error(f"Could not open result sink {kind!r}: {str(e)}; searches will not be recorded")
+                _active_sink = NullSink()
+        return _active_sink
+
+
+def set_result_sink(sink):
+    """Replace the process-wide sink with a sink instance or a sink name"""
+    global _active_sink
+    if isinstance(sink, str):
+        sink = make_result_sink(sink)
+    with _active_lock:
+        previous, _active_sink = _active_sink, sink
+    if previous is not None and previous is not sink:
+        previous.close()
+    return sink
@@ -0,0 +1,451 @@
+import math
+import tkinter
+import webbrowser
+from itertools import zip_longest
+from urllib.parse import urlparse
+
+import customtkinter as ctk
+
+
+# Rows shown before the panel has been laid out and has a real height
+DEFAULT_VISIBLE_ROWS = 4
+
+
+class ResultWindow:
+    """
+    Which results a virtual list shows: `visible_rows` rows of `columns`
+    results each, starting at row `first`. The last visible row may be cut
+    off; `full_rows` are entirely on screen, and scrolling stops once the
+    last result row is among them. Pure arithmetic, no widgets.
+    """
+
+    def __init__(self, count=0, columns=1, visible_rows=1, full_rows=None):
+        self.count = count
+        self.columns = columns
+        self.visible_rows = visible_rows
+        self.full_rows = visible_rows if full_rows is None else full_rows
+        self.first = 0
+
+    @property
+    def rows(self):
+        return math.ceil(self.count / self.columns)
+
+    def clamp(self):
+        self.first = max(0, min(self.first, self.rows - max(1, self.full_rows)))
+
+    def scroll_by(self, rows):
+        self.first += rows
+        self.clamp()
+
+    def scroll_to(self, fraction):
+        self.first = int(round(fraction * self.rows))
+        self.clamp()
+
+    def row_items(self, row):
+        """Indexes of the results in visible row `row` (empty past the end)"""
+        start = (self.first + row) * self.columns
+        return range(start, max(start, min(start + self.columns, self.count)))
+
+    def fractions(self):
+        """(top, bottom) of the visible part, for a scrollbar"""
+        if not self.rows:
+            return 0.0, 1.0
+        return self.first / self.rows, min(1.0, (self.first + max(1, self.full_rows)) / self.rows)
+
+
+class ResultItem(ctk.CTkFrame):
+    """
+    A recyclable result widget: __init__ builds the widget tree once,
+    show(result) fills it in. `app` supplies the result helpers, colors and
+    thumbnail loading of the main window.
+    """
+
+    def __init__(self, master, app, **kwargs):
+        super().__init__(master, **kwargs)
+        self.app = app
+        self.result = None
+
+    def show(self, result):
+        raise NotImplementedError
+
+    def show_image(self, url, size=(200, 200), **pack):
+        """Load `url` into image_label, or show icon_label (packed with icon_pack) if there is no image"""
+        if url:
+            self.icon_label.pack_forget()
+            self.app.load_thumbnail(self.image_label, url, size)
+            if not self.image_label.winfo_manager():
+                self.image_label.pack(**pack)
+        else:
+            # A late load for the previous result must not land here
+            self.image_label.thumbnail_url = None
+            self.image_label.pack_forget()
+            if not self.icon_label.winfo_manager():
+                self.icon_label.pack(**self.icon_pack)
+
+
+class ListItem(ResultItem):
+    """Result in list view (compact)"""
+
+    def __init__(self, master, app):
+        super().__init__(master, app, corner_radius=10)
+
+        # Main content
+        main_frame = ctk.CTkFrame(self, fg_color="transparent")
+        main_frame.pack(fill="x", padx=10, pady=10)
+
+        # Thumbnail, or a globe icon when the page has no images
+        thumbnail_frame = ctk.CTkFrame(main_frame, width=80, height=80, fg_color="transparent")
+        thumbnail_frame.pack(side="left", padx=(0, 15))
+        self.image_label = ctk.CTkLabel(thumbnail_frame, text="")
+        self.icon_label = ctk.CTkLabel(thumbnail_frame, text="🌐", font=("Arial", 30))
+        self.icon_pack = {"pady": 20}
+
+        # Text content
+        text_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        text_frame.pack(side="left", fill="both", expand=True)
+
+        self.title_label = ctk.CTkLabel(text_frame, text="", font=("Arial", 16, "bold"), anchor="w")
+        self.title_label.pack(anchor="w", fill="x")
+
+        self.url_label = ctk.CTkLabel(text_frame, text="", font=("Arial", 12), text_color="gray", anchor="w")
+        self.url_label.pack(anchor="w", pady=(2, 5))
+
+        self.preview_label = ctk.CTkLabel(
+            text_frame, text="", wraplength=800, font=("Arial", 13), anchor="w", justify="left")
+        self.preview_label.pack(anchor="w", fill="x")
+
+        # Bottom info bar: domain, timestamp and media counts
+        info_frame = ctk.CTkFrame(self, fg_color=app.colors["card_bg"])
+        info_frame.pack(fill="x")
+        self.metadata_labels = []
+        for _ in range(5):
+            label = ctk.CTkLabel(info_frame, text="", font=("Arial", 12), padx=5)
+            label.pack(side="left", padx=5)
+            self.metadata_labels.append(label)
+
+        # Action buttons
+        action_frame = ctk.CTkFrame(info_frame, fg_color="transparent")
+        action_frame.pack(side="right")
+        self.open_btn = ctk.CTkButton(action_frame, text="Open", width=70, height=24, font=("Arial", 12))
+        self.open_btn.pack(side="left", padx=(0, 5))
+        self.save_btn = ctk.CTkButton(action_frame, text="Save", width=70, height=24,
+                                      fg_color=app.colors["secondary"], font=("Arial", 12))
+        self.save_btn.pack(side="left", padx=5)
+
+    def show(self, result):
+        self.result = result
+        images = self.app.result_images(result)
+        self.show_image(images[0] if images else None, size=(80, 80), fill="both", expand=True)
+
+        self.title_label.configure(text=result['title'])
+        self.url_label.configure(text=result['url'])
+        self.preview_label.configure(text=self.app.result_preview(result, 200, prefer="snippet"))
+
+        metadata_items = [
+            f"🔗 {urlparse(result['url']).netloc}",
+            f"🕒 {result['timestamp']}",
+            f"🖼️ {self.app.result_count(result, 'image')}",
+            f"🎥 {self.app.result_count(result, 'video')}",
+            f"📁 {self.app.result_count(result, 'file')}"
+        ]
+        for label, text in zip(self.metadata_labels, metadata_items):
+            label.configure(text=text)
+
+        self.open_btn.configure(command=lambda url=result['url']: webbrowser.open(url))
+        self.save_btn.configure(command=lambda r=result: self.app.save_single_result(r))
+
+
+class GridItem(ResultItem):
+    """Result in grid view (image-focused)"""
+
+    def __init__(self, master, app):
+        super().__init__(master, app, width=240, height=300, corner_radius=10)
+        self.pack_propagate(False)  # Prevent the frame from shrinking
+
+        # Image container (fixed height)
+        img_container = ctk.CTkFrame(self, height=180, fg_color=app.colors["card_bg"])
+        img_container.pack(fill="x")
+        img_container.pack_propagate(False)
+        self.image_label = ctk.CTkLabel(img_container, text="")
+        self.icon_label = ctk.CTkLabel(img_container, text="🌐", font=("Arial", 40))
+        self.icon_pack = {"pady": 40}
+
+        # Content area
+        content_area = ctk.CTkFrame(self, fg_color="transparent")
+        content_area.pack(fill="both", expand=True, padx=10, pady=5)
+        self.title_label = ctk.CTkLabel(content_area, text="", font=("Arial", 14, "bold"), wraplength=220)
+        self.title_label.pack(anchor="w")
+        self.domain_label = ctk.CTkLabel(content_area, text="", font=("Arial", 12), text_color="gray")
+        self.domain_label.pack(anchor="w", pady=(0, 5))
+
+        # Action buttons
+        button_container = ctk.CTkFrame(self, fg_color="transparent", height=40)
+        button_container.pack(fill="x", side="bottom", padx=10, pady=10)
+        self.open_btn = ctk.CTkButton(button_container, text="Open", width=70, height=28, font=("Arial", 12))
+        self.open_btn.pack(side="left", padx=(0, 5))
+        self.save_btn = ctk.CTkButton(button_container, text="Save", width=70, height=28,
+                                      fg_color=app.colors["secondary"], font=("Arial", 12))
+        self.save_btn.pack(side="left")
+
+    def show(self, result):
+        self.result = result
+        images = self.app.result_images(result)
+        self.show_image(images[0] if images else None, pady=10)
+
+        title = result['title'] or ""
+        self.title_label.configure(text=title[:40] + "..." if len(title) > 40 else title)
+        self.domain_label.configure(text=urlparse(result['url']).netloc)
+
+        self.open_btn.configure(command=lambda url=result['url']: webbrowser.open(url))
+        self.save_btn.configure(command=lambda r=result: self.app.save_single_result(r))
+
+
+class CardItem(ResultItem):
+    """Result as a detailed card"""
+
+    def __init__(self, master, app):
+        super().__init__(master, app, corner_radius=10)
+
+        # Header with title and buttons
+        header_frame = ctk.CTkFrame(self, height=50)
+        header_frame.pack(fill="x", pady=(0, 10))
+        self.title_label = ctk.CTkLabel(header_frame, text="", font=("Arial", 18, "bold"))
+        self.title_label.pack(side="left", padx=15, pady=10)
+
+        actions_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
+        actions_frame.pack(side="right", padx=15, pady=10)
+        self.open_btn = ctk.CTkButton(actions_frame, text="🌐 Open URL", width=100,
+                                      fg_color=app.colors["primary"], font=("Arial", 12))
+        self.open_btn.pack(side="left", padx=5)
+        self.save_btn = ctk.CTkButton(actions_frame, text="💾 Save", width=80,
+                                      fg_color=app.colors["secondary"], font=("Arial", 12))
+        self.save_btn.pack(side="left", padx=5)
+        self.similar_btn = ctk.CTkButton(actions_frame, text="🔄 Similar", width=80,
+                                         fg_color=app.colors["accent"], font=("Arial", 12))
+        self.similar_btn.pack(side="left", padx=5)
+
+        # Content area: image gallery on the left, text on the right
+        content_frame = ctk.CTkFrame(self)
+        content_frame.pack(fill="x", pady=10, padx=15)
+        content_frame.grid_columnconfigure(0, weight=0)
+        content_frame.grid_columnconfigure(1, weight=1)
+
+        gallery_frame = ctk.CTkFrame(content_frame, width=300, height=300)
+        gallery_frame.grid(row=0, column=0, padx=(0, 15), sticky="ns")
+        self.image_label = ctk.CTkLabel(gallery_frame, text="")
+        self.icon_label = ctk.CTkLabel(gallery_frame, text="No images available", font=("Arial", 14))
+        self.icon_pack = {"pady": 50}
+
+        # Thumbnails of up to 3 more images, and how many are left over
+        self.thumbnails_frame = ctk.CTkFrame(gallery_frame, fg_color="transparent")
+        self.thumbnail_labels = [ctk.CTkLabel(self.thumbnails_frame, text="") for _ in range(3)]
+        self.more_label = ctk.CTkLabel(self.thumbnails_frame, text="", font=("Arial", 12))
+
+        text_frame = ctk.CTkFrame(content_frame)
+        text_frame.grid(row=0, column=1, sticky="nsew")
+
+        url_frame = ctk.CTkFrame(text_frame, fg_color="transparent")
+        url_frame.pack(fill="x", pady=(10, 15))
+        ctk.CTkLabel(url_frame, text="URL:", font=("Arial", 12, "bold"), width=50).pack(side="left", padx=(10, 0))
+        self.url_label = ctk.CTkLabel(url_frame, text="", font=("Arial", 12), anchor="w")
+        self.url_label.pack(side="left", fill="x", expand=True, padx=5)
+
+        ctk.CTkLabel(text_frame, text="Content Preview:", font=("Arial", 12, "bold"),
+                     anchor="w").pack(anchor="w", padx=10, pady=(0, 5))
+        # A read-only textbox scrolls on its own, without a nested scrollable frame per card
+        self.preview_text = ctk.CTkTextbox(text_frame, height=180, font=("Arial", 13), wrap="word")
+        self.preview_text.pack(fill="x", padx=10, pady=(0, 10))
+
+        # Metadata section
+        meta_frame = ctk.CTkFrame(self, fg_color=app.colors["card_bg"])
+        meta_frame.pack(fill="x", pady=(0, 10))
+        self.meta_values = []
+        for icon, label in (("🌐", "Domain"), ("🕒", "Updated"), ("🖼️", "Images"), ("🎥", "Videos"), ("📁", "Files")):
+            item_frame = ctk.CTkFrame(meta_frame, fg_color="transparent")
+            item_frame.pack(side="left", padx=15, pady=10, expand=True)
+            ctk.CTkLabel(item_frame, text=f"{icon} {label}:", font=("Arial", 12)).pack(anchor="w")
+            value = ctk.CTkLabel(item_frame, text="", font=("Arial", 13, "bold"))
+            value.pack(anchor="w")
+            self.meta_values.append(value)
+
+    def show(self, result):
+        self.result = result
+        images = self.app.result_images(result)
+        self.show_image(images[0] if images else None, pady=(10, 5))
+
+        # Repacked in order each time, since the number of extra images varies
+        for label in self.thumbnail_labels:
+            label.thumbnail_url = None
+            label.pack_forget()
+        self.more_label.pack_forget()
+        extra = images[1:4]
+        if extra:
+            for label, url in zip(self.thumbnail_labels, extra):
+                self.app.load_thumbnail(label, url, (80, 80))
+                label.pack(side="left", padx=5)
+            image_count = self.app.result_count(result, 'image')
+            if image_count > 4:
+                self.more_label.configure(text=f"+{image_count - 4} more")
+                self.more_label.pack(side="left", padx=10)
+            self.thumbnails_frame.pack(fill="x", pady=5)
+        else:
+            self.thumbnails_frame.pack_forget()
+
+        self.title_label.configure(text=result['title'])
+        self.url_label.configure(text=result['url'])
+        self.preview_text.configure(state="normal")
+        self.preview_text.delete("1.0", "end")
+        self.preview_text.insert("1.0", self.app.result_preview(result, 800))
+        self.preview_text.configure(state="disabled")
+
+        values = [
+            urlparse(result['url']).netloc,
+            result['timestamp'],
+            str(self.app.result_count(result, 'image')),
+            str(self.app.result_count(result, 'video')),
+            str(self.app.result_count(result, 'file')),
+        ]
+        for label, value in zip(self.meta_values, values):
+            label.configure(text=value)
+
+        self.open_btn.configure(command=lambda url=result['url']: webbrowser.open(url))
+        self.save_btn.configure(command=lambda r=result: self.app.save_single_result(r))
+        self.similar_btn.configure(command=lambda r=result: self.app.search_similar(r))
+
+
+# view mode -> (item class, row height, items per row, pack options of an item)
+VIEW_MODES = {
+    "List": (ListItem, 170, 1, {"fill": "both", "expand": True, "pady": 5, "padx": 5}),
+    "Grid": (GridItem, 310, 3, {"side": "left", "padx": 5, "pady": 5}),
+    "Cards": (CardItem, 480, 1, {"fill": "both", "expand": True, "pady": 10, "padx": 10}),
+}
+
+
+class VirtualResultList(ctk.CTkFrame):
+    """
+    Result panel that only creates widgets for the rows on screen.
+
+    A pool of row slots, just enough to fill the visible height, is rebound
+    to other results as the list scrolls, so widget count and paint time
+    stay flat however many results there are. Scrolling moves by whole rows.
+    """
+
+    def __init__(self, master, app, mode="List", **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.app = app
+        self.mode = mode
+        self.results = []
+        self.window = ResultWindow(columns=VIEW_MODES[mode][2])
+        self.rows = []  # (row frame, [items]) per visible row
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        # The panel takes the space it is given rather than growing with its rows
+        self.body.pack_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.message_label = ctk.CTkLabel(self.body, text="", font=("Arial", 16))
+
+        self.body.bind("<Configure>", lambda event: self._layout())
+        toplevel = self.winfo_toplevel()
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            toplevel.bind_all(sequence, self._on_wheel, add="+")
+
+    def set_results(self, results):
+        """Show `results` (a list of result dicts) from the top"""
+        self.results = list(results)
+        self.message_label.pack_forget()
+        self.window.first = 0
+        self._layout()
+
+    def add_result(self, result):
+        """Append one result; only repaints if it lands on screen"""
+        self.results.append(result)
+        self.message_label.pack_forget()
+        self._layout()
+
+    def clear(self):
+        self.set_results([])
+
+    def show_message(self, text):
+        """Replace the results with a centred message"""
+        self.set_results([])
+        self.message_label.configure(text=text)
+        self.message_label.pack(pady=50)
+
+    def set_mode(self, mode):
+        """Switch between List, Grid and Cards, keeping the first visible result on screen"""
+        if mode == self.mode:
+            return
+        first_result = self.window.first * self.window.columns
+        for row, _ in self.rows:
+            row.destroy()
+        self.rows = []
+        self.mode = mode
+        self.window.columns = VIEW_MODES[mode][2]
+        self.window.first = first_result // self.window.columns
+        self._layout()
+
+    def _visible_rows(self):
+        """(rows at least partly on screen, rows entirely on screen)"""
+        height = self.body.winfo_height()
+        if height <= 1:
+            return DEFAULT_VISIBLE_ROWS, DEFAULT_VISIBLE_ROWS
+        rows = height / self._apply_widget_scaling(VIEW_MODES[self.mode][1])
+        return max(1, math.ceil(rows)), int(rows)
+
+    def _layout(self):
+        """Size the row pool to the panel height and the result count, then repaint"""
+        item_class, row_height, columns, _ = VIEW_MODES[self.mode]
+        self.window.count = len(self.results)
+        self.window.visible_rows, self.window.full_rows = self._visible_rows()
+        self.window.clamp()
+
+        wanted = min(self.window.visible_rows, self.window.rows)
+        while len(self.rows) > wanted:
+            row, _ = self.rows.pop()
+            row.destroy()
+        while len(self.rows) < wanted:
+            row = ctk.CTkFrame(self.body, height=row_height, fg_color="transparent")
+            row.pack(fill="x")
+            row.pack_propagate(False)
+            self.rows.append((row, [item_class(row, self.app) for _ in range(columns)]))
+
+        self._render()
+
+    def _render(self, update_scrollbar=True):
+        pack_options = VIEW_MODES[self.mode][3]
+        for position, (_, items) in enumerate(self.rows):
+            indexes = self.window.row_items(position)
+            for item, index in zip_longest(items, indexes):
+                if index is None:
+                    item.pack_forget()
+                    continue
+                result = self.results[index]
+                if item.result is not result:
+                    item.show(result)
+                if not item.winfo_manager():
+                    item.pack(**pack_options)
+        if update_scrollbar:
+            self.scrollbar.set(*self.window.fractions())
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.window.scroll_to(float(amount))
+            # The scrollbar already shows where it was dragged to
+            self._render(update_scrollbar=False)
+            return
+        step = int(amount) * (max(1, self.window.full_rows) if unit == "pages" else 1)
+        self.window.scroll_by(step)
+        self._render()
+
+    def _on_wheel(self, event):
+        # Only wheel events over this panel; textboxes scroll themselves
+        widget, body = str(event.widget), str(self.body)
+        if not (widget == body or widget.startswith(body + ".")) or isinstance(event.widget, tkinter.Text):
+            return
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.window.scroll_by(-1)
+        else:
+            self.window.scroll_by(1)
+        self._render()
@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from googlesearch import search as google_search
+
+from page_store import DB_PATH
+
+
+# Where searchec gets result URLs: "google", "fixture" (a JSON file of
+# query -> URLs, for offline runs) or "seeds" (a text file of URLs)
+SEARCH_BACKEND_ENV_VAR = "WEBSCRAPER_SEARCH_BACKEND"
+DEFAULT_SEARCH_BACKEND = "google"
+SEARCH_FIXTURE_PATH = "database/search_fixture.json"
+SEED_URLS_PATH = "database/seed_urls.txt"
+# Seconds googlesearch waits between result pages
+GOOGLE_SLEEP_INTERVAL = 5
+# Searches from slow backends are reused for this long
+SEARCH_CACHE_TTL_HOURS = 24
+
+SEARCH_CACHE_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS search_cache (
+        backend TEXT NOT NULL,
+        query TEXT NOT NULL,
+        num_results INTEGER NOT NULL,
+        urls TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (backend, query)
+    ) WITHOUT ROWID
+"""
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+
+class SearchBackend:
+    """
+    Turns a query into result URLs. `cacheable` backends are slow or
+    rate-limited, so their results go through the search cache.
+    """
+
+    name = "none"
+    cacheable = False
+
+    def search(self, query, num_results=10):
+        return []
+
+
+class GoogleBackend(SearchBackend):
+    """Google via googlesearch, which sleeps between result pages"""
+
+    name = "google"
+    cacheable = True
+
+    def __init__(self, sleep_interval=GOOGLE_SLEEP_INTERVAL, lang='en'):
+        self.sleep_interval = sleep_interval
+        self.lang = lang
+
+    def search(self, query, num_results=10):
+        urls = []
+        for result in google_search(
+            query,
+            sleep_interval=self.sleep_interval,
+            num_results=num_results,
+            lang=self.lang,
+            advanced=True,
+            safe=None,
+            unique=True
+        ):
+            urls.append(getattr(result, 'url', result) if hasattr(result, 'url') else result)
+        return urls
+
+
+class FixtureBackend(SearchBackend):
+    """
+    Offline results from a JSON file: {"query": ["url", ...], ...}.
+    Queries are matched case- and whitespace-insensitively; unknown
+    queries have no results.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path=SEARCH_FIXTURE_PATH):
+        self.path = path
+        self._results = None
+
+    def search(self, query, num_results=10):
+        if self._results is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._results = {normalize_query(q): urls for q, urls in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                logging.error(f"Could not read search fixture {self.path}: {str(e)}")
+                self._results = {}
+        return list(self._results.get(normalize_query(query), []))[:num_results]
+
+
+class SeedBackend(SearchBackend):
+    """
+    URLs from a text file, one per line ('#' starts a comment). Every query
+    gets the seeds, those whose URL contains more of the query's words
+    first.
+    """
+
+    name = "seeds"
+
+    def __init__(self, path=SEED_URLS_PATH):
+        self.path = path
+        self._seeds = None
+
+    def search(self, query, num_results=10):
+        if self._seeds is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    lines = (line.split('#', 1)[0].strip() for line in f)
+                    self._seeds = list(dict.fromkeys(line for line in lines if line))
+            except OSError as e:
+                logging.error(f"Could not read seed URLs {self.path}: {str(e)}")
+                self._seeds = []
+        words = normalize_query(query).split()
+        ranked = sorted(self._seeds, key=lambda url: -sum(word in url.lower() for word in words))
+        return ranked[:num_results]
+
+
+class SearchCache:
+    """
+    query -> URLs in the search_cache table, per backend, for
+    SEARCH_CACHE_TTL_HOURS. A cached search answers any later one asking
+    for at most as many results. Hit and miss counts are kept per process.
+    """
+
+    def __init__(self, db_path=DB_PATH, ttl_hours=SEARCH_CACHE_TTL_HOURS):
+        self.db_path = db_path
+        self.ttl = ttl_hours * 3600
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stores": 0}
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute(SEARCH_CACHE_SCHEMA_SQL)
+        return conn
+
+    def get(self, backend, query, num_results):
+        """The cached URLs, or None"""
+        row = None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT num_results, urls, fetched_at FROM search_cache WHERE backend = ? AND query = ?",
+                    (backend, normalize_query(query))
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not read search cache: {str(e)}")
+        with self._lock:
+            if row is None or row[0] < num_results:
+                self.stats["misses"] += 1
+                return None
+            if row[2] < time.time() - self.ttl:
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+        return json.loads(row[1])[:num_results]
+
+    def put(self, backend, query, num_results, urls):
+        """Store a search, dropping expired ones"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM search_cache WHERE fetched_at < ?", (now - self.ttl,))
+                    conn.execute(
+                        """INSERT INTO search_cache (backend, query, num_results, urls, fetched_at)
+                           VALUES (?, ?, ?, ?, ?)
+                           ON CONFLICT(backend, query) DO UPDATE SET num_results = excluded.num_results,
+                               urls = excluded.urls, fetched_at = excluded.fetched_at""",
+                        (backend, normalize_query(query), num_results, json.dumps(urls), now)
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not store search in cache: {str(e)}")
+            return
+        with self._lock:
+            self.stats["stores"] += 1
+
+    def clear(self):
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM search_cache")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.error(f"Could not clear search cache: {str(e)}")
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        return (f"{stats['hits']} hits, {stats['misses']} misses ({stats['expired']} expired), "
+                f"{rate:.0f}% hit rate")
+
+
+SEARCH_CACHE = SearchCache()
+
+BACKEND_TYPES = {"google": GoogleBackend, "fixture": FixtureBackend, "seeds": SeedBackend}
+
+_active_backend = None
+_active_lock = threading.Lock()
+
+
+def make_search_backend(kind):
+    """Build a backend by name ("google", "fixture" or "seeds")"""
+    try:
+        return BACKEND_TYPES[kind]()
+    except KeyError:
+        raise ValueError(f"Unknown search backend {kind!r}; expected one of {', '.join(BACKEND_TYPES)}")
+
+
+def get_search_backend():
+    """The process-wide backend, chosen by WEBSCRAPER_SEARCH_BACKEND on first use"""
+    global _active_backend
+    with _active_lock:
+        if _active_backend is None:
+            kind = os.environ.get(SEARCH_BACKEND_ENV_VAR, DEFAULT_SEARCH_BACKEND).strip().lower()
+            try:
+                _active_backend = make_search_backend(kind)
+            except ValueError as e:
+                logging.error(f"{str(e)}; using {DEFAULT_SEARCH_BACKEND}")
+                _active_backend = make_search_backend(DEFAULT_SEARCH_BACKEND)
+        return _active_backend
+
+
+def set_search_backend(backend):
+    """Replace the process-wide backend with a backend instance or a backend name"""
+    global _active_backend
+    if isinstance(backend, str):
+        backend = make_search_backend(backend)
+    with _active_lock:
+        _active_backend = backend
+    return backend
+
+
+def search_urls(query, num_results=10, backend=None, cache=None):
+    """
+    Result URLs (http and https only) for `query` from `backend` (default:
+    the process-wide one), through `cache` (default SEARCH_CACHE) when the
+    backend is cacheable. Backend errors propagate and are not cached.
+    """
+    backend = get_search_backend() if backend is None else backend
+    cache = SEARCH_CACHE if cache is None else cache
+    if backend.cacheable:
+        urls = cache.get(backend.name, query, num_results)
+        if urls is not None:
+            logging.info(f"Search cache hit for '{query}' ({backend.name}): {cache.summary()}")
+            return urls
+
+    urls = [url for url in backend.search(query, num_results=num_results)
+            if isinstance(url, str) and url.startswith("http")]
+    if backend.cacheable:
+        cache.put(backend.name, query, num_results, urls)
+        logging.info(f"Search cache miss for '{query}' ({backend.name}): {cache.summary()}")
+    return urls
@@ -0,0 +1,328 @@
+import sqlite3
+import logging
+from datetime import datetime
+
+
+# Dashboard aggregates, kept in summary tables by triggers on pages,
+# page_files and query_log, so reading them costs a handful of rows no
+# matter how many pages are stored.
+STATS_TABLES_SQL = [
+    "CREATE TABLE IF NOT EXISTS stats_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS stats_domains (domain TEXT PRIMARY KEY, pages INTEGER NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS stats_file_types (ext TEXT PRIMARY KEY, files INTEGER NOT NULL) WITHOUT ROWID",
+    """
+    CREATE TABLE IF NOT EXISTS stats_daily (
+        day TEXT PRIMARY KEY,
+        pages INTEGER NOT NULL DEFAULT 0,
+        searches INTEGER NOT NULL DEFAULT 0,
+        crawls INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_durations (
+        kind TEXT PRIMARY KEY,
+        runs INTEGER NOT NULL,
+        total_seconds REAL NOT NULL,
+        max_seconds REAL NOT NULL,
+        last_seconds REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+]
+
+# Longest file extension counted by name; anything else is "other"
+MAX_EXT_LENGTH = 5
+# Rows returned for the top-N charts
+TOP_DOMAINS = 5
+TOP_FILE_TYPES = 5
+HISTORY_DAYS = 7
+
+
+def host_sql(url):
+    """SQL for the lowercased host[:port] of a URL expression"""
+    rest = f"(CASE WHEN instr({url}, '://') > 0 THEN substr({url}, instr({url}, '://') + 3) ELSE {url} END)"
+    return f"lower(CASE WHEN instr({rest}, '/') > 0 THEN substr({rest}, 1, instr({rest}, '/') - 1) ELSE {rest} END)"
+
+
+def ext_sql(url):
+    """SQL for the lowercased file extension of a URL expression, or 'other'"""
+    path = f"(CASE WHEN instr({url}, '?') > 0 THEN substr({url}, 1, instr({url}, '?') - 1) ELSE {url} END)"
+    path = f"(CASE WHEN instr({path}, '#') > 0 THEN substr({path}, 1, instr({path}, '#') - 1) ELSE {path} END)"
+    # rtrim(x, <every character of x but '/'>) keeps x up to its last '/'
+    name = f"replace({path}, rtrim({path}, replace({path}, '/', '')), '')"
+    ext = f"lower(replace({name}, rtrim({name}, replace({name}, '.', '')), ''))"
+    return (f"(CASE WHEN instr({name}, '.') > 0 AND length({ext}) BETWEEN 1 AND {MAX_EXT_LENGTH} "
+            f"THEN {ext} ELSE 'other' END)")
+
+
+# stats_counters name -> value contributed by one pages row; "{row}" is new or old.
+# The with_* and text_pages counters follow query_database's content filters.
+PAGE_COUNTERS = {
+    'pages': "1",
+    'images': "{row}.image_count",
+    'videos': "{row}.video_count",
+    'audio': "{row}.audio_count",
+    'links': "{row}.link_count",
+    'social': "{row}.social_count",
+    'files': "{row}.file_count",
+    'with_images': "({row}.image_count > 0)",
+    'with_videos': "({row}.video_count > 0)",
+    'with_files': "({row}.file_count > 0)",
+    'with_links': "({row}.link_count > 0)",
+    'text_pages': ("({row}.image_count < 3 AND {row}.video_count < 2 AND {row}.body_content IS NOT NULL "
+                   "AND length({row}.body_content) > 100)"),
+}
+
+
+def counters_upsert(values):
+    """INSERT adding `values` (name -> SQL expression) onto stats_counters"""
+    rows = ", ".join(f"('{name}', {value})" for name, value in values.items())
+    return (f"INSERT INTO stats_counters (name, value) VALUES {rows} "
+            f"ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;")
+
+
+def page_counters(row, sign=""):
+    return {name: f"{sign}{expr.format(row=row)}" for name, expr in PAGE_COUNTERS.items()}
+
+
+def domain_add(row):
+    return (f"INSERT INTO stats_domains (domain, pages) VALUES ({host_sql(row + '.url')}, 1) "
+            f"ON CONFLICT(domain) DO UPDATE SET pages = pages + 1;")
+
+
+def domain_remove(row):
+    host = host_sql(row + '.url')
+    return (f"UPDATE stats_domains SET pages = pages - 1 WHERE domain = {host}; "
+            f"DELETE FROM stats_domains WHERE domain = {host} AND pages <= 0;")
+
+
+def daily_add(column, day):
+    return (f"INSERT INTO stats_daily (day, {column}) VALUES ({day}, 1) "
+            f"ON CONFLICT(day) DO UPDATE SET {column} = {column} + 1;")
+
+
+UPDATED_COLUMNS = "url, image_count, video_count, audio_count, link_count, social_count, file_count, body_content"
+
+STATS_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_pages_ai AFTER INSERT ON pages BEGIN
+        {counters_upsert(page_counters('new'))}
+        {domain_add('new')}
+        {daily_add('pages', "substr(new.timestamp, 1, 10)")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_pages_ad AFTER DELETE ON pages BEGIN
+        {counters_upsert(page_counters('old', '-'))}
+        {domain_remove('old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_pages_au AFTER UPDATE OF {UPDATED_COLUMNS} ON pages BEGIN
+        {counters_upsert({name: f"{new} - ({old})" for (name, new), old
+                          in zip(page_counters('new').items(), page_counters('old').values())
+                          if name != 'pages'})}
+        {domain_remove('old')}
+        {domain_add('new')}
+    END
+    """,
+    # A page stored again (a re-crawl that found changes) counts as a scrape that day
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_pages_rescraped AFTER UPDATE OF timestamp ON pages
+    WHEN new.timestamp IS NOT old.timestamp BEGIN
+        {daily_add('pages', "substr(new.timestamp, 1, 10)")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_files_ai AFTER INSERT ON page_files BEGIN
+        INSERT INTO stats_file_types (ext, files) VALUES ({ext_sql('new.url')}, 1)
+        ON CONFLICT(ext) DO UPDATE SET files = files + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_files_ad AFTER DELETE ON page_files BEGIN
+        UPDATE stats_file_types SET files = files - 1 WHERE ext = {ext_sql('old.url')};
+        DELETE FROM stats_file_types WHERE ext = {ext_sql('old.url')} AND files <= 0;
+    END
+    """,
+]
+
+# One-shot fill of the summary tables from pages that predate them
+STATS_BACKFILL_SQL = [
+    "DELETE FROM stats_counters",
+    "DELETE FROM stats_domains",
+    "DELETE FROM stats_file_types",
+    f"""
+    INSERT INTO stats_counters (name, value)
+    SELECT column1, column2 FROM (VALUES {", ".join(
+        f"('{name}', (SELECT COALESCE(SUM({expr.format(row='p')}), 0) FROM pages p))"
+        for name, expr in PAGE_COUNTERS.items())})
+    """,
+    f"""
+    INSERT INTO stats_domains (domain, pages)
+    SELECT {host_sql('url')}, COUNT(*) FROM pages GROUP BY 1
+    """,
+    f"""
+    INSERT INTO stats_file_types (ext, files)
+    SELECT {ext_sql('url')}, COUNT(*) FROM page_files GROUP BY 1
+    """,
+    """
+    INSERT INTO stats_daily (day, pages)
+    SELECT substr(timestamp, 1, 10), COUNT(*) FROM pages WHERE timestamp IS NOT NULL GROUP BY 1
+    ON CONFLICT(day) DO UPDATE SET pages = excluded.pages
+    """,
+]
+
+# Searches recorded by the query_log result sink
+QUERY_LOG_STATS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS stats_query_log_ai AFTER INSERT ON query_log BEGIN
+        INSERT INTO stats_durations (kind, runs, total_seconds, max_seconds, last_seconds)
+        VALUES ('search', 1, new.elapsed, new.elapsed, new.elapsed)
+        ON CONFLICT(kind) DO UPDATE SET runs = runs + 1, total_seconds = total_seconds + excluded.total_seconds,
+            max_seconds = max(max_seconds, excluded.max_seconds), last_seconds = excluded.last_seconds;
+        {daily_add('searches', "substr(new.timestamp, 1, 10)")}
+    END
+    """,
+]
+
+QUERY_LOG_BACKFILL_SQL = [
+    """
+    INSERT OR REPLACE INTO stats_durations (kind, runs, total_seconds, max_seconds, last_seconds)
+    SELECT 'search', COUNT(*), SUM(elapsed), MAX(elapsed),
+           (SELECT elapsed FROM query_log ORDER BY id DESC LIMIT 1)
+    FROM query_log HAVING COUNT(*) > 0
+    """,
+    """
+    INSERT INTO stats_daily (day, searches)
+    SELECT substr(timestamp, 1, 10), COUNT(*) FROM query_log WHERE timestamp IS NOT NULL GROUP BY 1
+    ON CONFLICT(day) DO UPDATE SET searches = excluded.searches
+    """,
+]
+
+
+def trigger_exists(conn, name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _migrate(conn, name, triggers, backfill, marker):
+    created = not trigger_exists(conn, marker)
+    conn.execute(f"SAVEPOINT {name}")
+    try:
+        for statement in STATS_TABLES_SQL + triggers:
+            conn.execute(statement)
+        if created:
+            for statement in backfill:
+                conn.execute(statement)
+        conn.execute(f"RELEASE {name}")
+    except sqlite3.Error:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    return created
+
+
+def migrate_stats(conn):
+    """
+    Create the summary tables and the triggers on pages and page_files,
+    back-filling the tables from existing rows the first time.
+
+    Returns:
+        bool: True if the triggers were created by this call.
+    """
+    created = _migrate(conn, "migrate_stats", STATS_TRIGGERS_SQL, STATS_BACKFILL_SQL, "stats_pages_ai")
+    if created:
+        logging.info("Built dashboard statistics for existing pages")
+    return created
+
+
+def migrate_query_log_stats(conn):
+    """Like migrate_stats, for the search counters kept from query_log"""
+    return _migrate(conn, "migrate_query_log_stats", QUERY_LOG_STATS_SQL, QUERY_LOG_BACKFILL_SQL,
+                    "stats_query_log_ai")
+
+
+def record_duration(db_path, kind, seconds, when=None):
+    """
+    Add one measured run (e.g. kind="crawl") to stats_durations; crawls are
+    also counted per day. Searches are recorded by the query_log trigger.
+    """
+    day = (when or datetime.now()).strftime("%Y-%m-%d")
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        with conn:
+            for statement in STATS_TABLES_SQL:
+                conn.execute(statement)
+            conn.execute(
+                """INSERT INTO stats_durations (kind, runs, total_seconds, max_seconds, last_seconds)
+                   VALUES (?1, 1, ?2, ?2, ?2)
+                   ON CONFLICT(kind) DO UPDATE SET runs = runs + 1, total_seconds = total_seconds + ?2,
+                       max_seconds = max(max_seconds, ?2), last_seconds = ?2""",
+                (kind, seconds)
+            )
+            if kind == "crawl":
+                conn.execute(daily_add("crawls", "?"), (day,))
+    except sqlite3.Error as e:
+        logging.error(f"Could not record {kind} duration: {str(e)}")
+    finally:
+        conn.close()
+
+
+def read_stats(conn, top_domains=TOP_DOMAINS, top_file_types=TOP_FILE_TYPES, days=HISTORY_DAYS, today=None):
+    """
+    Dashboard numbers from the summary tables.
+
+    Returns:
+        dict: counters (name -> value), domains and file_types (top entries
+        plus "other"), daily (day -> {pages, searches, crawls}) for the last
+        `days` days, and durations (kind -> runs, average, max, last seconds).
+    """
+    counters = {name: 0 for name in PAGE_COUNTERS}
+    if not _tables_exist(conn):
+        return {"counters": counters, "domains": {}, "file_types": {}, "daily": {}, "durations": {}}
+    counters.update(conn.execute("SELECT name, value FROM stats_counters").fetchall())
+
+    # Domains and file types can be numerous: only the top rows are read,
+    # and "other" is the matching counter (pages, files) minus those
+    def top(table, key, value, limit, total):
+        rows = conn.execute(f"SELECT {key}, {value} FROM {table} ORDER BY {value} DESC, {key} LIMIT ?",
+                            (limit,)).fetchall()
+        data = dict(rows)
+        rest = total - sum(data.values())
+        if rest > 0:
+            data["other"] = data.get("other", 0) + rest
+        return data
+
+    today = today or datetime.now().date()
+    first_day = today.toordinal() - days + 1
+    day_names = [datetime.fromordinal(ordinal).strftime("%Y-%m-%d") for ordinal in range(first_day, today.toordinal() + 1)]
+    daily = {day: {"pages": 0, "searches": 0, "crawls": 0} for day in day_names}
+    for day, pages, searches, crawls in conn.execute(
+            "SELECT day, pages, searches, crawls FROM stats_daily WHERE day >= ? AND day <= ?",
+            (day_names[0], day_names[-1])):
+        daily[day] = {"pages": pages, "searches": searches, "crawls": crawls}
+
+    durations = {
+        kind: {"runs": runs, "average": total / runs if runs else 0, "max": maximum, "last": last}
+        for kind, runs, total, maximum, last in conn.execute(
+            "SELECT kind, runs, total_seconds, max_seconds, last_seconds FROM stats_durations")
+    }
+
+    return {
+        "counters": counters,
+        "domains": top("stats_domains", "domain", "pages", top_domains, counters["pages"]),
+        "file_types": top("stats_file_types", "ext", "files", top_file_types, counters["files"]),
+        "daily": daily,
+        "durations": durations,
+    }
+
+
+STATS_TABLES = ('stats_counters', 'stats_domains', 'stats_file_types', 'stats_daily', 'stats_durations')
+
+
+def _tables_exist(conn):
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' for _ in STATS_TABLES)})",
+        STATS_TABLES
+    ).fetchone()
+    return row[0] == len(STATS_TABLES)
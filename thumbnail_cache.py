@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from PIL import Image, ImageOps
+
+
+# Resized thumbnails are kept here as PNG files, one per (image URL, size)
+THUMBNAIL_CACHE_DIR = "database/cache/thumbnails"
+# Default for the GUI's cache_limit_mb setting
+DEFAULT_CACHE_LIMIT_MB = 100
+# Threads fetching and resizing images, and seconds allowed per download
+THUMBNAIL_WORKERS = 4
+THUMBNAIL_TIMEOUT = 5
+
+
+def thumbnail_key(url, size):
+    """File name of the thumbnail of `url` at `size`: a hash of both"""
+    return hashlib.sha1(f"{url}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest() + ".png"
+
+
+def make_thumbnail(data, size):
+    """Crop and resize image bytes to exactly `size`, as an RGB(A) PIL image"""
+    img = Image.open(BytesIO(data))
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+    return ImageOps.fit(img, size, Image.LANCZOS)
+
+
+class ThumbnailCache:
+    """
+    Thumbnails on disk, evicted least recently used first once the
+    directory grows past limit_mb.
+
+    Recency is the file's mtime, refreshed on every hit, so the order
+    survives restarts; the directory is scanned once, on first use.
+    """
+
+    def __init__(self, cache_dir=THUMBNAIL_CACHE_DIR, limit_mb=DEFAULT_CACHE_LIMIT_MB, auto_evict=True):
+        self.cache_dir = cache_dir
+        self.limit_bytes = int(limit_mb * 1024 * 1024)
+        self.auto_evict = auto_evict
+        self._files = None  # name -> size in bytes, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def configure(self, limit_mb=None, auto_evict=None):
+        """Apply the GUI's cache_limit_mb / auto_clear_cache settings"""
+        with self._lock:
+            if limit_mb is not None:
+                self.limit_bytes = int(float(limit_mb) * 1024 * 1024)
+            if auto_evict is not None:
+                self.auto_evict = bool(auto_evict)
+            self._evict()
+
+    def clear(self):
+        """Forget the index, after the directory was removed from outside"""
+        with self._lock:
+            self._files = None
+            self._total = 0
+
+    def get(self, url, size):
+        """The cached thumbnail as a PIL image, or None"""
+        name = thumbnail_key(url, size)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            self._scan()
+            if name not in self._files:
+                self.stats["misses"] += 1
+                return None
+            self._files.move_to_end(name)
+        try:
+            img = Image.open(path)
+            img.load()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(name)
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+        return img
+
+    def put(self, url, size, img):
+        """Store a thumbnail, then evict old ones if over the limit"""
+        name = thumbnail_key(url, size)
+        path = os.path.join(self.cache_dir, name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            img.save(tmp_path, "PNG", optimize=True)
+            os.replace(tmp_path, path)
+            file_size = os.path.getsize(path)
+        except OSError as e:
+            logging.error(f"Could not cache thumbnail for {url}: {str(e)}")
+            return
+        with self._lock:
+            self._scan()
+            self._forget(name)
+            self._files[name] = file_size
+            self._total += file_size
+            self._evict()
+
+    def size_bytes(self):
+        with self._lock:
+            self._scan()
+            return self._total
+
+    def _scan(self):
+        if self._files is not None:
+            return
+        entries = []
+        try:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+        except FileNotFoundError:
+            pass
+        entries.sort()
+        self._files = OrderedDict((name, size) for _, name, size in entries)
+        self._total = sum(self._files.values())
+
+    def _forget(self, name):
+        if self._files is not None and name in self._files:
+            self._total -= self._files.pop(name)
+
+    def _evict(self):
+        if not self.auto_evict or self._files is None:
+            return
+        while self._files and self._total > self.limit_bytes:
+            name, size = self._files.popitem(last=False)
+            self._total -= size
+            self.stats["evicted"] += 1
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+
+class ThumbnailLoader:
+    """
+    Fetches and resizes thumbnails on a worker pool, through a ThumbnailCache.
+
+    request() returns at once; `callback(img)` runs later on a worker
+    thread with a PIL image, or None if the image could not be loaded.
+    Tk callers must hop back to the main thread (after()) before touching
+    widgets or making a PhotoImage. Requests for a thumbnail that is
+    already being loaded share the one download.
+    """
+
+    def __init__(self, cache=None, workers=THUMBNAIL_WORKERS, timeout=THUMBNAIL_TIMEOUT, session=None):
+        self.cache = cache or ThumbnailCache()
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def request(self, url, size, callback):
+        key = (url, tuple(size))
+        with self._lock:
+            if key in self._pending:
+                self._pending[key].append(callback)
+                return
+            self._pending[key] = [callback]
+        try:
+            self._executor.submit(self._load, key)
+        except RuntimeError:
+            # Shut down: nothing will be loaded any more
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _load(self, key):
+        url, size = key
+        img = None
+        try:
+            img = self.cache.get(url, size)
+            if img is None:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                img = make_thumbnail(response.content, size)
+                self.cache.put(url, size, img)
+        except Exception as e:
+            logging.info(f"Could not load thumbnail {url}: {str(e)}")
+            img = None
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+        for callback in callbacks:
+            try:
+                callback(img)
+            except Exception as e:
+                logging.error(f"Thumbnail callback failed for {url}: {str(e)}")
+
+    def shutdown(self):
+        """Drop queued requests and stop the workers"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
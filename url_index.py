@@ -0,0 +1,231 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from page_store import DB_PATH, table_exists
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {'fbclid', 'gclid', 'gclsrc', 'dclid', 'msclkid', 'yclid', 'igshid',
+                   'mc_cid', 'mc_eid', '_ga', '_gl'}
+TRACKING_PREFIXES = ('utm_',)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Pages fetched more recently than this are not fetched again
+FRESH_FOR_HOURS = 24
+# Same format as pages.timestamp, so the two compare as strings
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Canonical key -> the URL its page is stored under, and when it was last fetched
+URL_INDEX_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS url_index (
+        key TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        fetched_at TEXT NOT NULL
+    ) WITHOUT ROWID
+"""
+# A page's own URL always wins its key; a canonical_url alias only claims a
+# key nothing else is stored under
+UPSERT_URL_SQL = """
+    INSERT INTO url_index (key, url, fetched_at) VALUES (?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET url = excluded.url, fetched_at = max(fetched_at, excluded.fetched_at)
+"""
+UPSERT_ALIAS_SQL = """
+    INSERT INTO url_index (key, url, fetched_at) VALUES (?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET fetched_at = max(fetched_at, excluded.fetched_at)
+"""
+# Pages that are only a record of a failed fetch (see crawl_with_async_engine)
+STORED_PAGES_WHERE = "NOT (title = 'Error' AND body_content LIKE 'Failed: %')"
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def clean_url(url):
+    """
+    The URL to fetch for `url`: scheme and host lowercased, default port,
+    fragment and tracking parameters (utm_*, fbclid, gclid, ...) dropped,
+    the remaining query parameters sorted. Anything that is not an http(s)
+    URL is returned stripped but otherwise unchanged.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname
+    if ':' in host:
+        host = f"[{host}]"
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.username if parts.password is None else f"{parts.username}:{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+
+    params = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if not _is_tracking(name))
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(params), ''))
+
+
+def url_key(url):
+    """
+    Dedup key of a URL: clean_url(), further ignoring the scheme, a
+    leading "www." and a trailing slash. Only used for comparing, never
+    fetched, as a site may not answer without its "www.".
+    """
+    cleaned = clean_url(url)
+    parts = urlsplit(cleaned)
+    if parts.scheme not in DEFAULT_PORTS:
+        return cleaned
+    netloc = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    path = parts.path.rstrip('/') or '/'
+    return f"{netloc}{path}?{parts.query}" if parts.query else f"{netloc}{path}"
+
+
+def page_entries(rows, fetched_at=None):
+    """
+    url_index rows for stored pages, aliases first.
+
+    Parameters:
+        rows: (url, canonical_url, timestamp) tuples from pages.
+        fetched_at (str): Overrides the pages' own timestamps.
+
+    Returns:
+        tuple: (alias rows, own rows), each a list of (key, url, fetched_at).
+    """
+    aliases, own = [], []
+    for url, canonical_url, timestamp in rows:
+        when = fetched_at or timestamp or ''
+        own.append((url_key(url), url, when))
+        if canonical_url:
+            canonical = urljoin(url, canonical_url)
+            if canonical.startswith(('http://', 'https://')) and url_key(canonical) != url_key(url):
+                aliases.append((url_key(canonical), url, when))
+    return aliases, own
+
+
+class UrlIndex:
+    """
+    Which URLs are already known, so duplicates and recently fetched pages
+    are dropped before any network I/O.
+
+    The whole url_index table is held in memory as a dict (key -> stored
+    URL, last fetch), loaded once per crawl; a few hundred thousand pages
+    take tens of MB, so a Bloom filter's false positives are not worth it.
+    The table is back-filled from pages the first time it is created and
+    kept up to date by record() after each crawl.
+
+    A page whose canonical_url differs from its own URL is indexed under
+    both, so a search hit on either is recognised as the same page.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_age=timedelta(hours=FRESH_FOR_HOURS)):
+        self.db_path = db_path
+        self.max_age = max_age
+        self._known = {}
+        self._queued = set()
+        self.counts = {"unseen": 0, "stale": 0, "fresh": 0, "duplicates": 0}
+
+    def load(self):
+        """Read the index, creating and back-filling it if needed"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                created = not table_exists(conn, 'url_index')
+                conn.execute(URL_INDEX_SCHEMA_SQL)
+                if created and table_exists(conn, 'pages'):
+                    aliases, own = page_entries(conn.execute(
+                        f"SELECT url, canonical_url, timestamp FROM pages WHERE {STORED_PAGES_WHERE}"))
+                    conn.executemany(UPSERT_ALIAS_SQL, aliases)
+                    conn.executemany(UPSERT_URL_SQL, own)
+                    logging.info(f"Indexed {len(own)} stored pages and {len(aliases)} canonical URLs")
+            self._known = {key: (url, fetched_at)
+                           for key, url, fetched_at in conn.execute("SELECT key, url, fetched_at FROM url_index")}
+        except sqlite3.Error as e:
+            logging.error(f"Could not load URL index: {str(e)}")
+        finally:
+            conn.close()
+        logging.info(f"Loaded {len(self._known)} known URLs")
+        return self
+
+    def select(self, urls, refresh=False, fresh=None):
+        """
+        Drop duplicates (within this index's lifetime) and pages fetched in
+        the last `max_age`; with refresh=True only duplicates are dropped.
+        Pass a list as `fresh` to receive the stored URLs of the pages
+        dropped for being recent.
+
+        Returns:
+            list: URLs to fetch, in the given order: the stored URL for a
+                  known page, otherwise clean_url() of the URL given.
+        """
+        cutoff = (datetime.now() - self.max_age).strftime(TIMESTAMP_FORMAT)
+        selected = []
+        for url in urls:
+            cleaned = clean_url(url)
+            key = url_key(cleaned)
+            known = self._known.get(key)
+            target = known[0] if known else cleaned
+            if key in self._queued or target in self._queued:
+                self.counts["duplicates"] += 1
+                continue
+            self._queued.update((key, target))
+            if known is None:
+                self.counts["unseen"] += 1
+            elif not refresh and known[1] >= cutoff:
+                self.counts["fresh"] += 1
+                if fresh is not None:
+                    fresh.append(target)
+                continue
+            else:
+                self.counts["stale"] += 1
+            selected.append(target)
+        return selected
+
+    def record(self, urls, redirects=None, chunk_size=500):
+        """
+        Mark the pages stored for `urls` as fetched now, under their own and
+        canonical URLs. `redirects` maps requested URLs to the URL among
+        `urls` they redirected to; each is indexed as that page as well, so
+        the same search hit is not fetched again on the next run.
+        """
+        urls = list(dict.fromkeys(urls))
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            rows = []
+            for start in range(0, len(urls), chunk_size):
+                chunk = urls[start:start + chunk_size]
+                rows.extend(conn.execute(
+                    f"""SELECT url, canonical_url, timestamp FROM pages
+                        WHERE url IN ({', '.join('?' for _ in chunk)}) AND {STORED_PAGES_WHERE}""",
+                    chunk
+                ))
+            aliases, own = page_entries(rows, fetched_at=now)
+            stored = {url for url, canonical_url, timestamp in rows}
+            aliases.extend((url_key(requested), url, now) for requested, url in (redirects or {}).items()
+                           if url in stored and url_key(requested) != url_key(url))
+            with conn:
+                conn.execute(URL_INDEX_SCHEMA_SQL)
+                conn.executemany(UPSERT_ALIAS_SQL, aliases)
+                conn.executemany(UPSERT_URL_SQL, own)
+        except sqlite3.Error as e:
+            logging.error(f"Could not update URL index: {str(e)}")
+            return
+        finally:
+            conn.close()
+        for key, url, fetched_at in aliases:
+            self._known[key] = (self._known.get(key, (url,))[0], fetched_at)
+        for key, url, fetched_at in own:
+            self._known[key] = (url, fetched_at)
+
+    def summary(self):
+        return (f"{self.counts['unseen']} new, {self.counts['stale']} to refresh, "
+                f"{self.counts['fresh']} fetched recently, {self.counts['duplicates']} duplicates")
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from page_store import DB_PATH
+from url_index import TIMESTAMP_FORMAT
+
+
+# Every URL a search returned, oldest first. Replaces database/output.json,
+# which searchec used to load, prepend to and rewrite in full on every search
+URL_LOG_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS url_log (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL,
+        query TEXT,
+        timestamp TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS url_log_timestamp ON url_log (timestamp)",
+]
+LEGACY_URL_LOG_PATH = "database/output.json"
+# Entries kept; the log is compacted once it has grown COMPACT_SLACK past this
+MAX_LOGGED_URLS = 100000
+COMPACT_SLACK = 10000
+
+_migrate_lock = threading.Lock()
+
+
+def _connect(db_path):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=10)
+    for statement in URL_LOG_SCHEMA_SQL:
+        conn.execute(statement)
+    return conn
+
+
+def migrate_legacy_url_log(conn, path=None):
+    """
+    Move the entries of an old output.json into url_log. Runs once: the
+    file is renamed to output.json.migrated afterwards (output.json.invalid
+    if it could not be read).
+
+    Returns:
+        int: Entries migrated.
+    """
+    path = path or LEGACY_URL_LOG_PATH
+    with _migrate_lock:
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("urls", [])
+        except (OSError, ValueError, AttributeError) as e:
+            logging.error(f"Could not read {path} for migration: {str(e)}")
+            os.replace(path, f"{path}.invalid")
+            return 0
+
+        # output.json is newest first
+        rows = [(entry["url"], entry.get("timestamp") or "") for entry in reversed(entries)
+                if isinstance(entry, dict) and entry.get("url")]
+        with conn:
+            conn.executemany("INSERT INTO url_log (url, timestamp) VALUES (?, ?)", rows)
+        os.replace(path, f"{path}.migrated")
+    logging.info(f"Migrated {len(rows)} URLs from {path} to the url_log table")
+    return len(rows)
+
+
+def compact_url_log(conn, max_rows=None):
+    """
+    Rotate out everything but the last `max_rows` entries logged (default
+    MAX_LOGGED_URLS), then keep only the newest entry for each URL.
+
+    Returns:
+        int: Entries removed.
+    """
+    max_rows = max_rows or MAX_LOGGED_URLS
+    with conn:
+        last = conn.execute("SELECT max(id) FROM url_log").fetchone()[0] or 0
+        removed = conn.execute("DELETE FROM url_log WHERE id <= ?", (last - max_rows,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM url_log WHERE id NOT IN (SELECT max(id) FROM url_log GROUP BY url)"
+        ).rowcount
+    logging.info(f"Compacted the URL log: {removed} old entries removed")
+    return removed
+
+
+def log_urls(urls, query=None, db_path=DB_PATH):
+    """
+    Append a search's URLs to the log in one transaction, compacting the
+    log when it has grown COMPACT_SLACK entries past MAX_LOGGED_URLS.
+    """
+    timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+    try:
+        conn = _connect(db_path)
+        try:
+            migrate_legacy_url_log(conn)
+            with conn:
+                conn.executemany("INSERT INTO url_log (url, query, timestamp) VALUES (?, ?, ?)",
+                                 [(url, query, timestamp) for url in urls])
+            # The id span bounds the entry count without a scan; compaction
+            # brings it back down to MAX_LOGGED_URLS
+            first, last = conn.execute("SELECT min(id), max(id) FROM url_log").fetchone()
+            if first is not None and last - first + 1 > MAX_LOGGED_URLS + COMPACT_SLACK:
+                compact_url_log(conn)
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        logging.error(f"Could not log URLs: {str(e)}")
+
+
+def recent_urls(limit=100, since=None, db_path=DB_PATH):
+    """
+    The most recently logged URLs, optionally only those logged at or after
+    `since` (a "%Y-%m-%d %H:%M:%S" timestamp).
+
+    Returns:
+        list: {"url", "query", "timestamp"} dicts, newest first.
+    """
+    try:
+        conn = _connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            migrate_legacy_url_log(conn)
+            if since:
+                rows = conn.execute(
+                    """SELECT url, query, timestamp FROM url_log WHERE timestamp >= ?
+                       ORDER BY timestamp DESC, id DESC LIMIT ?""", (since, limit))
+            else:
+                rows = conn.execute("SELECT url, query, timestamp FROM url_log ORDER BY id DESC LIMIT ?",
+                                    (limit,))
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        logging.error(f"Could not read URL log: {str(e)}")
+        return []
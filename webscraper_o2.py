@@ -1,27 +1,44 @@
 import os
-import platform
-import subprocess
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from typing import List, Dict
 import scrapy
 from scrapy.crawler import CrawlerProcess
+from scrapy.http import TextResponse
 import json
 from datetime import datetime
-from googlesearch import search
 import re
 from bs4 import BeautifulSoup
+from parsel import Selector
 import sqlite3
 import logging
 from urllib.parse import urlparse, urljoin
 import random
 import time
-import webbrowser
-import requests
+import queue
+import threading
 from twisted.internet.error import DNSLookupError, TimeoutError
+from scrapy.exceptions import IgnoreRequest
+from scrapy.utils.defer import maybe_deferred_to_future
 
 
 from proxy_cheaker import proxy_cheaker
+from fetch_engine import AsyncFetchEngine
+from file_checker import FileLinkChecker
+from page_store import (DB_PATH, PAGE_COLUMNS, PageWriter, ensure_schema, fetch_pages, init_schema, store_generation,
+                        table_exists)
+from html_extractor import extract_document
+from boilerplate import load_stripper
+from recrawl import RecrawlTracker, content_hash
+from browser_preview import preview_url
+from result_sink import get_result_sink, query_entry
+from query_cache import QUERY_CACHE, normalize_content_type, normalize_terms
+from stats_store import record_duration
+from url_index import UrlIndex
+from crawl_frontier import FRONTIER_WINDOW, MAX_FRONTIER_PAGES, CrawlFrontier
+from host_scheduler import MAX_CONCURRENCY, get_host_scheduler
+from url_log import log_urls
+from search_backend import normalize_query, search_urls
 
 # Add parent directory to path for imports
 
@@ -78,39 +95,30 @@ def extract_main_words(query):
     main_words = [word for word in words if word.isalpha() and word not in stop_words]
     return main_words
 
-def searchec(query, num_results=10):
-    """Enhanced search function with better error handling"""
-    urls = []
-    try:
-        for result in search(
-            query,
-            sleep_interval=5,
-            num_results=num_results,
-            lang='en',
-            advanced=True,
-            safe=None,
-            unique=True
-        ):
-            url = getattr(result, 'url', result) if hasattr(result, 'url') else result
-            if isinstance(url, str) and url.startswith("http"):
-                urls.append(url)
-
-        # Load existing data
-        os.makedirs("database", exist_ok=True)
-        try:
-            with open("database/output.json", "r") as json_file:
-                data = json.load(json_file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {"urls": []}
+def search_and_log(query, num_results=10):
+    """
+    Result URLs for `query` from the configured search backend (see
+    search_backend: Google by default, or an offline fixture or seed file),
+    with Google results reused from the search cache for
+    SEARCH_CACHE_TTL_HOURS. Every URL found is recorded in the URL log (see
+    url_log). Search errors propagate.
+    """
+    urls = search_urls(query, num_results=num_results)
 
-        # Add new URLs with timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        for url in urls:
-            data["urls"].insert(0, {"url": url, "timestamp": timestamp})
+    # Appended to the url_log table; the old database/output.json is
+    # migrated into it the first time
+    log_urls(urls, query=query)
+    logging.info(f"Logged {len(urls)} URLs for '{query}'")
+    return urls
 
-        with open("database/output.json", "w") as json_file:
-            json.dump(data, json_file, indent=4)
-            logging.info(f"URLs added successfully at {timestamp}")
+
+def searchec(query, num_results=10):
+    """
+    Enhanced search function with better error handling: search_and_log(),
+    with errors logged and an empty list returned instead.
+    """
+    try:
+        urls = search_and_log(query, num_results=num_results)
         print(urls)
         return urls
 
@@ -119,57 +127,19 @@ def searchec(query, num_results=10):
         return []
 
 
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    text = re.sub(r'<[^>]+>', ' ', text)
-    boilerplate = [
-        r'Skip to main content', r'Sign In', r'Subscribe', r'Log In', r'Privacy Policy',
-        r'© \\d{4}', r'Search', r'Home', r'About', r'Contact', r'More', r'Follow us',
-        r'Terms of Use', r'Cookie Preferences', r'Netflix Shop', r'Top 10', r'Trending'
-    ]
-    for pattern in boilerplate:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-    return re.sub(r'\s+', ' ', text).strip()
+BOILERPLATE = load_stripper()
+
+
+def clean_text(text, domain=None):
+    """Strip tags and boilerplate (plus `domain`'s own patterns) and collapse whitespace"""
+    return BOILERPLATE.clean(text, domain)
 
 def init_database():
     """Initialize SQLite database with error handling"""
     try:
         os.makedirs("database", exist_ok=True)
-        conn = sqlite3.connect("database/scraped_data.db", timeout=10)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS pages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT UNIQUE,
-                title TEXT,
-                body_content TEXT,
-                meta_description TEXT,
-                meta_keywords TEXT,
-                images TEXT,
-                videos TEXT,
-                audio TEXT,
-                links TEXT,
-                social_media TEXT,
-                files TEXT,
-                og_title TEXT,
-                og_description TEXT,
-                og_image TEXT,
-                twitter_card TEXT,
-                twitter_title TEXT,
-                twitter_description TEXT,
-                twitter_image TEXT,
-                canonical_url TEXT,
-                robots TEXT,
-                author TEXT,
-                published_date TEXT,
-                modified_date TEXT,
-                timestamp TEXT
-            )
-        """)
-
-        conn.commit()
+        conn = sqlite3.connect(DB_PATH, timeout=10)
+        init_schema(conn)
         logging.info("Database initialized successfully")
     except sqlite3.Error as e:
         logging.error(f"Database initialization error: {str(e)}")
@@ -178,13 +148,6 @@ def init_database():
         conn.close()
 
 
-def is_downloadable(content_type):
-    downloadable_types = [
-        'application/pdf', 'application/msword', 'application/vnd.ms-excel',
-        'application/zip', 'application/x-rar-compressed', 'application/octet-stream'
-    ]
-    return any(dtype in content_type.lower() for dtype in downloadable_types)
-
 def make_absolute_url(base_url, rel_url):
     if not isinstance(rel_url, str) or not rel_url:
         return ""
@@ -194,240 +157,381 @@ def make_absolute_url(base_url, rel_url):
         logging.warning(f"URL joining error: {e}")
         return ""
 
+# "lxml" makes a single pass over the document (html_extractor); "bs4" is
+# the original BeautifulSoup + CSS selector path
+EXTRACTION_ENGINE = "lxml"
+
+# Requests in flight across all hosts; each host gets what HostScheduler
+# allows it, up to MAX_CONCURRENCY
+CRAWL_CONCURRENCY = 32
+
+SOCIAL_PATTERNS = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com']
+
+
+def social_links(links):
+    return [link for link in links if any(pattern in link['url'].lower() for pattern in SOCIAL_PATTERNS)]
+
+
+def extract_page_data(url, html, engine=None):
+    """
+    Extract text, media, links and metadata from an HTML document.
+
+    Parameters:
+        url (str): URL the document was fetched from, used to absolutize links.
+        html (str): Decoded HTML body.
+        engine (str): "lxml" or "bs4"; defaults to EXTRACTION_ENGINE.
+
+    Returns:
+        tuple: (page_data in the shape expected by the pages table,
+                list of (href, title) file links that still need a HEAD check).
+    """
+    engine = engine or EXTRACTION_ENGINE
+    if engine == "bs4":
+        return extract_page_data_bs4(url, html)
+    if engine != "lxml":
+        raise ValueError(f"Unknown extraction engine: {engine}")
+
+    doc = extract_document(url, html)
+    page_data = {
+        'title': doc['title'],
+        'body_content': clean_text(doc['text'], urlparse(url).netloc),
+        'meta_description': '',
+        'meta_keywords': '',
+        'images': json.dumps(doc['images']),
+        'videos': json.dumps(doc['videos']),
+        'audio': json.dumps(doc['audio']),
+        'links': json.dumps(doc['links']),
+        'social_media': json.dumps(social_links(doc['links'])),
+        'files': json.dumps(doc['files']),
+        'og_title': '',
+        'og_description': '',
+        'og_image': '',
+        'twitter_card': '',
+        'twitter_title': '',
+        'twitter_description': '',
+        'twitter_image': '',
+        'canonical_url': doc['canonical_url'],
+        'robots': '',
+        'author': '',
+        'published_date': '',
+        'modified_date': '',
+    }
+    page_data.update(doc['meta'])
+    return page_data, doc['file_candidates']
+
+
+def extract_page_data_bs4(url, html):
+    """BeautifulSoup/parsel implementation of extract_page_data"""
+    soup = BeautifulSoup(html, 'html.parser')
+    selector = Selector(text=html)
+    files = []
+
+    # Extract pdf
+        # Look for embedded viewers
+    for iframe in soup.find_all('iframe'):
+        src = iframe.get('src', '')
+        if '.pdf' in src:
+            files.append({
+                'url': make_absolute_url(url, src),
+                'title': 'Embedded PDF'
+            })
+            logging.info(f"Found embedded PDF: {src}")
+
+    # Extract images
+    images = []
+    for img in soup.find_all('img'):
+        if img.get('src'):
+            images.append({
+                'src': make_absolute_url(url, img.get('src')),
+                'alt': img.get('alt', ''),
+                'title': img.get('title', '')
+            })
+    # Extract videos (including iframes for YouTube/Vimeo)
+    videos = []
+    for video in soup.find_all(['video', 'iframe']):
+        src = video.get('src') or next((source.get('src') for source in video.find_all('source')), None)
+        if src:
+            videos.append({
+                'src': make_absolute_url(url, src),
+                'type': video.get('type', ''),
+                'title': video.get('title', '')
+            })
+    # Extract audio
+    audio = []
+    for audio_tag in soup.find_all(['audio']):
+        src = audio_tag.get('src') or next((source.get('src') for source in audio_tag.find_all('source')), None)
+        if src:
+            audio.append({
+                'src': make_absolute_url(url, src),
+                'type': audio_tag.get('type', '')
+            })
+    # Extract links
+    links = []
+    for link in soup.find_all('a', href=True):
+        href = make_absolute_url(url, link['href'])
+        if href:
+            links.append({
+                'url': href,
+                'text': link.get_text(strip=True),
+                'title': link.get('title', '')
+            })
+
+    # Extract social media links
+    social_media = social_links(links)
+
+    # Collect downloadable file candidates; they are HEAD-checked later by
+    # FileLinkChecker so the crawl never blocks on them
+    file_candidates = []
+    file_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.zip', '.rar']
+    for link in soup.find_all('a', href=True):
+        href = make_absolute_url(url, link['href'])
+        if href and any(href.lower().endswith(ext) for ext in file_extensions):
+            file_candidates.append((href, link.get('title', '') or link.get_text(strip=True)))
+
+    page_data = {
+        'title': selector.css('title::text').get(default=''),
+        'body_content': clean_text(soup.get_text(separator=' ', strip=True), urlparse(url).netloc),
+        'meta_description': selector.css('meta[name="description"]::attr(content)').get(default=''),
+        'meta_keywords': selector.css('meta[name="keywords"]::attr(content)').get(default=''),
+        'images': json.dumps(images),
+        'videos': json.dumps(videos),
+        'audio': json.dumps(audio),
+        'links': json.dumps(links),
+        'social_media': json.dumps(social_media),
+        'files': json.dumps(files),
+        'og_title': selector.css('meta[property="og:title"]::attr(content)').get(default=''),
+        'og_description': selector.css('meta[property="og:description"]::attr(content)').get(default=''),
+        'og_image': selector.css('meta[property="og:image"]::attr(content)').get(default=''),
+        'twitter_card': selector.css('meta[name="twitter:card"]::attr(content)').get(default=''),
+        'twitter_title': selector.css('meta[name="twitter:title"]::attr(content)').get(default=''),
+        'twitter_description': selector.css('meta[name="twitter:description"]::attr(content)').get(default=''),
+        'twitter_image': selector.css('meta[name="twitter:image"]::attr(content)').get(default=''),
+        'canonical_url': selector.css('link[rel="canonical"]::attr(href)').get(default=''),
+        'robots': selector.css('meta[name="robots"]::attr(content)').get(default=''),
+        'author': selector.css('meta[name="author"]::attr(content)').get(default=''),
+        'published_date': selector.css('meta[property="article:published_time"]::attr(content)').get(default=''),
+        'modified_date': selector.css('meta[property="article:modified_time"]::attr(content)').get(default=''),
+
+        # Add other metadata extractions
+    }
+    return page_data, file_candidates
+
+
+def store_page(writer, url, page_data):
+    """Queue a page on a PageWriter; shared by every fetch engine"""
+    try:
+        writer.add(url, page_data)
+        logging.info(f"Queued data for {url}")
+        preview_url(url)  # No-op unless browser previews are enabled
+    except Exception as e:
+        logging.error(f"Database store error for {url}: {str(e)}")
+
+
+def process_response(url, status, content_type, html, store, file_checker=None, extraction_engine=None,
+                     headers=None, recrawl=None, on_links=None):
+    """
+    Validate a fetched response, extract its data and hand it to `store`.
+
+    Shared by EnhancedContentSpider.parse and the asyncio fetch engine so both
+    paths produce identical rows.
+
+    Parameters:
+        url (str): Final URL of the response.
+        status (int): HTTP status code.
+        content_type (str): Content-Type header value.
+        html (str): Decoded response body.
+        store (callable): store(url, page_data) used to persist the page.
+        file_checker (FileLinkChecker): Validates file links in the background
+            and back-fills the files column; without it only embedded files are kept.
+        extraction_engine (str): "lxml" or "bs4"; defaults to EXTRACTION_ENGINE.
+        headers (dict): Response headers with lowercased names; ETag and
+            Last-Modified are stored for conditional re-crawls.
+        recrawl (RecrawlTracker): When given, 304s and bodies identical to the
+            stored copy are skipped without parsing or storing.
+        on_links (callable): on_links(links) gets the extracted links of each
+            stored page, for link-following crawls.
+
+    Returns:
+        dict: Feed item summarizing the page, {'url', 'skipped'} for an
+              unchanged page, or {'url', 'error'} on failure.
+    """
+    try:
+        if recrawl and recrawl.not_modified(url, status):
+            logging.info(f"Not modified since last crawl: {url}")
+            return {'url': url, 'skipped': 'not modified'}
+
+        if status != 200:
+            logging.error(f"Non-200 status code ({status}) for {url}")
+            return {'url': url, 'error': f'Status code: {status}'}
+
+        if not html:
+            logging.error(f"Empty response body for {url}")
+            return {'url': url, 'error': 'Empty response'}
+
+        content_type = (content_type or '').lower()
+        if 'text/html' not in content_type:
+            logging.error(f"Non-HTML content type ({content_type}) for {url}")
+            return {'url': url, 'error': f'Invalid content type: {content_type}'}
+
+        headers = headers or {}
+        etag = headers.get('etag', '')
+        last_modified = headers.get('last-modified', '')
+        body_hash = content_hash(html)
+        if recrawl and recrawl.unchanged(url, body_hash, etag, last_modified):
+            logging.info(f"Content unchanged since last crawl: {url}")
+            return {'url': url, 'skipped': 'unchanged'}
+
+        page_data, file_candidates = extract_page_data(url, html, extraction_engine)
+        page_data.update(etag=etag, last_modified=last_modified, content_hash=body_hash)
+
+        pending_files = []
+        if file_checker:
+            files, pending_files = file_checker.split_cached(json.loads(page_data['files']), file_candidates)
+            page_data['files'] = json.dumps(files)
+
+        # Store data now; files still being checked are back-filled later
+        store(url, page_data)
+        if pending_files:
+            file_checker.submit_page(url, files, pending_files)
+        if on_links:
+            on_links(json.loads(page_data['links']))
+
+        return {
+            'url': url,
+            'title': page_data['title'],
+            'content_length': len(page_data['body_content']),
+            'content_summary': {
+                f'{key}_count': len(json.loads(page_data[key]))
+                for key in ('images', 'videos', 'audio', 'links', 'social_media', 'files')
+            }
+        }
+
+    except Exception as e:
+        logging.error(f"Parse error for {url}: {str(e)}")
+        return {'url': url, 'error': str(e)}
+
+
 class EnhancedContentSpider(scrapy.Spider):
     name = "enhanced_content_spider"
+    # Pacing is left to HostSchedulerMiddleware (see crawler_settings)
     custom_settings = {
         'RETRY_TIMES': 3,
         'RETRY_HTTP_CODES': [500, 502, 503, 504, 522, 524, 408, 429],
-        'DOWNLOAD_DELAY': 2,
-        'RANDOMIZE_DOWNLOAD_DELAY': True,
     }
+    # Let 304 Not Modified through to parse() for conditional re-crawls
+    handle_httpstatus_list = [304]
 
-    def __init__(self, urls=None, proxies=None, *args, **kwargs):
+    def __init__(self, urls=None, proxies=None, db_path=DB_PATH, extraction_engine=None, recrawl=None,
+                 frontier=None, on_done=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.start_urls = urls or []
+        # With a CrawlFrontier, URLs come from it instead of start_urls and
+        # the links of every page are fed back into it
+        self.frontier = frontier
+        # on_done(url, requested_url) for every URL stored, failed or skipped:
+        # the URL its row is stored under and, if it redirected, the one requested
+        self.on_done = on_done
         self.proxies = proxies or []
+        self.extraction_engine = extraction_engine or EXTRACTION_ENGINE
+        self.recrawl = recrawl
+        self.skipped = 0
+        # One pooled connection for the whole crawl; rows are batched
+        self.writer = PageWriter(db_path)
+        self.file_checker = FileLinkChecker(self.writer, headers_factory=get_random_headers)
 
     def start_requests(self):
         """Start requests with proxy rotation"""
+        if self.frontier:
+            yield from self.frontier_requests()
+            return
         for url in self.start_urls:
-            proxy = random.choice(self.proxies) if self.proxies and not url.startswith('https://') else None
-            yield scrapy.Request(
-                url=url,
-                meta={'proxy': proxy} if proxy else None,
-                callback=self.parse,
-                errback=self.errback,
-                headers=get_random_headers()
-            )
+            yield self.make_request(url)
 
-    def parse(self, response):
-        """Parse response with improved error handling"""
-        try:
-            if response.status != 200:
-                logging.error(f"Non-200 status code ({response.status}) for {response.url}")
-                return {'url': response.url, 'error': f'Status code: {response.status}'}
-                
-            if not response.body:
-                logging.error(f"Empty response body for {response.url}")
-                return {'url': response.url, 'error': 'Empty response'}
-                
-            content_type = response.headers.get('content-type', b'').decode().lower()
-            if 'text/html' not in content_type:
-                logging.error(f"Non-HTML content type ({content_type}) for {response.url}")
-                return {'url': response.url, 'error': f'Invalid content type: {content_type}'}
-
-            # if not any(t in content_type for t in ['text/html', 'application/pdf']):
-            #     logging.warning(f"Non-supported content type: {content_type}")
-            #     return
-            
-            # if 'application/pdf' in content_type:
-            #     filename = response.url.split('/')[-1]
-            #     with open(f"downloads/{filename}", 'wb') as f:
-            #         f.write(response.body)
-
-            
-            soup = BeautifulSoup(response.body, 'html.parser')
-            # Extract pdf
-                # Look for embedded viewers
-            for iframe in soup.find_all('iframe'):
-                src = iframe.get('src', '')
-                if '.pdf' in src:
-                    files.append({
-                        'url': make_absolute_url(response.url, src),
-                        'title': 'Embedded PDF'
-                    })
-                    logging.info(f"Found embedded PDF: {src}")
-
-            # Extract images
-            images = []
-            for img in soup.find_all('img'):
-                if img.get('src'):
-                    images.append({
-                        'src': make_absolute_url(response.url, img.get('src')),
-                        'alt': img.get('alt', ''),
-                        'title': img.get('title', '')
-                    })
-            # Extract videos (including iframes for YouTube/Vimeo)
-            videos = []
-            for video in soup.find_all(['video', 'iframe']):
-                src = video.get('src') or next((source.get('src') for source in video.find_all('source')), None)
-                if src:
-                    videos.append({
-                        'src': make_absolute_url(response.url, src),
-                        'type': video.get('type', ''),
-                        'title': video.get('title', '')
-                    })
-            # Extract audio
-            audio = []
-            for audio_tag in soup.find_all(['audio']):
-                src = audio_tag.get('src') or next((source.get('src') for source in audio_tag.find_all('source')), None)
-                if src:
-                    audio.append({
-                        'src': make_absolute_url(response.url, src),
-                        'type': audio_tag.get('type', '')
-                    })
-            # Extract links
-            links = []
-            for link in soup.find_all('a', href=True):
-                href = make_absolute_url(response.url, link['href'])
-                if href:
-                    links.append({
-                        'url': href,
-                        'text': link.get_text(strip=True),
-                        'title': link.get('title', '')
-                    })
-
-            # Extract social media links
-            social_media = []
-            social_patterns = ['facebook.com', 'twitter.com', 'instagram.com', 'linkedin.com', 'youtube.com']
-            for link in links:
-                if any(pattern in link['url'].lower() for pattern in social_patterns):
-                    social_media.append(link)
-
-            # Extract downloadable files
-            files = []
-            file_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.csv', '.zip', '.rar']
-            for link in soup.find_all('a', href=True):
-                href = make_absolute_url(response.url, link['href'])
-                if href and any(href.lower().endswith(ext) for ext in file_extensions):
-                    try:
-                        head = requests.head(href, headers=get_random_headers(), timeout=5, allow_redirects=True)
-                        if is_downloadable(head.headers.get('content-type', '')):
-                            files.append({
-                                'url': href,
-                                'title': link.get('title', '') or link.get_text(strip=True)
-                            })
-                    except Exception as e:
-                        logging.warning(f"Failed to HEAD-check file link: {href} – {str(e)}")
-
-            
-            page_data = {
-                'title': response.css('title::text').get(default=''),
-                'body_content': clean_text(soup.get_text(separator=' ', strip=True)),
-                'meta_description': response.css('meta[name="description"]::attr(content)').get(default=''),
-                'meta_keywords': response.css('meta[name="keywords"]::attr(content)').get(default=''),
-                'images': json.dumps(images),
-                'videos': json.dumps(videos),
-                'audio': json.dumps(audio),
-                'links': json.dumps(links),
-                'social_media': json.dumps(social_media),
-                'files': json.dumps(files),
-                'og_title': response.css('meta[property="og:title"]::attr(content)').get(default=''),
-                'og_description': response.css('meta[property="og:description"]::attr(content)').get(default=''),
-                'og_image': response.css('meta[property="og:image"]::attr(content)').get(default=''),
-                'twitter_card': response.css('meta[name="twitter:card"]::attr(content)').get(default=''),
-                'twitter_title': response.css('meta[name="twitter:title"]::attr(content)').get(default=''),
-                'twitter_description': response.css('meta[name="twitter:description"]::attr(content)').get(default=''),
-                'twitter_image': response.css('meta[name="twitter:image"]::attr(content)').get(default=''),
-                'canonical_url': response.css('link[rel="canonical"]::attr(href)').get(default=''),
-                'robots': response.css('meta[name="robots"]::attr(content)').get(default=''),
-                'author': response.css('meta[name="author"]::attr(content)').get(default=''),
-                'published_date': response.css('meta[property="article:published_time"]::attr(content)').get(default=''),
-                'modified_date': response.css('meta[property="article:modified_time"]::attr(content)').get(default=''),
-                
-                # Add other metadata extractions
-            }
+    def make_request(self, url, meta=None):
+        proxy = random.choice(self.proxies) if self.proxies and not url.startswith('https://') else None
+        headers = get_random_headers()
+        if self.recrawl:
+            headers.update(self.recrawl.request_headers(url))
+        meta = dict(meta or {})
+        if proxy:
+            meta['proxy'] = proxy
+        return scrapy.Request(
+            url=url,
+            meta=meta or None,
+            callback=self.parse,
+            errback=self.errback,
+            headers=headers
+        )
 
-            # Store data
-            self.store_data(response.url, page_data)
-            
-            yield {
-                'url': response.url,
-                'title': page_data['title'],
-                'content_length': len(page_data['body_content']),
-                'content_summary': {
-                    'images_count': len(images),
-                    'videos_count': len(videos),
-                    'audio_count': len(audio),
-                    'links_count': len(links),
-                    'social_media_count': len(social_media),
-                    'files_count': len(files)
-                }
-                    
-                
-            }
+    def frontier_requests(self):
+        """Top the crawl up from the frontier to FRONTIER_WINDOW requests in flight"""
+        urls = self.frontier.pop(FRONTIER_WINDOW - self.frontier.in_flight)
+        if self.recrawl:
+            self.recrawl.load(urls)
+        for url in urls:
+            yield self.make_request(url, meta={'frontier_url': url})
 
+    def parse(self, response):
+        """Parse response with improved error handling"""
+        content_type = response.headers.get('content-type', b'').decode()
+        if isinstance(response, TextResponse):
+            html = response.text
+        else:
+            html = response.body.decode('utf-8', errors='replace')
+        headers = {
+            'etag': response.headers.get('ETag', b'').decode('latin-1'),
+            'last-modified': response.headers.get('Last-Modified', b'').decode('latin-1'),
+        }
+        frontier_url = response.meta.get('frontier_url')
+        on_links = (lambda links: self.frontier.add_links(frontier_url, links)) if frontier_url else None
+        item = process_response(response.url, response.status, content_type, html,
+                                self.store_data, self.file_checker, self.extraction_engine,
+                                headers, self.recrawl, on_links)
+        if frontier_url and 'skipped' in item:
+            # Not stored again, so its links come from the stored copy
+            self.frontier.add_stored(frontier_url)
+        yield item
+        self.finished(response.url, response.request)
+        if frontier_url:
+            self.frontier.done(frontier_url)
+            yield from self.frontier_requests()
 
-        except Exception as e:
-            logging.error(f"Parse error for {response.url}: {str(e)}")
-            yield {'url': response.url, 'error': str(e)}
+    def finished(self, url, request):
+        if self.on_done:
+            self.on_done(url, request.meta.get('redirect_urls', [request.url])[0])
 
     def store_data(self, url, page_data):
-        """Store data in database with transaction handling"""
-        conn = sqlite3.connect("database/scraped_data.db", timeout=10)
-        cursor = conn.cursor()
-        
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute("""
-                INSERT OR REPLACE INTO pages (
-                    url, title, body_content, meta_description, meta_keywords,
-                    images, videos, audio, links, social_media, files,
-                    og_title, og_description, og_image,
-                    twitter_card, twitter_title, twitter_description, twitter_image,
-                    canonical_url, robots, author, published_date, modified_date,
-                    timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-""", (
-                url,
-                page_data.get('title', ''),
-                page_data.get('body_content', ''),
-                page_data.get('meta_description', ''),
-                page_data.get('meta_keywords', ''),
-                page_data.get('images', '[]'),
-                page_data.get('videos', '[]'),
-                page_data.get('audio', '[]'),
-                page_data.get('links', '[]'),
-                page_data.get('social_media', '[]'),
-                page_data.get('files', '[]'),
-                page_data.get('og_title', ''),
-                page_data.get('og_description', ''),
-                page_data.get('og_image', ''),
-                page_data.get('twitter_card', ''),
-                page_data.get('twitter_title', ''),
-                page_data.get('twitter_description', ''),
-                page_data.get('twitter_image', ''),
-                page_data.get('canonical_url', ''),
-                page_data.get('robots', ''),
-                page_data.get('author', ''),
-                page_data.get('published_date', ''),
-                page_data.get('modified_date', ''),
-                timestamp
-            ))
-            conn.commit()
-            logging.info(f"Successfully stored data for {url}")
-            open_close_url(url)  # Open the URL in a web browser
-            
-        except sqlite3.Error as e:
-            conn.rollback()
-            logging.error(f"Database store error for {url}: {str(e)}")
-        finally:
-            conn.close()
+        """Queue data for the batched database writer"""
+        store_page(self.writer, url, page_data)
+
+    def closed(self, reason):
+        """Flush any buffered rows when the spider finishes"""
+        self.file_checker.close()
+        if self.recrawl:
+            self.recrawl.save_validators(self.writer)
+            logging.info(f"Re-crawl: {self.recrawl.summary()}")
+        self.writer.close()
+        if self.frontier:
+            self.frontier.close()
+            logging.info(f"Frontier: {self.frontier.summary()}")
+        logging.info(f"Spider closed ({reason}); {self.writer.rows_written} pages written, "
+                     f"{self.skipped} requests skipped")
 
     def errback(self, failure):
         """Handle request failures"""
         
         url = failure.request.url
+        frontier_url = failure.request.meta.get('frontier_url')
+        if failure.check(IgnoreRequest):
+            # Refused by robots.txt (HostSchedulerMiddleware): nothing was
+            # fetched, so a stored copy of the page is left as it is
+            logging.info(f"Request skipped for {url}: {failure.value}")
+            self.skipped += 1
+            self.finished(url, failure.request)
+            if frontier_url:
+                self.frontier.done(frontier_url)
+                yield from self.frontier_requests()
+            return
         logging.error(f"Request failed for {url}")
         logging.error(f"Failure type: {type(failure)}")
         logging.error(f"Failure value: {failure.value}")
@@ -443,9 +547,217 @@ class EnhancedContentSpider(scrapy.Spider):
         logging.error(f"Error details: {error}")
         logging.error(f"Request failed for {url}: {error}")
         self.store_data(url, {'title': 'Error', 'body_content': f"Failed: {error}"})
+        self.finished(url, failure.request)
+        if frontier_url:
+            self.frontier.done(frontier_url)
+            yield from self.frontier_requests()
+
+
+class HostSchedulerMiddleware:
+    """
+    Downloader middleware that runs the spider's requests through the
+    process-wide HostScheduler, as the asyncio engine does: robots.txt from
+    the on-disk cache (IgnoreRequest when disallowed), then a wait for the
+    host's adaptive rate and concurrency limits. Every response and
+    download error is reported back so the limits adapt. Placed after
+    RetryMiddleware and RedirectMiddleware (600), it sees every response
+    before they turn it into a new request, so retries and redirects are
+    scheduled like new requests and no slot is left unreleased.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(get_host_scheduler())
+
+    async def process_request(self, request, spider):
+        from twisted.internet import reactor, task, threads
+
+        # robots.txt goes through the request's own proxy, if it has one
+        allowed = threads.deferToThread(self.scheduler.allowed, request.url, request.meta.get('proxy'))
+        if not await maybe_deferred_to_future(allowed):
+            raise IgnoreRequest(f"Disallowed by robots.txt: {request.url}")
+        while True:
+            delay = self.scheduler.acquire(request.url)
+            if not delay:
+                break
+            await maybe_deferred_to_future(task.deferLater(reactor, delay, lambda: None))
+        request.meta['host_slot_started'] = time.perf_counter()
+        return None
+
+    def process_response(self, request, response, spider):
+        self._release(request, response.status, response.headers.get('Retry-After', b'').decode('latin-1'))
+        return response
+
+    def process_exception(self, request, exception, spider):
+        self._release(request, None)
+        return None
+
+    def _release(self, request, status, retry_after=None):
+        # Only requests that got a slot; retries are copied without the key
+        started = request.meta.pop('host_slot_started', None)
+        if started is not None:
+            self.scheduler.release(request.url, status, time.perf_counter() - started, retry_after)
+
+
+def crawler_settings(proxies):
+    """
+    Scrapy settings used for the CrawlerProcess fetch engine.
+
+    robots.txt, download delays and per-host concurrency are handled by
+    HostSchedulerMiddleware (robots.txt cached on disk across runs), so
+    Scrapy's own ROBOTSTXT_OBEY, DOWNLOAD_DELAY and AutoThrottle are off and
+    its concurrency limits are only upper bounds.
+    """
+    return {
+        'USER_AGENT': random.choice(USER_AGENTS_LIST),
+        'ROBOTSTXT_OBEY': False,
+        'DOWNLOAD_TIMEOUT': 30,
+        'DOWNLOAD_DELAY': 0,
+        'AUTOTHROTTLE_ENABLED': False,
+        'CONCURRENT_REQUESTS': CRAWL_CONCURRENCY,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': MAX_CONCURRENCY,
+        'DOWNLOADER_MIDDLEWARES': {
+            'scrapy.downloadermiddlewares.retry.RetryMiddleware': 550,
+            'webscraper_o2.HostSchedulerMiddleware': 650,
+        },
+        'ROTATING_PROXY_LIST': proxies,
+        'LOG_LEVEL': 'INFO',
+        'FEED_FORMAT': 'json',
+        'FEED_URI': 'database/scraped_data.json',
+        'FEED_EXPORT_ENCODING': 'utf-8',
+    }
+
+
+def crawl_with_async_engine(urls, proxies=None, db_path=DB_PATH, recrawl=None, feed=None, on_done=None,
+                            should_stop=None, frontier=None):
+    """
+    Crawl URLs with the asyncio fetch engine, storing pages like the spider does.
+
+    Restartable: can be called repeatedly in the same process.
+
+    Pass a queue.Queue of URL lists ended by None as `feed` (and urls=None)
+    to keep adding URLs to the same crawl session while it runs; see
+    AsyncFetchEngine.run_feed. `on_done(url)` is called once each URL has
+    been stored, has failed or was refused by robots.txt, and
+    `should_stop()` can cut the crawl short. Refused URLs leave no row
+    behind, so a stored copy of such a page stays as it was.
+
+    With a CrawlFrontier as `frontier` (and urls=None), URLs are taken from
+    it as the crawl goes and the links of every stored page are fed back
+    into it; the frontier is closed, saving what is left of its queue, when
+    the crawl ends.
+
+    Returns:
+        dict: Crawl stats from AsyncFetchEngine, plus the RecrawlTracker
+              counts when `recrawl` is given.
+    """
+    writer = PageWriter(db_path)
+    file_checker = FileLinkChecker(writer, headers_factory=get_random_headers)
+
+    def store(url, page_data):
+        store_page(writer, url, page_data)
+
+    def finished(url):
+        if frontier:
+            frontier.done(url)
+        if on_done:
+            on_done(url)
+
+    def handle(url, status, content_type, html, headers):
+        on_links = (lambda links: frontier.add_links(url, links)) if frontier else None
+        try:
+            item = process_response(url, status, content_type, html, store, file_checker, headers=headers,
+                                    recrawl=recrawl, on_links=on_links)
+            if frontier and 'skipped' in item:
+                frontier.add_stored(url)
+            return item
+        finally:
+            finished(url)
+
+    def failed(url, error):
+        try:
+            store(url, {'title': 'Error', 'body_content': f"Failed: {error}"})
+        finally:
+            finished(url)
+
+    scheduler = get_host_scheduler()
+    engine = AsyncFetchEngine(
+        handler=handle,
+        on_error=failed,
+        concurrency=CRAWL_CONCURRENCY,
+        per_domain=4,
+        timeout=30,
+        retries=3,
+        proxies=proxies,
+        headers_factory=get_random_headers,
+        request_headers=recrawl.request_headers if recrawl else None,
+        should_stop=should_stop,
+        scheduler=scheduler,
+        on_disallowed=finished,
+    )
+    feeder = None
+    if frontier:
+        feed = queue.Queue()
+        feeder = threading.Thread(target=frontier.feed, args=(feed,),
+                                  kwargs={'should_stop': should_stop, 'on_batch': recrawl.load if recrawl else None},
+                                  name="frontier-feed", daemon=True)
+        feeder.start()
+    try:
+        stats = engine.run_feed(feed) if feed is not None else engine.run(urls)
+        logging.info(f"Host scheduler: {scheduler.summary()}")
+        if frontier:
+            stats.update(frontier.counts)
+            logging.info(f"Frontier: {frontier.summary()}")
+        if recrawl:
+            stats.update(recrawl.counts)
+            logging.info(f"Re-crawl: {recrawl.summary()}")
+        return stats
+    finally:
+        if feeder:
+            feeder.join()
+        file_checker.close()
+        if recrawl:
+            recrawl.save_validators(writer)
+        writer.close()
+        if frontier:
+            frontier.close()
 
-def scrape_urls(query=None, urls=None, max_retries=3):
-    """Main scraping function with improved reliability"""
+
+def get_working_proxies():
+    """Check the proxy sources and return the working proxies as http:// URLs"""
+    raw_proxies = proxy_cheaker() if 'proxy_cheaker' in globals() else []
+    working_proxies = ['http://' + proxy if not proxy.startswith(('http://', 'https://')) else proxy for proxy in raw_proxies]
+    logging.info(f"Formatted proxies: {working_proxies}")
+    return working_proxies
+
+
+def scrape_urls(query=None, urls=None, max_retries=3, engine="scrapy", stats=None, refresh=False, depth=1,
+                max_pages=MAX_FRONTIER_PAGES):
+    """
+    Main scraping function with improved reliability.
+
+    engine="scrapy" runs EnhancedContentSpider in a CrawlerProcess, which can
+    only start once per Python process. engine="async" uses AsyncFetchEngine,
+    which can be run any number of times (use it from long-lived callers such
+    as the GUI).
+
+    URLs are canonicalized and deduplicated first (see url_index), and pages
+    fetched within the last FRESH_FOR_HOURS are not fetched at all unless
+    `refresh` is true. Older stored pages are re-fetched with conditional
+    requests and skipped when unchanged. Pass a dict as `stats` to receive
+    the new / changed / not_modified / unchanged counts for this crawl, and
+    the URL index's unseen / stale / fresh / duplicates counts.
+
+    With depth > 1, links are followed from the search results through a
+    CrawlFrontier, up to depth - 1 links away and at most `max_pages`
+    fetched pages, the links most relevant to the query's main words first.
+    A query's frontier is kept in the database, so running the same query
+    again continues a crawl that ran out of budget or was interrupted.
+    `stats` then also gets the frontier's links / fetched / expanded counts.
+    """
     try:
         init_database()
         
@@ -456,34 +768,73 @@ def scrape_urls(query=None, urls=None, max_retries=3):
             logging.warning("No URLs to scrape")
             return False
 
-        raw_proxies = proxy_cheaker() if 'proxy_cheaker' in globals() else []
-        working_proxies = ['http://' + proxy if not proxy.startswith(('http://', 'https://')) else proxy for proxy in raw_proxies]
-        logging.info(f"Formatted proxies: {working_proxies}")
+        url_index = UrlIndex(DB_PATH).load()
+        frontier = None
+        if depth > 1:
+            frontier = CrawlFrontier(terms=extract_main_words(query or ''), max_depth=depth - 1,
+                                     max_pages=max_pages, url_index=url_index, refresh=refresh,
+                                     name=normalize_query(query) if query else None, db_path=DB_PATH).load()
+            frontier.add(urls)
+            urls = None
+            pending = frontier.pending
+        else:
+            urls = url_index.select(urls, refresh=refresh)
+            pending = len(urls)
+        logging.info(f"URL index: {url_index.summary()}")
+        if stats is not None:
+            stats.update(url_index.counts)
+            if frontier:
+                stats.update(frontier.counts)
+        if not pending:
+            logging.info("Every URL was fetched recently; nothing to scrape")
+            if frontier:
+                frontier.close()
+            return True
+
+        working_proxies = get_working_proxies()
+
+        recrawl = RecrawlTracker(DB_PATH)
+        if urls:
+            recrawl.load(urls)
+
+        # Only URLs the crawl got to are marked fresh in the URL index, and
+        # those that redirected (Scrapy stores the page under the final URL)
+        # under the URL requested as well
+        fetched = []
+        redirects = {}
+
+        def done(url, requested_url=None):
+            fetched.append(url)
+            if requested_url and requested_url != url:
+                redirects[requested_url] = url
+
+        if engine == "async":
+            started = time.perf_counter()
+            crawl_with_async_engine(urls, working_proxies, recrawl=recrawl, on_done=done, frontier=frontier)
+            record_duration(DB_PATH, "crawl", time.perf_counter() - started)
+            url_index.record(fetched, redirects)
+            logging.info(f"Scraping completed for {len(fetched)} URLs")
+            if stats is not None:
+                stats.update(recrawl.counts)
+                if frontier:
+                    stats.update(frontier.counts)
+            return True
         
-        process = CrawlerProcess({
-            'USER_AGENT': random.choice(USER_AGENTS_LIST),
-            'ROBOTSTXT_OBEY': False,
-            'DOWNLOAD_TIMEOUT': 30,
-            'AUTOTHROTTLE_ENABLED': True,
-            'AUTOTHROTTLE_START_DELAY': 1,
-            'AUTOTHROTTLE_MAX_DELAY': 5,
-            'CONCURRENT_REQUESTS': 8,
-            'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
-            'DOWNLOADER_MIDDLEWARES': {
-                'scrapy.downloadermiddlewares.retry.RetryMiddleware': 550,
-            },
-            'ROTATING_PROXY_LIST': working_proxies,
-            'LOG_LEVEL': 'INFO',
-            'FEED_FORMAT': 'json',
-            'FEED_URI': 'database/scraped_data.json',
-            'FEED_EXPORT_ENCODING': 'utf-8',
-        })
+        process = CrawlerProcess(crawler_settings(working_proxies))
 
         for attempt in range(max_retries):
             try:
-                process.crawl(EnhancedContentSpider, urls=urls, proxies=working_proxies)
+                started = time.perf_counter()
+                process.crawl(EnhancedContentSpider, urls=urls, proxies=working_proxies, recrawl=recrawl,
+                              frontier=frontier, on_done=done)
                 process.start()
-                logging.info(f"Scraping completed for {len(urls)} URLs")
+                record_duration(DB_PATH, "crawl", time.perf_counter() - started)
+                url_index.record(fetched, redirects)
+                logging.info(f"Scraping completed for {len(fetched)} URLs")
+                if stats is not None:
+                    stats.update(recrawl.counts)
+                    if frontier:
+                        stats.update(frontier.counts)
                 return True
             except Exception as e:
                 logging.error(f"Scraping attempt {attempt + 1} failed: {str(e)}")
@@ -495,146 +846,201 @@ def scrape_urls(query=None, urls=None, max_retries=3):
         logging.error(f"Scraping error: {str(e)}")
         return False
 
-def query_database(search_terms=None, limit=10, content_type=None):
-    """Enhanced database query function with better relevance scoring"""
-    conn = sqlite3.connect("database/scraped_data.db", timeout=10)
+# bm25() weights for the title, meta_description and body_content columns,
+# matching the 10/5/1 scores used by the LIKE ranking
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+# query_database content_type -> condition on the pages count columns
+CONTENT_FILTERS = {
+    'images': "pages.image_count > 0",
+    'videos': "pages.video_count > 0",
+    'files': "pages.file_count > 0",
+    'links': "pages.link_count > 0",
+    # Pages that primarily contain text
+    'text': ("(pages.image_count < 3 AND pages.video_count < 2 AND pages.body_content IS NOT NULL "
+             "AND LENGTH(pages.body_content) > 100)"),
+}
+
+
+def build_fts_match(search_terms):
+    """Build an FTS5 MATCH expression requiring every term (as a prefix)"""
+    tokens = []
+    for term in search_terms:
+        tokens.extend(re.findall(r'\w+', str(term)))
+    return " AND ".join(f'"{token}"*' for token in tokens)
+
+
+def build_ranked_query(conn, search_terms=None, content_type=None, mode="fts"):
+    """
+    Build the ranking query shared by query_database and query_pages.
+
+    The query selects only id, timestamp and relevance of the matching
+    pages (content filters applied, no ORDER BY / LIMIT yet).
+
+    Returns:
+        tuple: (search_terms as a list, query, params, order_by, match_expr)
+    """
+    # Standardize search terms if present
+    if not search_terms:
+        search_terms = []
+    elif isinstance(search_terms, str):
+        search_terms = search_terms.split()
+
+    logging.info(f"Searching with terms: {search_terms}")
+
+    use_fts = mode == "fts"
+    match_expr = build_fts_match(search_terms) if use_fts else ""
+    if match_expr and not table_exists(conn, 'pages_fts'):
+        logging.warning("Full-text index missing; falling back to LIKE search")
+        use_fts = False
+        match_expr = ""
+
+    if match_expr:
+        # bm25() returns lower-is-better scores, so negate for relevance
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        query = f"""
+            SELECT pages.id AS id, pages.timestamp AS timestamp,
+                   -bm25(pages_fts, {weights}) AS relevance
+            FROM pages_fts JOIN pages ON pages.id = pages_fts.rowid
+            WHERE pages_fts MATCH ?
+        """
+        params = [match_expr]
+    # For relevance scoring, we'll use SQLite's CASE expressions
+    elif search_terms and not use_fts:
+        # Build the base query with relevance scoring
+        title_conditions = []
+        body_conditions = []
+        meta_conditions = []
+        relevance_factors = []
+        params = []
+
+        # Add scoring for each search term
+        for i, term in enumerate(search_terms):
+            term_param = f'%{term}%'
+
+            # Add relevance factors with different weights per field
+            relevance_factors.append(f"(CASE WHEN title LIKE ? THEN 10 ELSE 0 END)")
+            relevance_factors.append(f"(CASE WHEN meta_description LIKE ? THEN 5 ELSE 0 END)")
+            relevance_factors.append(f"(CASE WHEN body_content LIKE ? THEN 1 ELSE 0 END)")
+
+            # Add parameters for the CASE statements
+            params.extend([term_param, term_param, term_param])
+
+            # Add conditions for WHERE clause
+            title_conditions.append(f"title LIKE ?")
+            meta_conditions.append(f"meta_description LIKE ?")
+            body_conditions.append(f"body_content LIKE ?")
+
+        # Combine all conditions for WHERE clause
+        combined_conditions = []
+        for term_idx in range(len(search_terms)):
+            combined_conditions.append(
+                f"({title_conditions[term_idx]} OR {meta_conditions[term_idx]} OR {body_conditions[term_idx]})"
+            )
+
+            # Add parameters for the WHERE clause - need to duplicate the parameters
+            params.extend([f'%{search_terms[term_idx]}%'] * 3)
+
+        # Build the relevance score expression
+        relevance_score = " + ".join(relevance_factors)
+
+        # Start building the query
+        query = f"""
+            SELECT pages.id AS id, pages.timestamp AS timestamp, ({relevance_score}) AS relevance
+            FROM pages
+            WHERE {" AND ".join(combined_conditions)}
+        """
+    else:
+        # No usable search terms, just get all pages
+        query = "SELECT pages.id AS id, pages.timestamp AS timestamp, 0 AS relevance FROM pages WHERE 1=1"
+        params = []
+
+    # Add content type filtering, using the precomputed count columns
+    if isinstance(content_type, str) and content_type:
+        content_type = [content_type]
+    if isinstance(content_type, list) and content_type:
+        content_conditions = [CONTENT_FILTERS[ctype] for ctype in content_type if ctype in CONTENT_FILTERS]
+        if content_conditions:
+            query += " AND (" + " OR ".join(content_conditions) + ")"
+
+    # Add sorting - prioritize relevance score, then recency
+    if match_expr or (search_terms and not use_fts):
+        order_by = "relevance DESC, timestamp DESC"
+    else:
+        order_by = "timestamp DESC"
+
+    return search_terms, query, params, order_by, match_expr
+
+
+def query_database(search_terms=None, limit=10, content_type=None, mode="fts", sink=None):
+    """
+    Enhanced database query function with better relevance scoring.
+
+    mode="fts" ranks matches with bm25() over the pages_fts index; mode="like"
+    uses the original LIKE scan. FTS falls back to LIKE if the index is missing.
+
+    Every search is handed to a result sink (see result_sink), which records
+    the result ids and scores on a background thread. `sink` defaults to the
+    process-wide sink; pass NullSink() to leave a query unrecorded.
+
+    Results are cached in query_cache.QUERY_CACHE until the next write to
+    pages; a cached search is still recorded in the sink.
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=10)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
     try:
-        # Standardize search terms if present
-        if not search_terms:
-            search_terms = []
-        elif isinstance(search_terms, str):
-            search_terms = search_terms.split()
-            
-        logging.info(f"Searching with terms: {search_terms}")
-        
-        # For relevance scoring, we'll use SQLite's CASE expressions
-        if search_terms:
-            # Build the base query with relevance scoring
-            title_conditions = []
-            body_conditions = []
-            meta_conditions = []
-            relevance_factors = []
-            params = []
-            
-            # Add scoring for each search term
-            for i, term in enumerate(search_terms):
-                term_param = f'%{term}%'
-                
-                # Add relevance factors with different weights per field
-                relevance_factors.append(f"(CASE WHEN title LIKE ? THEN 10 ELSE 0 END)")
-                relevance_factors.append(f"(CASE WHEN meta_description LIKE ? THEN 5 ELSE 0 END)")
-                relevance_factors.append(f"(CASE WHEN body_content LIKE ? THEN 1 ELSE 0 END)")
-                
-                # Add parameters for the CASE statements
-                params.extend([term_param, term_param, term_param])
-                
-                # Add conditions for WHERE clause
-                title_conditions.append(f"title LIKE ?")
-                meta_conditions.append(f"meta_description LIKE ?")
-                body_conditions.append(f"body_content LIKE ?")
-            
-            # Combine all conditions for WHERE clause
-            combined_conditions = []
-            for term_idx in range(len(search_terms)):
-                combined_conditions.append(
-                    f"({title_conditions[term_idx]} OR {meta_conditions[term_idx]} OR {body_conditions[term_idx]})"
-                )
-                
-                # Add parameters for the WHERE clause - need to duplicate the parameters
-                params.extend([f'%{search_terms[term_idx]}%'] * 3)
-            
-            # Build the relevance score expression
-            relevance_score = " + ".join(relevance_factors)
-            
-            # Start building the query
-            query = f"""
-                SELECT *, ({relevance_score}) AS relevance 
-                FROM pages
-                WHERE {" AND ".join(combined_conditions)}
-            """
-        else:
-            # No search terms, just get all pages
-            query = "SELECT *, 0 AS relevance FROM pages WHERE 1=1"
-            params = []
-        
-        # Add content type filtering
-        if content_type:
-            if isinstance(content_type, list) and content_type:
-                content_conditions = []
-                for ctype in content_type:
-                    # Skip invalid content types
-                    if ctype not in ['images', 'videos', 'files', 'links', 'text']:
-                        continue
-                        
-                    if ctype == 'text':
-                        # Text is a special case - pages that primarily contain text
-                        content_conditions.append(
-                            "(JSON_ARRAY_LENGTH(images) < 3 AND JSON_ARRAY_LENGTH(videos) < 2 AND body_content IS NOT NULL AND LENGTH(body_content) > 100)"
-                        )
-                    else:
-                        content_conditions.append(
-                            f"{ctype} IS NOT NULL AND {ctype} != '[]' AND JSON_ARRAY_LENGTH({ctype}) > 0"
-                        )
-                
-                if content_conditions:
-                    query += " AND (" + " OR ".join(content_conditions) + ")"
-            elif isinstance(content_type, str) and content_type:
-                if content_type == 'text':
-                    query += " AND (JSON_ARRAY_LENGTH(images) < 3 AND JSON_ARRAY_LENGTH(videos) < 2 AND body_content IS NOT NULL AND LENGTH(body_content) > 100)"
-                else:
-                    query += f" AND {content_type} IS NOT NULL AND {content_type} != '[]' AND JSON_ARRAY_LENGTH({content_type}) > 0"
-        
-        # Add sorting - prioritize relevance score, then recency
-        if search_terms:
-            query += " ORDER BY relevance DESC, timestamp DESC"
-        else:
-            query += " ORDER BY timestamp DESC"
+        # Older databases are migrated to the side-table layout on first use
+        ensure_schema(conn)
+
+        start_time = time.perf_counter()
+        search_terms, query, params, order_by, match_expr = build_ranked_query(
+            conn, search_terms, content_type, mode)
+
+        # Term order does not change these results, so it is not part of the key
+        generation = store_generation(conn)
+        cache_key = ("query_database", normalize_terms(search_terms, ordered=False),
+                     normalize_content_type(content_type), int(limit or 0), mode)
+        results = QUERY_CACHE.get(cache_key, generation)
+        if results is not None:
+            sink = get_result_sink() if sink is None else sink
+            sink.submit(query_entry(search_terms, content_type, "fts" if match_expr else mode,
+                                    datetime.now().isoformat(timespec="seconds"),
+                                    time.perf_counter() - start_time, results))
+            logging.info(f"Found {len(results)} cached results for search terms: {search_terms}")
+            return results
+
+        query += f" ORDER BY {order_by}"
             
         # Add limit
         if limit:
-            query += f" LIMIT {limit}"
+            query += f" LIMIT {int(limit)}"
+
+        # Only the ranked page ids are joined to the compatibility view, so
+        # the JSON columns are rebuilt for the returned rows alone
+        query = f"""
+            SELECT pages_compat.*, ranked.relevance
+            FROM ({query}) AS ranked
+            JOIN pages_compat ON pages_compat.id = ranked.id
+            ORDER BY {", ".join(f"ranked.{term}" for term in order_by.split(", "))}
+        """
         
         # Log the query for debugging
         logging.info(f"SQL Query: {query}")
         logging.info(f"Parameters: {params}")
         
-        # Save the query for debugging
-        timestamp = datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
-        
-        # Create a valid filename
-        search_terms_str = "_".join(search_terms) if search_terms else "all"
-        filename = f"{search_terms_str}__{timestamp}.txt"
-        filename = re.sub(r'[\\/*?:"<>|]', "_", filename)  # Remove invalid characters
-        
-        results_dir = os.path.join("database", "scraped_results")
-        os.makedirs(results_dir, exist_ok=True)
-        result_file = os.path.join(results_dir, filename)
-        
         # Execute query
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        # Save to file and prepare results
-        results = []
-        with open(result_file, "a", encoding="utf-8") as f:
-            f.write(f"Query: {search_terms}\nTimestamp: {timestamp}\n")
-            f.write("-" * 80 + "\n\n")
-            
-            for idx, row in enumerate(rows, 1):
-                row_dict = dict(row)
-                results.append(row_dict)
-                
-                f.write(f"Result #{idx}:\n")
-                for k, v in row_dict.items():
-                    f.write(f"  {k}: {v}\n")
-                f.write("-" * 80 + "\n\n")
-                
-            f.write(f"\nTotal results: {len(results)}\n")
-            logging.info(f"Results written to {result_file}")
-        
+        results = [dict(row) for row in cursor.fetchall()]
+        elapsed = time.perf_counter() - start_time
+        QUERY_CACHE.put(cache_key, generation, results)
+
+        # Record the search (ids and scores only) off this thread
+        sink = get_result_sink() if sink is None else sink
+        sink.submit(query_entry(search_terms, content_type, "fts" if match_expr else mode,
+                                datetime.now().isoformat(timespec="seconds"), elapsed, results))
+
         logging.info(f"Found {len(results)} results for search terms: {search_terms}")
         return results
 
@@ -649,105 +1055,159 @@ def query_database(search_terms=None, limit=10, content_type=None):
     finally:
         conn.close()
         
-def open_close_url(url, timeout=5, opened_urls=None):
+
+
+
+
+# Columns query_pages can return, as SQL over pages. Besides the stored
+# columns: the first image src, and a JSON array of up to 4 image srcs.
+RESULT_COLUMNS = {column: f"pages.{column}" for column in ['id', *PAGE_COLUMNS]}
+RESULT_COLUMNS.update({
+    'first_image': ("(SELECT src FROM page_media WHERE page_id = pages.id AND kind = 'image' "
+                    "ORDER BY position LIMIT 1)"),
+    'thumbnails': ("(SELECT json_group_array(src) FROM (SELECT src FROM page_media "
+                   "WHERE page_id = pages.id AND kind = 'image' ORDER BY position LIMIT 4))"),
+})
+# What a result list needs: no full bodies, link lists or media JSON
+DEFAULT_RESULT_COLUMNS = ['id', 'url', 'title', 'snippet', 'timestamp',
+                          'image_count', 'video_count', 'file_count', 'first_image']
+# Characters of context a snippet keeps before the first matched term
+SNIPPET_CONTEXT = 60
+
+
+def query_pages(search_terms=None, columns=None, limit=20, after=None, content_type=None,
+                mode="fts", preview_chars=200, sink=None):
     """
-    Open a URL in a web browser, wait for the specified time, and then close the browser tab.
-    Ensures that the same URL is not opened multiple times.
-    
-    Parameters:
-    - url: URL string to open
-    - timeout: Time in seconds to wait before closing (default: 5)
-    - opened_urls: Optional list to track opened URLs across multiple calls
-    
+    One page of search results with only the requested columns.
+
+    Results are ordered by (relevance, timestamp, id), all descending, and
+    paged by keyset: pass the returned next_cursor as `after` to get the
+    following page. Only the rows of the requested page are read from
+    pages, so cost stays flat as the result set grows.
+
+    Besides RESULT_COLUMNS, two computed text columns are available, both
+    cut in SQL so full bodies never leave SQLite:
+        preview - the first `preview_chars` characters of body_content
+        snippet - `preview_chars` characters starting just before the
+                  first occurrence of the first search term (the start of
+                  the body if it only matched elsewhere)
+    Use get_page(id) to load a full row on demand.
+
+    The first page of a search is recorded in the result sink like
+    query_database; later pages are not. Pages are cached like
+    query_database results.
+
     Returns:
-    - bool: True if URL was successfully opened and closed, False otherwise
+        dict: rows (list of dicts, each with relevance) and next_cursor
+        ([relevance, timestamp, id] of the last row, or None at the end).
     """
-    # Initialize tracking list if not provided
-    if opened_urls is None:
-        opened_urls = []
-    
+    columns = list(dict.fromkeys(columns or DEFAULT_RESULT_COLUMNS))
+    unknown = [column for column in columns if column not in RESULT_COLUMNS and column not in ('preview', 'snippet')]
+    if unknown:
+        raise ValueError(f"Unknown result columns: {', '.join(unknown)}")
+    limit = max(1, int(limit))
+
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+
     try:
-        # Validate URL format
-        if not isinstance(url, str):
-            logging.warning(f"Invalid URL type: {type(url).__name__}. Expected string.")
-            return False
-        
-        # More thorough URL validation
-        url = url.strip()
-        if not url:
-            logging.warning("Empty URL provided")
-            return False
-        
-        # Ensure URL has http/https scheme
-        if not url.startswith(("http://", "https://")):
-            # Try to fix URL by adding https:// prefix
-            logging.info(f"Adding https:// prefix to URL: {url}")
-            url = "https://" + url
-        
-        # Check URL format using regex (basic check)
-        url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'([a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?\.)+[a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?'  # domain
-            r'(/[^\s]*)?$'  # optional path
-        )
-        
-        if not url_pattern.match(url):
-            logging.warning(f"Invalid URL format: {url}")
-            return False
-            
-        # Parse URL to check components
-        parsed = urlparse(url)
-        if not all([parsed.scheme, parsed.netloc]):
-            logging.warning(f"URL missing required components: {url}")
-            return False
-        
-        # Check for duplicates
-        if url in opened_urls:
-            logging.warning(f"Skipping duplicate URL: {url}")
-            return False
-        
-        # Open the URL in the default web browser
-        success = webbrowser.open(url)
-        if not success:
-            logging.error(f"Failed to open URL: {url}")
-            return False
-            
-        logging.info(f"Opened URL: {url}")
-        opened_urls.append(url)
-        
-        # Wait for specified timeout
-        logging.info(f"Waiting {timeout} seconds before closing...")
-        time.sleep(timeout)
-        
-        # Attempt to close the browser tab based on operating system
-        system = platform.system()
-        
-        try:
-            if system == "Windows":
-                # Send keyboard shortcut to close tab (Ctrl+W)
-                subprocess.run(['powershell', '-command', 
-                              '$wshell = New-Object -ComObject WScript.Shell; $wshell.SendKeys("^w")'])
-            elif system == "Darwin":  # macOS
-                # Send Command+W to close the active tab
-                subprocess.run(['osascript', '-e', 'tell application "System Events" to keystroke "w" using command down'])
-            elif system == "Linux":
-                # Send Ctrl+W using xdotool if available
-                if subprocess.run(['which', 'xdotool'], stdout=subprocess.PIPE, stderr=subprocess.PIPE).returncode == 0:
-                    subprocess.run(['xdotool', 'key', 'ctrl+w'])
-                else:
-                    logging.warning("Cannot close tab: xdotool not installed on Linux")
-            
-            logging.info(f"Attempted to close URL: {url}")
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error while trying to close tab: {str(e)}")
-            return False
-            
-    except Exception as e:
-        logging.error(f"Error processing URL: {str(e)}")
-        return False
+        ensure_schema(conn)
+        start_time = time.perf_counter()
+        search_terms, ranked, params, _, match_expr = build_ranked_query(conn, search_terms, content_type, mode)
+
+        # The snippet follows the first term, so term order is part of the key
+        generation = store_generation(conn)
+        cache_key = ("query_pages", normalize_terms(search_terms), tuple(columns), limit,
+                     tuple(after) if after else None, normalize_content_type(content_type), mode,
+                     int(preview_chars))
+        page = QUERY_CACHE.get(cache_key, generation)
+        if page is not None:
+            if not after:
+                sink = get_result_sink() if sink is None else sink
+                sink.submit(query_entry(search_terms, content_type, "fts" if match_expr else mode,
+                                        datetime.now().isoformat(timespec="seconds"),
+                                        time.perf_counter() - start_time, page['rows']))
+            logging.info(f"Found {len(page['rows'])} cached results for search terms: {search_terms}")
+            return page
 
+        # Keyset page over (relevance, timestamp, id); one extra row tells
+        # whether another page follows
+        keyset = f"SELECT id, timestamp, relevance FROM ({ranked})"
+        if after:
+            keyset += " WHERE (relevance, timestamp, id) < (?, ?, ?)"
+            params = params + list(after)
+        keyset += f" ORDER BY relevance DESC, timestamp DESC, id DESC LIMIT {limit + 1}"
+
+        preview_chars = int(preview_chars)
+        select = []
+        select_params = []
+        for column in columns:
+            if column == 'preview':
+                select.append(f"substr(pages.body_content, 1, {preview_chars}) AS preview")
+            elif column == 'snippet':
+                # A window around the first term: FTS5 snippet() costs ~100x more per row
+                terms = re.findall(r'\w+', " ".join(str(term) for term in search_terms))
+                if not terms:
+                    select.append(f"substr(pages.body_content, 1, {preview_chars}) AS snippet")
+                    continue
+                select.append(f"""
+                    CASE WHEN instr(lower(pages.body_content), ?) > {SNIPPET_CONTEXT + 1} THEN '…' ELSE '' END ||
+                    substr(pages.body_content,
+                           max(1, instr(lower(pages.body_content), ?) - {SNIPPET_CONTEXT}), {preview_chars})
+                    AS snippet""")
+                select_params.extend([terms[0].lower()] * 2)
+            else:
+                select.append(f"{RESULT_COLUMNS[column]} AS {column}")
+
+        query = f"""
+            SELECT {", ".join(select)}, ranked.relevance AS relevance,
+                   ranked.id AS _cursor_id, ranked.timestamp AS _cursor_timestamp
+            FROM ({keyset}) AS ranked
+            JOIN pages ON pages.id = ranked.id
+            ORDER BY ranked.relevance DESC, ranked.timestamp DESC, ranked.id DESC
+        """
+        params = select_params + params
+
+        rows = [dict(row) for row in conn.execute(query, params)]
+        elapsed = time.perf_counter() - start_time
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = [rows[-1]['relevance'], rows[-1]['_cursor_timestamp'], rows[-1]['_cursor_id']]
+        for row in rows:
+            row.setdefault('id', row['_cursor_id'])
+            del row['_cursor_id'], row['_cursor_timestamp']
+
+        if not after:
+            sink = get_result_sink() if sink is None else sink
+            sink.submit(query_entry(search_terms, content_type, "fts" if match_expr else mode,
+                                    datetime.now().isoformat(timespec="seconds"), elapsed, rows))
+
+        logging.info(f"Found {len(rows)} results for search terms: {search_terms} "
+                     f"({'more' if next_cursor else 'no more'} pages)")
+        page = {'rows': rows, 'next_cursor': next_cursor}
+        QUERY_CACHE.put(cache_key, generation, page)
+        return page
+
+    except sqlite3.Error as e:
+        logging.error(f"Database query error: {str(e)}")
+        return {'rows': [], 'next_cursor': None}
+    finally:
+        conn.close()
+
+
+def get_page(page_id, db_path=DB_PATH):
+    """Full stored row (pages_compat shape) for one page id, or None"""
+    conn = sqlite3.connect(db_path, timeout=10)
+    try:
+        ensure_schema(conn)
+        pages = fetch_pages(conn, [page_id])
+        return pages[0] if pages else None
+    except sqlite3.Error as e:
+        logging.error(f"Could not load page {page_id}: {str(e)}")
+        return None
+    finally:
+        conn.close()
         
 if __name__ == "__main__":
     # Example usage